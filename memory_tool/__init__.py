@@ -1,61 +1,108 @@
 """Memory tool package."""
 from __future__ import annotations
 
-from .models import Checkpoint, Observation, Session
-from .database import connect_db, ensure_fts, ensure_schema, init_db, SCHEMA_VERSION
-from .utils import (
-    auto_tags_from_text,
-    normalize_tags_list,
-    normalize_text,
-    parse_ids,
-    resolve_db_path,
-    tags_to_json,
-    tags_to_text,
-    utc_now,
-    DEFAULT_PROFILE,
-    PROFILE_CHOICES,
-    PROFILE_DB_PATHS,
-)
-from .operations import (
-    add_observation,
-    normalize_rows,
-    run_search,
-    run_timeline,
-    run_get,
-    run_list,
-    run_export,
-    run_edit,
-    run_delete,
-    run_clean,
-    run_manage,
-    generate_visual_timeline,
-)
-from .sessions import (
-    get_active_session,
-    set_active_session,
-    clear_active_session,
-    start_session,
-    end_session,
-    get_session,
-    list_sessions,
-    get_session_observations,
-    generate_session_summary,
-)
-from .checkpoints import (
-    get_checkpoint,
-    list_checkpoints,
-    get_checkpoint_observations,
-    resume_from_checkpoint,
-)
-from .projects import list_projects
-from .share import run_share, run_import
+import importlib
+from typing import Any, Dict
+
+# Public names resolve on first access (PEP 562) so that importing a single
+# submodule, e.g. ``memory_tool.cli``, does not load the whole package.
+_LAZY_EXPORTS: Dict[str, str] = {
+    # Client API (optional; raises AttributeError if it cannot be imported)
+    "MemoryClient": ".client",
+    "memory": ".client",
+    "ObservationData": ".client",
+    "SessionData": ".client",
+    # Models
+    "Checkpoint": ".models",
+    "Observation": ".models",
+    "Session": ".models",
+    # Database
+    "SCHEMA_VERSION": ".database",
+    "close_db": ".database",
+    "close_shared_connections": ".database",
+    "connect_db": ".database",
+    "ensure_current_schema": ".database",
+    "ensure_fts": ".database",
+    "ensure_schema": ".database",
+    "init_db": ".database",
+    "shared_connection": ".database",
+    # Utils
+    "auto_tags_from_text": ".utils",
+    "normalize_tags_list": ".utils",
+    "normalize_text": ".utils",
+    "parse_ids": ".utils",
+    "resolve_db_path": ".utils",
+    "tags_to_json": ".utils",
+    "tags_to_text": ".utils",
+    "utc_now": ".utils",
+    "freeze_now": ".utils",
+    "DEFAULT_PROFILE": ".utils",
+    "PROFILE_CHOICES": ".utils",
+    "PROFILE_DB_PATHS": ".utils",
+    # Operations
+    "add_observation": ".operations",
+    "add_observation_many": ".operations",
+    "normalize_rows": ".operations",
+    "run_search": ".operations",
+    "run_timeline": ".operations",
+    "run_get": ".operations",
+    "run_list": ".operations",
+    "run_export": ".operations",
+    "iter_export": ".operations",
+    "run_edit": ".operations",
+    "run_delete": ".operations",
+    "run_clean": ".operations",
+    "run_manage": ".operations",
+    "generate_visual_timeline": ".operations",
+    # Sessions
+    "get_active_session": ".sessions",
+    "set_active_session": ".sessions",
+    "clear_active_session": ".sessions",
+    "start_session": ".sessions",
+    "end_session": ".sessions",
+    "get_session": ".sessions",
+    "list_sessions": ".sessions",
+    "get_session_observations": ".sessions",
+    "generate_session_summary": ".sessions",
+    # Checkpoints
+    "get_checkpoint": ".checkpoints",
+    "list_checkpoints": ".checkpoints",
+    "get_checkpoint_observations": ".checkpoints",
+    "get_checkpoint_observations_as_dicts": ".checkpoints",
+    "resume_from_checkpoint": ".checkpoints",
+    # Projects
+    "archive_project": ".projects",
+    "list_projects": ".projects",
+    # Share
+    "run_share": ".share",
+    "run_import": ".share",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name == "_client_available":
+        try:
+            importlib.import_module(".client", __name__)
+        except ImportError:
+            return False
+        return True
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        module = importlib.import_module(module_name, __name__)
+    except ImportError as exc:
+        raise AttributeError(
+            f"module {__name__!r} has no attribute {name!r} ({exc})"
+        ) from exc
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
 
-# Client API (optional import to avoid circular deps)
-try:
-    from .client import MemoryClient, memory, ObservationData, SessionData
-    _client_available = True
-except ImportError:
-    _client_available = False
 
 __all__ = [
     # Client API (available if dependencies met)
@@ -68,10 +115,14 @@ __all__ = [
     "Observation",
     "Session",
     # Database
+    "close_db",
+    "close_shared_connections",
     "connect_db",
+    "ensure_current_schema",
     "ensure_fts",
     "ensure_schema",
     "init_db",
+    "shared_connection",
     "SCHEMA_VERSION",
     # Utils
     "auto_tags_from_text",
@@ -82,17 +133,20 @@ __all__ = [
     "tags_to_json",
     "tags_to_text",
     "utc_now",
+    "freeze_now",
     "DEFAULT_PROFILE",
     "PROFILE_CHOICES",
     "PROFILE_DB_PATHS",
     # Operations
     "add_observation",
+    "add_observation_many",
     "normalize_rows",
     "run_search",
     "run_timeline",
     "run_get",
     "run_list",
     "run_export",
+    "iter_export",
     "run_edit",
     "run_delete",
     "run_clean",
@@ -112,8 +166,10 @@ __all__ = [
     "get_checkpoint",
     "list_checkpoints",
     "get_checkpoint_observations",
+    "get_checkpoint_observations_as_dicts",
     "resume_from_checkpoint",
     # Projects
+    "archive_project",
     "list_projects",
     # Share
     "run_share",
@@ -0,0 +1,60 @@
+"""JSON encode/decode helpers for hot paths.
+
+Uses orjson when it is installed and falls back to the stdlib otherwise.
+Encoded output is equivalent JSON with non-ASCII characters left as-is, but
+not byte-identical across the two paths: orjson writes compact separators
+and formats some floats differently. Use these encoders only for output
+that is parsed again, never for text that is persisted or compared.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+if HAS_ORJSON:
+    # Datetimes and dataclasses go through ``default`` as with the stdlib
+    _INDENT_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+# orjson.JSONDecodeError subclasses this, so callers only need one except clause
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data: str | bytes) -> Any:
+    """Deserialize a JSON document."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    """Serialize ``obj`` to a JSON string without escaping non-ASCII text.
+
+    Separators depend on whether orjson is installed; not for stored columns.
+    """
+    if HAS_ORJSON:
+        try:
+            return orjson.dumps(obj).decode("utf-8")
+        except TypeError:
+            # Non-str dict keys, oversized ints, etc. - let the stdlib handle them
+            pass
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def dumps_indented_bytes(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Serialize like ``json.dumps(obj, indent=2, ensure_ascii=False, default=default)``.
+
+    Returns UTF-8 bytes, ready for a binary stream. The indented layout is
+    the same on both paths; float formatting may differ.
+    """
+    if HAS_ORJSON:
+        try:
+            return orjson.dumps(obj, default=default, option=_INDENT_OPTIONS)
+        except TypeError:
+            pass
+    return json.dumps(obj, indent=2, ensure_ascii=False, default=default).encode("utf-8")
@@ -2,10 +2,29 @@
 from __future__ import annotations
 
 import json
-from typing import TYPE_CHECKING, Optional
+import sqlite3
+from collections import OrderedDict
+from typing import Optional
 
-if TYPE_CHECKING:
-    import sqlite3
+from . import _fastjson
+
+# Tool name from the title ("Tool: {tool_name}"); only a leading prefix is cut,
+# so titles containing "Tool: " further in are left intact
+_TOOL_NAME_SQL = (
+    "CASE WHEN substr(title, 1, 6) = 'Tool: ' "
+    "THEN trim(substr(title, 7)) ELSE title END"
+)
+# Status from the raw JSON payload; rows with unparseable raw count as unknown
+_RAW_STATUS_SQL = "CASE WHEN json_valid(raw) THEN json_extract(raw, '$.status') END"
+
+# Lowercase + space-to-underscore in one pass for ASCII tag tokens
+_TAG_TRANS = str.maketrans(
+    {code: code + 32 for code in range(ord("A"), ord("Z") + 1)} | {ord(" "): ord("_")}
+)
+
+# Memoized suggest_tools_for_task results, most recently used last
+_SUGGEST_CACHE_SIZE = 256
+_suggest_cache: OrderedDict[tuple, list[dict]] = OrderedDict()
 
 
 def get_tool_stats(conn: sqlite3.Connection, project: Optional[str] = None, limit: int = 20) -> dict:
@@ -22,48 +41,55 @@ def get_tool_stats(conn: sqlite3.Connection, project: Optional[str] = None, limi
         base_where += " AND project = ?"
         params.append(project)
 
-    # Total calls
+    # Totals and success rate - SQLite pulls status out of the raw JSON and
+    # aggregates, so rows never have to be deserialized in Python
     row = conn.execute(
-        f"SELECT COUNT(*) as total FROM observations WHERE {base_where}",
+        f"""
+        SELECT COUNT(*) AS total,
+               COALESCE(SUM({_RAW_STATUS_SQL} = 'success'), 0) AS success_count,
+               COALESCE(SUM({_RAW_STATUS_SQL} = 'error'), 0) AS error_count
+        FROM observations
+        WHERE {base_where}
+        """,
         params,
     ).fetchone()
-    total_calls = int(row["total"]) if row else 0
-
-    # Success rate - parse raw field as JSON and look for status
-    success_count = 0
-    error_count = 0
-    tool_counts: dict[str, int] = {}
-    recent_errors: list[dict] = []
-
-    rows = conn.execute(
-        f"SELECT title, summary, raw, timestamp FROM observations WHERE {base_where} ORDER BY timestamp DESC",
-        params,
-    ).fetchall()
-
-    for row in rows:
-        # Extract tool name from title (format: "Tool: {tool_name}")
-        tool_name = row["title"].replace("Tool: ", "").strip() if row["title"].startswith("Tool:") else row["title"]
-        tool_counts[tool_name] = tool_counts.get(tool_name, 0) + 1
-
-        # Parse raw field for status
-        try:
-            raw_data = json.loads(row["raw"]) if row["raw"] else {}
-            status = raw_data.get("status", "unknown")
-            if status == "success":
-                success_count += 1
-            elif status == "error":
-                error_count += 1
-                if len(recent_errors) < 5:
-                    recent_errors.append({
-                        "tool": tool_name,
-                        "error": raw_data.get("error", "Unknown error"),
-                        "timestamp": row["timestamp"],
-                    })
-        except json.JSONDecodeError:
-            pass
-
-    # Sort tools by usage
-    sorted_tools = sorted(tool_counts.items(), key=lambda x: (-x[1], x[0]))[:limit]
+    total_calls = int(row["total"])
+    success_count = int(row["success_count"])
+    error_count = int(row["error_count"])
+
+    # Per-tool usage, ranked and limited in SQL
+    tools = [
+        {"name": row["tool"], "calls": row["calls"]}
+        for row in conn.execute(
+            f"""
+            SELECT {_TOOL_NAME_SQL} AS tool, COUNT(*) AS calls
+            FROM observations
+            WHERE {base_where}
+            GROUP BY tool
+            ORDER BY calls DESC, tool ASC
+            LIMIT ?
+            """,
+            [*params, limit],
+        )
+    ]
+
+    recent_errors = [
+        {
+            "tool": row["tool"],
+            "error": row["error"] if row["error"] is not None else "Unknown error",
+            "timestamp": row["timestamp"],
+        }
+        for row in conn.execute(
+            f"""
+            SELECT {_TOOL_NAME_SQL} AS tool, json_extract(raw, '$.error') AS error, timestamp
+            FROM observations
+            WHERE {base_where} AND {_RAW_STATUS_SQL} = 'error'
+            ORDER BY timestamp DESC
+            LIMIT 5
+            """,
+            params,
+        )
+    ]
 
     return {
         "ok": True,
@@ -71,7 +97,7 @@ def get_tool_stats(conn: sqlite3.Connection, project: Optional[str] = None, limi
         "success_count": success_count,
         "error_count": error_count,
         "success_rate": round(success_count / total_calls * 100, 1) if total_calls > 0 else 0,
-        "tools": [{"name": name, "calls": count} for name, count in sorted_tools],
+        "tools": tools,
         "recent_errors": recent_errors,
     }
 
@@ -79,61 +105,132 @@ def get_tool_stats(conn: sqlite3.Connection, project: Optional[str] = None, limi
 def suggest_tools_for_task(conn: sqlite3.Connection, task_description: str, limit: int = 5) -> dict:
     """Suggest tools based on task description and historical usage.
 
-    Uses simple keyword matching against tool names and past tool usages.
+    Each task keyword (longer than 2 chars) that matches a tool's name or
+    summary in the FTS index scores 1 point, plus a 0.1 bonus per past call.
+    Ranking happens in SQL, so only the returned suggestions are decoded.
+    Results are memoized per database until the tool_call history changes.
+    A task with no usable keywords returns no suggestions without a query.
     """
     task_lower = task_description.lower()
-    task_keywords = set(task_lower.split())
-
-    # Get all tool calls
-    rows = conn.execute(
-        "SELECT title, summary, raw, COUNT(*) as count FROM observations WHERE kind = 'tool_call' GROUP BY title ORDER BY count DESC"
-    ).fetchall()
-
-    scored_tools: list[tuple[float, str, dict]] = []
-
-    for row in rows:
-        tool_name = row["title"].replace("Tool: ", "").strip() if row["title"].startswith("Tool:") else row["title"]
-
-        # Calculate score based on keyword matches
-        score = 0.0
-        tool_text = f"{tool_name} {row['summary']}".lower()
-
-        # Direct keyword matches
-        for keyword in task_keywords:
-            if len(keyword) > 2 and keyword in tool_text:
-                score += 1.0
-
-        # Frequency bonus
-        score += row["count"] * 0.1
-
-        if score > 0:
-            try:
-                raw_data = json.loads(row["raw"]) if row["raw"] else {}
-            except json.JSONDecodeError:
-                raw_data = {}
-
-            scored_tools.append((
-                score,
-                tool_name,
-                {
-                    "name": tool_name,
-                    "description": row["summary"],
-                    "usage_count": row["count"],
-                    "score": round(score, 2),
-                    "example_input": raw_data.get("input_preview", ""),
-                }
-            ))
-
-    # Sort by score descending
-    scored_tools.sort(key=lambda x: -x[0])
+    task_keywords = sorted({keyword for keyword in task_lower.split() if len(keyword) > 2})
+    if not task_keywords:
+        return {"ok": True, "task": task_description, "suggestions": []}
+
+    cache_key = _suggest_cache_key(conn, task_keywords, limit)
+    suggestions = _suggest_cache.get(cache_key) if cache_key else None
+    if suggestions is not None:
+        _suggest_cache.move_to_end(cache_key)
+    else:
+        suggestions = _build_suggestions(conn, task_keywords, limit)
+        if cache_key:
+            _suggest_cache[cache_key] = suggestions
+            if len(_suggest_cache) > _SUGGEST_CACHE_SIZE:
+                _suggest_cache.popitem(last=False)
 
     return {
         "ok": True,
         "task": task_description,
-        "suggestions": [t[2] for t in scored_tools[:limit]],
+        "suggestions": [dict(item) for item in suggestions],
     }
 
 
+def _suggest_cache_key(conn: sqlite3.Connection, keywords: list[str], limit: int) -> Optional[tuple]:
+    """Build the memoization key for a suggestion request.
+
+    The key includes the tool_call high-water mark and row count, so any
+    logged or deleted tool call invalidates earlier entries. In-memory and
+    temporary databases have no stable path and are never cached.
+    """
+    db_path = conn.execute("PRAGMA database_list").fetchone()[2]
+    if not db_path:
+        return None
+    version = conn.execute(
+        "SELECT MAX(id), COUNT(*) FROM observations WHERE kind = 'tool_call'"
+    ).fetchone()
+    return (db_path, tuple(version), tuple(keywords), limit)
+
+
+def _build_suggestions(conn: sqlite3.Connection, keywords: list[str], limit: int) -> list[dict]:
+    """Rank tools for the given keywords and format them as suggestions."""
+    try:
+        rows = _rank_tools(conn, keywords, limit, use_fts=True)
+    except sqlite3.OperationalError:
+        # FTS table missing or query rejected - fall back to substring matching
+        rows = _rank_tools(conn, keywords, limit, use_fts=False)
+
+    suggestions: list[dict] = []
+    for row in rows:
+        try:
+            raw_data = _fastjson.loads(row["raw"]) if row["raw"] else {}
+        except _fastjson.JSONDecodeError:
+            raw_data = {}
+
+        suggestions.append({
+            "name": row["tool_name"],
+            "description": row["summary"],
+            "usage_count": row["count"],
+            "score": round(row["score"], 2),
+            "example_input": raw_data.get("input_preview", ""),
+        })
+    return suggestions
+
+
+def _rank_tools(
+    conn: sqlite3.Connection,
+    keywords: list[str],
+    limit: int,
+    use_fts: bool,
+) -> list[sqlite3.Row]:
+    """Score tool_call groups by keyword hits plus usage frequency in SQL."""
+    hit_queries: list[str] = []
+    params: list[object] = []
+    for keyword in keywords:
+        if use_fts:
+            hit_queries.append(
+                "SELECT DISTINCT o.title AS title FROM observations_fts "
+                "JOIN observations o ON o.id = observations_fts.rowid "
+                "WHERE observations_fts MATCH ? AND o.kind = 'tool_call'"
+            )
+            escaped = keyword.replace('"', '""')
+            params.append(f'{{title summary}} : "{escaped}"*')
+        else:
+            hit_queries.append(
+                "SELECT DISTINCT title FROM observations "
+                f"WHERE kind = 'tool_call' AND instr(lower({_TOOL_NAME_SQL} || ' ' || summary), ?) > 0"
+            )
+            params.append(keyword)
+    hits = " UNION ALL ".join(hit_queries)
+    params.append(limit)
+
+    return conn.execute(
+        f"""
+        WITH tools AS (
+            SELECT title, {_TOOL_NAME_SQL} AS tool_name, summary, raw, COUNT(*) AS count
+            FROM observations
+            WHERE kind = 'tool_call'
+            GROUP BY title
+        ),
+        hits AS (
+            SELECT title, COUNT(*) AS matched FROM ({hits}) GROUP BY title
+        )
+        SELECT tools.tool_name, tools.summary, tools.raw, tools.count,
+               COALESCE(hits.matched, 0) + tools.count * 0.1 AS score
+        FROM tools
+        LEFT JOIN hits ON hits.title = tools.title
+        ORDER BY score DESC, tools.count DESC
+        LIMIT ?
+        """,
+        params,
+    ).fetchall()
+
+
+def _tag_token(value: str) -> str:
+    """Normalize a name into a tag: lowercase with spaces as underscores."""
+    if value.isascii():
+        return value.translate(_TAG_TRANS)
+    return value.lower().replace(" ", "_")
+
+
 def log_tool_call(
     conn: sqlite3.Connection,
     tool_name: str,
@@ -158,11 +255,11 @@ def log_tool_call(
     if tool_output and "error" in tool_output:
         error_msg = str(tool_output["error"])
 
-    summary = f"Status: {status}"
-    if duration_ms:
-        summary += f" | Duration: {duration_ms}ms"
-    if error_msg:
-        summary += f" | Error: {error_msg[:100]}"
+    summary = (
+        f"Status: {status}"
+        + (f" | Duration: {duration_ms}ms" if duration_ms is not None else "")
+        + (f" | Error: {error_msg[:100]}" if error_msg else "")
+    )
 
     raw_data = {
         "tool": tool_name,
@@ -173,9 +270,7 @@ def log_tool_call(
         "input_preview": input_preview,
     }
 
-    tags = ["tool", tool_name.lower().replace(" ", "_")]
-    if status == "error":
-        tags.append("error")
+    tags = ("tool", _tag_token(tool_name)) + (("error",) if status == "error" else ())
 
     obs_id = add_observation(
         conn,
@@ -184,7 +279,8 @@ def log_tool_call(
         "tool_call",
         f"Tool: {tool_name}",
         summary,
-        tags_to_json(tags),
+        # Persisted with the stdlib so the stored format never depends on orjson
+        tags_to_json(list(tags)),
         " ".join(tags),
         json.dumps(raw_data, ensure_ascii=False),
         session_id,
@@ -211,9 +307,7 @@ def log_agent_transition(
     safe_phase = (phase or "unknown").strip() or "unknown"
     safe_action = (action or "unknown").strip() or "unknown"
 
-    summary = f"Status: {status}"
-    if reward is not None:
-        summary += f" | Reward: {reward}"
+    summary = f"Status: {status}" + (f" | Reward: {reward}" if reward is not None else "")
 
     raw_data = {
         "phase": safe_phase,
@@ -224,9 +318,11 @@ def log_agent_transition(
         "reward": reward,
     }
 
-    tags = ["transition", safe_phase.lower().replace(" ", "_"), safe_action.lower().replace(" ", "_")]
-    if status == "error":
-        tags.append("error")
+    tags = (
+        "transition",
+        _tag_token(safe_phase),
+        _tag_token(safe_action),
+    ) + (("error",) if status == "error" else ())
 
     obs_id = add_observation(
         conn,
@@ -235,7 +331,8 @@ def log_agent_transition(
         "agent_transition",
         f"Transition: {safe_phase}/{safe_action}",
         summary,
-        tags_to_json(tags),
+        # Persisted with the stdlib so the stored format never depends on orjson
+        tags_to_json(list(tags)),
         " ".join(tags),
         json.dumps(raw_data, ensure_ascii=False),
         session_id,
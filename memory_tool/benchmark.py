@@ -1,5 +1,15 @@
 #!/usr/bin/env python3
-"""Simple benchmark for memory_tool CLI latency."""
+"""Simple benchmark for memory_tool latency.
+
+``init`` is timed as a CLI subprocess to capture cold-start cost (interpreter
+startup + imports). add/search/list are timed in-process against a single
+connection, so they measure the operations themselves.
+
+The connection comes from ``connect_db``, so it runs with the same PRAGMAs
+as the CLI in production (WAL, synchronous=NORMAL, in-memory temp store,
+64MB cache). ``add`` commits per call like a CLI ``add``; ``add_batch``
+inserts the same number of rows in one transaction to show bulk throughput.
+"""
 from __future__ import annotations
 
 import argparse
@@ -10,26 +20,46 @@ import sys
 import tempfile
 import time
 from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from memory_tool.database import connect_db, ensure_current_schema
+from memory_tool.operations import add_observation, add_observation_many, run_list, run_search
+from memory_tool.utils import normalize_tags_list, tags_to_json, tags_to_text, utc_now
 
 
-def run_cmd(cmd: list[str]) -> tuple[float, int, str]:
-    started = time.perf_counter()
+def cold_cmd(cmd: list[str]) -> tuple[float, int, str]:
+    """Run a CLI command in a fresh interpreter and time it."""
+    started = time.perf_counter_ns()
     proc = subprocess.run(cmd, capture_output=True, text=True)
-    elapsed_ms = (time.perf_counter() - started) * 1000.0
+    elapsed_ms = (time.perf_counter_ns() - started) / 1e6
     return elapsed_ms, proc.returncode, proc.stdout + proc.stderr
 
 
-def percentile(values: list[float], p: float) -> float:
-    if not values:
+def hot_call(fn: Callable[[], object]) -> float:
+    """Call ``fn`` in-process and return elapsed milliseconds."""
+    started = time.perf_counter_ns()
+    fn()
+    return (time.perf_counter_ns() - started) / 1e6
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
         return 0.0
-    idx = max(0, min(len(values) - 1, int(round((p / 100.0) * (len(values) - 1)))))
-    sorted_values = sorted(values)
+    idx = max(0, min(len(sorted_values) - 1, int(round((p / 100.0) * (len(sorted_values) - 1)))))
     return sorted_values[idx]
 
 
+def fail(error: str, output: str) -> None:
+    print(json.dumps({"ok": False, "error": error, "output": output}, ensure_ascii=False, indent=2))
+    sys.exit(1)
+
+
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Benchmark memory_tool CLI latency")
-    parser.add_argument("--python", default=sys.executable, help="Python executable")
+    parser = argparse.ArgumentParser(description="Benchmark memory_tool latency")
+    parser.add_argument("--python", default=sys.executable, help="Python executable for the cold-start run")
     parser.add_argument("--iterations", type=int, default=20, help="Iterations per operation")
     parser.add_argument("--profile", default="shared", choices=["codex", "claude", "shared"])
     args = parser.parse_args()
@@ -37,102 +67,81 @@ def main() -> None:
     with tempfile.TemporaryDirectory(prefix="los-memory-bench-") as tmp:
         db_path = str(Path(tmp) / "bench.db")
         tool_path = str(Path(__file__).resolve().parent / "memory_tool.py")
-        base = [args.python, tool_path, "--db", db_path]
 
-        # Warm-up DB
-        init_elapsed, init_code, init_out = run_cmd(base + ["init"])
+        # Cold start: one CLI run pays interpreter startup and imports
+        init_elapsed, init_code, init_out = cold_cmd([args.python, tool_path, "--db", db_path, "init"])
         if init_code != 0:
-            print(json.dumps({"ok": False, "error": "init_failed", "output": init_out}, ensure_ascii=False, indent=2))
-            sys.exit(1)
+            fail("init_failed", init_out)
+
+        conn = connect_db(db_path)
+        ensure_current_schema(conn)
+
+        required_tags = normalize_tags_list("tenant:default,user:bench")
+
+        def add(title: str, summary: str, tags: str, raw: str) -> None:
+            tags_list = normalize_tags_list(tags)
+            add_observation(
+                conn, utc_now(), "bench", "note", title, summary,
+                tags_to_json(tags_list), tags_to_text(tags_list), raw,
+            )
 
         # Seed one record for search/list
-        seed = base + [
-            "add",
-            "--project",
-            "bench",
-            "--kind",
-            "note",
-            "--title",
-            "seed",
-            "--summary",
-            "benchmark seed data",
-            "--tags",
-            "bench,seed,tenant:default,user:bench",
-            "--raw",
-            "seed",
-        ]
-        _, seed_code, seed_out = run_cmd(seed)
-        if seed_code != 0:
-            print(json.dumps({"ok": False, "error": "seed_failed", "output": seed_out}, ensure_ascii=False, indent=2))
-            sys.exit(1)
+        try:
+            add("seed", "benchmark seed data", "bench,seed,tenant:default,user:bench", "seed")
+        except Exception as exc:
+            fail("seed_failed", str(exc))
 
         add_latencies: list[float] = []
         search_latencies: list[float] = []
         list_latencies: list[float] = []
 
-        for i in range(args.iterations):
-            add_cmd = base + [
-                "add",
-                "--project",
-                "bench",
-                "--kind",
-                "note",
-                "--title",
-                f"bench-{i}",
-                "--summary",
-                "latency sample",
-                "--tags",
-                "bench,tenant:default,user:bench",
-                "--raw",
-                "sample",
-            ]
-            elapsed, code, out = run_cmd(add_cmd)
-            if code != 0:
-                print(json.dumps({"ok": False, "error": "add_failed", "output": out}, ensure_ascii=False, indent=2))
-                sys.exit(1)
-            add_latencies.append(elapsed)
-
-            search_cmd = base + [
-                "search",
-                "latency",
-                "--limit",
-                "10",
-                "--require-tags",
-                "tenant:default,user:bench",
-            ]
-            elapsed, code, out = run_cmd(search_cmd)
-            if code != 0:
-                print(json.dumps({"ok": False, "error": "search_failed", "output": out}, ensure_ascii=False, indent=2))
-                sys.exit(1)
-            search_latencies.append(elapsed)
-
-            list_cmd = base + [
-                "list",
-                "--limit",
-                "10",
-                "--require-tags",
-                "tenant:default,user:bench",
+        try:
+            for i in range(args.iterations):
+                stage = "add"
+                add_latencies.append(hot_call(
+                    lambda: add(f"bench-{i}", "latency sample", "bench,tenant:default,user:bench", "sample")
+                ))
+                stage = "search"
+                search_latencies.append(hot_call(
+                    lambda: run_search(conn, "latency", 10, required_tags=required_tags)
+                ))
+                stage = "list"
+                list_latencies.append(hot_call(
+                    lambda: run_list(conn, 10, required_tags=required_tags)
+                ))
+            stage = "add_batch"
+            batch_tags = normalize_tags_list("bench,batch,tenant:default,user:bench")
+            batch_rows = [
+                (utc_now(), "bench", "note", f"batch-{i}", "batch sample",
+                 tags_to_json(batch_tags), tags_to_text(batch_tags), "sample", None)
+                for i in range(args.iterations)
             ]
-            elapsed, code, out = run_cmd(list_cmd)
-            if code != 0:
-                print(json.dumps({"ok": False, "error": "list_failed", "output": out}, ensure_ascii=False, indent=2))
-                sys.exit(1)
-            list_latencies.append(elapsed)
+            batch_elapsed = hot_call(lambda: add_observation_many(conn, batch_rows))
+        except Exception as exc:
+            fail(f"{stage}_failed", str(exc))
+        finally:
+            conn.close()
 
         def summarize(name: str, values: list[float]) -> dict:
+            ordered = sorted(values)
             return {
                 "op": name,
                 "count": len(values),
-                "avg_ms": round(statistics.mean(values), 2),
-                "p50_ms": round(percentile(values, 50), 2),
-                "p95_ms": round(percentile(values, 95), 2),
-                "max_ms": round(max(values), 2),
+                "avg_ms": round(statistics.fmean(values), 2),
+                "p50_ms": round(percentile(ordered, 50), 2),
+                "p95_ms": round(percentile(ordered, 95), 2),
+                "max_ms": round(ordered[-1], 2),
             }
 
         report = {
             "ok": True,
             "iterations": args.iterations,
             "init_ms": round(init_elapsed, 2),
+            "add_batch": {
+                "rows": args.iterations,
+                "total_ms": round(batch_elapsed, 2),
+                "per_row_ms": round(batch_elapsed / max(args.iterations, 1), 4),
+            },
             "results": [
                 summarize("add", add_latencies),
                 summarize("search", search_latencies),
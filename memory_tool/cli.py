@@ -20,59 +20,20 @@ Environment Variables:
 from __future__ import annotations
 
 import argparse
+import io
 import json
 import os
+import re
 import sys
 import warnings
+from contextlib import contextmanager, redirect_stdout
 from pathlib import Path
-from dataclasses import asdict
-from typing import Optional
-
-# Core imports - using original modules for Phase 1 (to be migrated to core/ in Phase 2)
-from .database import connect_db, ensure_fts, ensure_schema, init_db
-from .models import Observation
-from .analytics import get_tool_stats, log_agent_transition, log_tool_call, suggest_tools_for_task
-from .feedback import apply_feedback, get_feedback_history
-from .review_feedback import apply_review_feedback
-from .links import create_link, delete_link, find_similar_observations, get_related_observations
-from .operations import (
-    add_observation,
-    generate_visual_timeline,
-    run_clean,
-    run_delete,
-    run_edit,
-    run_export,
-    run_get,
-    run_list,
-    run_manage,
-    run_search,
-    run_timeline,
-)
-from .sessions import (
-    clear_active_session,
-    end_session,
-    generate_session_summary,
-    get_active_session,
-    get_session,
-    get_session_observations,
-    list_sessions,
-    set_active_session,
-    start_session,
-)
-from .checkpoints import (
-    create_checkpoint,
-    get_checkpoint,
-    get_checkpoint_observations,
-    list_checkpoints,
-    resume_from_checkpoint,
-)
-from .projects import (
-    get_active_project,
-    get_project_stats,
-    list_projects,
-    set_active_project,
-)
-from .share import run_import, run_share
+from typing import Iterator, Optional
+
+# Core imports - using original modules for Phase 1 (to be migrated to core/ in Phase 2).
+# Only what parsing and connection setup need is imported here; handlers
+# import their command modules when they run.
+from .database import close_db, connect_db, ensure_current_schema, init_db
 from .utils import (
     DEFAULT_LLM_HOOK,
     DEFAULT_PROFILE,
@@ -82,21 +43,12 @@ from .utils import (
     normalize_text,
     parse_ids,
     resolve_db_path,
+    state_file_memo,
     tags_to_json,
-    tags_to_text,
+    tags_to_json_and_text,
     utc_now,
 )
 
-# Extension imports (static registration)
-from .extensions import (
-    dispatch_extension_command,
-    get_disabled_extensions,
-    get_extension_help_text,
-    is_extension_enabled,
-    list_extensions,
-    register_extensions,
-)
-
 # Migration imports (with deprecation warnings)
 try:
     from .migrate_out.approval import (
@@ -107,9 +59,17 @@ try:
 except ImportError:
     _approval_available = False
 
+# Sentence boundaries for quick capture: whitespace after ., ! or ?
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    """Parse command-line arguments.
 
-def parse_args() -> argparse.Namespace:
-    """Parse command-line arguments."""
+    Only the parser for the requested core command is built, and for
+    ``memory``/``observation`` only the requested action. Help requests,
+    extension commands and anything unrecognised get the full parser.
+    """
     parser = argparse.ArgumentParser(
         description="los-memory: Memory ledger for AI agent observations",
         prog="los-memory",
@@ -130,23 +90,111 @@ def parse_args() -> argparse.Namespace:
 
     subparsers = parser.add_subparsers(dest="command", required=True)
 
-    # ========================================================================
-    # init
-    # ========================================================================
-    init_parser = subparsers.add_parser("init", help="Initialize the database")
+    tokens = sys.argv[1:] if argv is None else argv
+    command = _peek_command(tokens)
+    builder = _COMMAND_BUILDERS.get(command)
+    if builder is not None:
+        actions = _ACTION_BUILDERS.get(command)
+        action = _peek_action(tokens, command) if actions else None
+        if actions and action in actions:
+            builder(subparsers, only=action)
+        else:
+            builder(subparsers)
+        parser.registered_extensions = []  # type: ignore
+        return parser.parse_args(argv)
+
+    for build in _COMMAND_BUILDERS.values():
+        build(subparsers)
 
     # ========================================================================
-    # memory - Data access commands
+    # EXTENSION COMMANDS (experimental, may change or be removed)
     # ========================================================================
+    # Register extensions via static registration system
+    from .extensions import get_disabled_extensions, register_extensions
+    registered = register_extensions(subparsers, show_warnings=False)
+
+    # Register migrating approval with deprecation warning
+    if _approval_available and "approval" not in get_disabled_extensions():
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # Suppress immediate warning
+            add_approval_subcommands(subparsers)
+            registered.append("approval")
+
+    # Store registered extensions for help text
+    parser.registered_extensions = registered  # type: ignore
+
+    return parser.parse_args(argv)
+
+
+# Global options that consume the following token as their value
+_GLOBAL_VALUE_OPTIONS = frozenset({"--profile", "--db", "--output", "-o", "--color"})
+
+
+def _peek_command(argv: list[str]) -> Optional[str]:
+    """Return the subcommand name in argv without building any parsers.
+
+    Skips global options (and their values). Returns None when help is
+    requested before the subcommand or no subcommand is present.
+    """
+    tokens = iter(argv)
+    for token in tokens:
+        if token in ("-h", "--help"):
+            return None
+        if token in _GLOBAL_VALUE_OPTIONS:
+            next(tokens, None)
+        elif not token.startswith("-"):
+            return token
+    return None
+
+
+def _peek_action(argv: list[str], command: str) -> Optional[str]:
+    """Return the token following ``command`` in argv, if any."""
+    tokens = iter(argv)
+    for token in tokens:
+        if token in _GLOBAL_VALUE_OPTIONS:
+            next(tokens, None)
+        elif token == command:
+            return next(tokens, None)
+    return None
+
+
+def _build_init(subparsers: argparse._SubParsersAction) -> None:
+    """Add the ``init`` command parser."""
+    subparsers.add_parser("init", help="Initialize the database")
+
+
+def _build_daemon(subparsers: argparse._SubParsersAction) -> None:
+    """Add the ``daemon`` command parser."""
+    daemon = subparsers.add_parser(
+        "daemon",
+        help="Run JSON-encoded commands from stdin on one connection",
+    )
+    daemon.add_argument(
+        "--socket", default=None,
+        help="Serve the same line protocol on this unix socket instead of stdin",
+    )
+    daemon.add_argument(
+        "--client-timeout", type=float, default=30.0,
+        help="Seconds a socket client may stay idle before it is disconnected (default: 30)",
+    )
+
+
+def _build_memory(subparsers: argparse._SubParsersAction, only: Optional[str] = None) -> None:
+    """Add the ``memory`` command parser (just the ``only`` action if given)."""
     memory_parser = subparsers.add_parser("memory", help="Memory data access commands")
     memory_subparsers = memory_parser.add_subparsers(dest="memory_action", required=True)
+    _build_actions(memory_subparsers, _MEMORY_ACTIONS, only)
+
 
-    # memory search
+def _build_memory_search(memory_subparsers: argparse._SubParsersAction) -> None:
     memory_search = memory_subparsers.add_parser("search", help="Search observations")
     memory_search.add_argument("query")
     memory_search.add_argument("--limit", type=int, default=10)
     memory_search.add_argument("--offset", type=int, default=0)
-    memory_search.add_argument("--mode", choices=["auto", "fts", "like"], default="auto")
+    memory_search.add_argument(
+        "--mode", choices=["auto", "fts", "like", "scan"], default="auto",
+        help="like: word-prefix match via FTS; scan: infix LIKE over every row",
+    )
     memory_search.add_argument("--fts-quote", action="store_true")
     memory_search.add_argument(
         "--require-tags",
@@ -154,7 +202,8 @@ def parse_args() -> argparse.Namespace:
         help="Comma-separated tags that every result must contain",
     )
 
-    # memory list
+
+def _build_memory_list(memory_subparsers: argparse._SubParsersAction) -> None:
     memory_list = memory_subparsers.add_parser("list", help="List observations")
     memory_list.add_argument("--limit", type=int, default=20)
     memory_list.add_argument("--offset", type=int, default=0)
@@ -164,11 +213,13 @@ def parse_args() -> argparse.Namespace:
         help="Comma-separated tags that every result must contain",
     )
 
-    # memory get
+
+def _build_memory_get(memory_subparsers: argparse._SubParsersAction) -> None:
     memory_get = memory_subparsers.add_parser("get", help="Fetch observations by id")
     memory_get.add_argument("ids", help="Comma-separated observation ids")
 
-    # memory timeline
+
+def _build_memory_timeline(memory_subparsers: argparse._SubParsersAction) -> None:
     memory_timeline = memory_subparsers.add_parser("timeline", help="Timeline query")
     memory_timeline.add_argument("--start")
     memory_timeline.add_argument("--end")
@@ -179,14 +230,16 @@ def parse_args() -> argparse.Namespace:
     memory_timeline.add_argument("--visual", action="store_true")
     memory_timeline.add_argument("--group-by", choices=["hour", "day", "session"], default=None)
 
-    # memory export
+
+def _build_memory_export(memory_subparsers: argparse._SubParsersAction) -> None:
     memory_export = memory_subparsers.add_parser("export", help="Export observations")
     memory_export.add_argument("--format", choices=["json", "csv"], default="json")
     memory_export.add_argument("--output", default=None)
     memory_export.add_argument("--limit", type=int, default=1000)
     memory_export.add_argument("--offset", type=int, default=0)
 
-    # memory clean
+
+def _build_memory_clean(memory_subparsers: argparse._SubParsersAction) -> None:
     memory_clean = memory_subparsers.add_parser("clean", help="Delete old observations")
     memory_clean.add_argument("--before")
     memory_clean.add_argument("--older-than-days", type=int)
@@ -197,15 +250,27 @@ def parse_args() -> argparse.Namespace:
     memory_clean.add_argument("--dry-run", action="store_true")
     memory_clean.add_argument("--vacuum", action="store_true")
 
-    # ========================================================================
-    # observation - Observation CRUD commands
-    # ========================================================================
+
+_MEMORY_ACTIONS = {
+    "search": _build_memory_search,
+    "list": _build_memory_list,
+    "get": _build_memory_get,
+    "timeline": _build_memory_timeline,
+    "export": _build_memory_export,
+    "clean": _build_memory_clean,
+}
+
+
+def _build_observation(subparsers: argparse._SubParsersAction, only: Optional[str] = None) -> None:
+    """Add the ``observation`` command parser (just the ``only`` action if given)."""
     obs_parser = subparsers.add_parser("observation", help="Observation management commands")
     obs_subparsers = obs_parser.add_subparsers(dest="obs_action", required=True)
+    _build_actions(obs_subparsers, _OBSERVATION_ACTIONS, only)
 
-    # observation add
+
+def _build_obs_add(obs_subparsers: argparse._SubParsersAction) -> None:
     obs_add = obs_subparsers.add_parser("add", help="Add an observation")
-    obs_add.add_argument("--timestamp", default=utc_now())
+    obs_add.add_argument("--timestamp", default=None, help="Defaults to now")
     obs_add.add_argument("--project", default="general")
     obs_add.add_argument("--kind", default="note")
     obs_add.add_argument("--title", required=True)
@@ -215,7 +280,18 @@ def parse_args() -> argparse.Namespace:
     obs_add.add_argument("--auto-tags", action="store_true")
     obs_add.add_argument("--llm-hook", default=DEFAULT_LLM_HOOK)
 
-    # observation edit
+
+def _build_obs_bulk_add(obs_subparsers: argparse._SubParsersAction) -> None:
+    obs_bulk_add = obs_subparsers.add_parser(
+        "bulk-add", help="Add observations from JSON lines in one transaction"
+    )
+    obs_bulk_add.add_argument("--file", default="-", help="JSONL file (default: stdin)")
+    obs_bulk_add.add_argument("--project", default=None, help="Default project for lines without one")
+    obs_bulk_add.add_argument("--kind", default="note", help="Default kind for lines without one")
+    obs_bulk_add.add_argument("--auto-tags", action="store_true")
+
+
+def _build_obs_edit(obs_subparsers: argparse._SubParsersAction) -> None:
     obs_edit = obs_subparsers.add_parser("edit", help="Edit an observation")
     obs_edit.add_argument("--id", type=int, required=True)
     obs_edit.add_argument("--timestamp", default=None)
@@ -227,12 +303,14 @@ def parse_args() -> argparse.Namespace:
     obs_edit.add_argument("--raw", default=None)
     obs_edit.add_argument("--auto-tags", action="store_true")
 
-    # observation delete
+
+def _build_obs_delete(obs_subparsers: argparse._SubParsersAction) -> None:
     obs_delete = obs_subparsers.add_parser("delete", help="Delete observations")
     obs_delete.add_argument("ids")
     obs_delete.add_argument("--dry-run", action="store_true")
 
-    # observation capture
+
+def _build_obs_capture(obs_subparsers: argparse._SubParsersAction) -> None:
     obs_capture = obs_subparsers.add_parser("capture", help="Quick capture")
     obs_capture.add_argument("text", nargs="+")
     obs_capture.add_argument("--project")
@@ -240,41 +318,67 @@ def parse_args() -> argparse.Namespace:
     obs_capture.add_argument("--tags", default="")
     obs_capture.add_argument("--auto-tags", action="store_true")
 
-    # observation feedback
+
+def _build_obs_feedback(obs_subparsers: argparse._SubParsersAction) -> None:
     obs_feedback = obs_subparsers.add_parser("feedback", help="Provide feedback on observations")
     obs_feedback.add_argument("text", nargs="+", help="Feedback text")
     obs_feedback.add_argument("--id", type=int, required=True, dest="observation_id")
     obs_feedback.add_argument("--dry-run", action="store_true")
     obs_feedback.add_argument("--history", action="store_true")
 
-    # observation link
+
+def _build_obs_link(obs_subparsers: argparse._SubParsersAction) -> None:
     obs_link = obs_subparsers.add_parser("link", help="Create link between observations")
     obs_link.add_argument("--from", type=int, required=True, dest="from_id")
     obs_link.add_argument("--to", type=int, required=True, dest="to_id")
     obs_link.add_argument("--type", choices=["related", "child", "parent", "refines"], default="related")
 
-    # observation unlink
+
+def _build_obs_unlink(obs_subparsers: argparse._SubParsersAction) -> None:
     obs_unlink = obs_subparsers.add_parser("unlink", help="Remove link between observations")
     obs_unlink.add_argument("--from", type=int, required=True, dest="from_id")
     obs_unlink.add_argument("--to", type=int, required=True, dest="to_id")
     obs_unlink.add_argument("--type", choices=["related", "child", "parent", "refines"], default=None)
 
-    # observation related
+
+def _build_obs_related(obs_subparsers: argparse._SubParsersAction) -> None:
     obs_related = obs_subparsers.add_parser("related", help="Find related observations")
     obs_related.add_argument("id", type=int, help="Observation ID")
     obs_related.add_argument("--type", choices=["related", "child", "parent", "refines"], default=None)
     obs_related.add_argument("--limit", type=int, default=20)
     obs_related.add_argument("--suggest", action="store_true")
 
-    # ========================================================================
-    # session - Session management
-    # ========================================================================
+
+_OBSERVATION_ACTIONS = {
+    "add": _build_obs_add,
+    "bulk-add": _build_obs_bulk_add,
+    "edit": _build_obs_edit,
+    "delete": _build_obs_delete,
+    "capture": _build_obs_capture,
+    "feedback": _build_obs_feedback,
+    "link": _build_obs_link,
+    "unlink": _build_obs_unlink,
+    "related": _build_obs_related,
+}
+
+
+def _build_actions(action_subparsers: argparse._SubParsersAction, builders: dict, only: Optional[str]) -> None:
+    """Add the ``only`` action parser, or every action when it is None."""
+    if only is not None:
+        builders[only](action_subparsers)
+        return
+    for build in builders.values():
+        build(action_subparsers)
+
+
+def _build_session(subparsers: argparse._SubParsersAction) -> None:
+    """Add the ``session`` command parser."""
     session_parser = subparsers.add_parser("session", help="Session management")
     session_subparsers = session_parser.add_subparsers(dest="session_action", required=True)
 
     session_start = session_subparsers.add_parser("start", help="Start a new session")
     session_start.add_argument("--project", default="general")
-    session_start.add_argument("--working-dir", default=os.getcwd())
+    session_start.add_argument("--working-dir", default=None, help="Defaults to the current directory")
     session_start.add_argument("--agent-type", default=DEFAULT_PROFILE)
     session_start.add_argument("--summary", default="")
 
@@ -292,9 +396,9 @@ def parse_args() -> argparse.Namespace:
     session_resume = session_subparsers.add_parser("resume", help="Resume a session")
     session_resume.add_argument("session_id", type=int, nargs="?")
 
-    # ========================================================================
-    # checkpoint - Checkpoint management
-    # ========================================================================
+
+def _build_checkpoint(subparsers: argparse._SubParsersAction) -> None:
+    """Add the ``checkpoint`` command parser."""
     checkpoint_parser = subparsers.add_parser("checkpoint", help="Checkpoint management")
     checkpoint_subparsers = checkpoint_parser.add_subparsers(dest="checkpoint_action", required=True)
 
@@ -312,9 +416,9 @@ def parse_args() -> argparse.Namespace:
     checkpoint_show = checkpoint_subparsers.add_parser("show", help="Show checkpoint")
     checkpoint_show.add_argument("checkpoint_id", type=int)
 
-    # ========================================================================
-    # project - Project management
-    # ========================================================================
+
+def _build_project(subparsers: argparse._SubParsersAction) -> None:
+    """Add the ``project`` command parser."""
     project_parser = subparsers.add_parser("project", help="Project management")
     project_subparsers = project_parser.add_subparsers(dest="project_action", required=True)
 
@@ -333,9 +437,9 @@ def parse_args() -> argparse.Namespace:
     project_active = project_subparsers.add_parser("active", help="Show/set active project")
     project_active.add_argument("project_name", nargs="?")
 
-    # ========================================================================
-    # tool - Tool tracking commands
-    # ========================================================================
+
+def _build_tool(subparsers: argparse._SubParsersAction) -> None:
+    """Add the ``tool`` command parser."""
     tool_parser = subparsers.add_parser("tool", help="Tool tracking commands")
     tool_subparsers = tool_parser.add_subparsers(dest="tool_action", required=True)
 
@@ -364,9 +468,9 @@ def parse_args() -> argparse.Namespace:
     tool_transition.add_argument("--reward", type=float, default=None)
     tool_transition.add_argument("--project", default=None)
 
-    # ========================================================================
-    # admin - Administrative commands
-    # ========================================================================
+
+def _build_admin(subparsers: argparse._SubParsersAction) -> None:
+    """Add the ``admin`` command parser."""
     admin_parser = subparsers.add_parser("admin", help="Administrative commands")
     admin_subparsers = admin_parser.add_subparsers(dest="admin_action", required=True)
 
@@ -396,9 +500,9 @@ def parse_args() -> argparse.Namespace:
     admin_extensions = admin_subparsers.add_parser("extensions", help="Manage extensions [EXT]")
     admin_extensions.add_argument("action", choices=["list", "status"], default="list", nargs="?")
 
-    # ========================================================================
-    # review - Review feedback commands
-    # ========================================================================
+
+def _build_review(subparsers: argparse._SubParsersAction) -> None:
+    """Add the ``review`` command parser."""
     review_parser = subparsers.add_parser("review", help="Review feedback commands")
     review_subparsers = review_parser.add_subparsers(dest="review_action", required=True)
 
@@ -406,28 +510,31 @@ def parse_args() -> argparse.Namespace:
     review_apply.add_argument("--file", required=True)
     review_apply.add_argument("--dry-run", action="store_true")
 
-    # ========================================================================
-    # EXTENSION COMMANDS (experimental, may change or be removed)
-    # ========================================================================
-    # Register extensions via static registration system
-    registered = register_extensions(subparsers, show_warnings=False)
-
-    # Register migrating approval with deprecation warning
-    if _approval_available and "approval" not in get_disabled_extensions():
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")  # Suppress immediate warning
-            add_approval_subcommands(subparsers)
-            registered.append("approval")
-
-    # Store registered extensions for help text
-    parser.registered_extensions = registered  # type: ignore
-
-    return parser.parse_args()
 
-
-def main() -> int:
-    """Main entry point."""
-    args = parse_args()
+# Core command parsers in help order; parse_args builds only the one requested
+_COMMAND_BUILDERS = {
+    "init": _build_init,
+    "daemon": _build_daemon,
+    "memory": _build_memory,
+    "observation": _build_observation,
+    "session": _build_session,
+    "checkpoint": _build_checkpoint,
+    "project": _build_project,
+    "tool": _build_tool,
+    "admin": _build_admin,
+    "review": _build_review,
+}
+
+# Commands whose builders can add a single action parser via ``only=``
+_ACTION_BUILDERS = {
+    "memory": _MEMORY_ACTIONS,
+    "observation": _OBSERVATION_ACTIONS,
+}
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Main entry point (``argv`` defaults to ``sys.argv[1:]``)."""
+    args = parse_args(argv)
     db_path = resolve_db_path(args.profile, args.db)
 
     # Handle init command (no DB connection needed)
@@ -444,11 +551,18 @@ def main() -> int:
         return 0 if response.ok else 1
 
     conn = connect_db(db_path)
-    ensure_schema(conn)
-    ensure_fts(conn)
+    ensure_current_schema(conn)
+
+    if args.command == "daemon":
+        try:
+            return _run_daemon(conn, args)
+        finally:
+            close_db(conn)
 
     try:
-        result = _dispatch_command(conn, args)
+        with state_file_memo():
+            result = _dispatch_command(conn, args)
+        conn.commit()
         if result is not None:
             _print_output(args, result, args.command)
         return 0
@@ -461,7 +575,153 @@ def main() -> int:
         _print_output(args, error_response, "error")
         return 1
     finally:
-        conn.close()
+        close_db(conn)
+
+
+def _run_daemon(conn, args) -> int:
+    """Run commands read from stdin against one open connection.
+
+    Each input line is a JSON array of command-line arguments without the
+    global options, e.g. ``["observation", "add", "--title", "t", "--summary", "s"]``.
+    One compact JSON result is written per line. Commands run with the
+    daemon's ``--db``/``--profile`` and are committed one at a time.
+
+    With ``--socket`` the same protocol is served on a unix socket, one
+    client at a time, so short-lived callers share the warm connection.
+    """
+    if args.socket:
+        return _serve_daemon_socket(conn, args)
+    for line in sys.stdin:
+        response = _daemon_response(conn, args, line)
+        if response is not None:
+            print(response, flush=True)
+    return 0
+
+
+def _serve_daemon_socket(conn, args) -> int:
+    """Accept clients on ``args.socket`` until interrupted.
+
+    A client that sends undecodable bytes, disconnects mid-response or stays
+    idle for ``args.client_timeout`` seconds only ends its own session; the
+    server keeps accepting. Clients are served one at a time, so the timeout
+    keeps a stalled one from blocking the rest.
+    """
+    import socket
+    if not hasattr(socket, "AF_UNIX"):
+        _print_output(args, {"ok": False, "error": "Unix sockets are not supported on this platform"}, "error")
+        return 1
+    path = os.path.expanduser(args.socket)
+    error = _claim_socket_path(path)
+    if error:
+        _print_output(args, {"ok": False, "error": error}, "error")
+        return 1
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    bound = False
+    try:
+        server.bind(path)
+        bound = True
+        server.listen()
+        while True:
+            client, _ = server.accept()
+            client.settimeout(args.client_timeout)
+            try:
+                with client, client.makefile("rw", encoding="utf-8", errors="replace", newline="\n") as stream:
+                    for line in stream:
+                        response = _daemon_response(conn, args, line)
+                        if response is not None:
+                            stream.write(response + "\n")
+                            stream.flush()
+            except OSError:
+                # Broken pipe, reset or socket.timeout: drop this client
+                continue
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        server.close()
+        if bound and os.path.exists(path):
+            os.unlink(path)
+
+
+def _claim_socket_path(path: str) -> Optional[str]:
+    """Clear a stale daemon socket at ``path``; return an error if it is not one."""
+    import socket
+    import stat
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return None
+    if not stat.S_ISSOCK(mode):
+        return f"{path} exists and is not a socket"
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        # Left behind by a daemon that did not shut down cleanly
+        os.unlink(path)
+        return None
+    except OSError as exc:
+        return f"Cannot use socket {path}: {exc}"
+    finally:
+        probe.close()
+    return f"A daemon is already listening on {path}"
+
+
+def _daemon_response(conn, args, line: str) -> Optional[str]:
+    """Run one daemon input line and return its JSON result (None for blank lines).
+
+    The command runs with stdout captured and an empty stdin, so it cannot
+    write into or read from the daemon's own protocol stream. Anything it
+    prints (``memory export`` without ``--output``, ``--help``) is returned
+    in the result's ``stdout``.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    captured = io.StringIO()
+    try:
+        with _isolated_stdio(captured):
+            argv = json.loads(line)
+            if not isinstance(argv, list) or not all(isinstance(item, str) for item in argv):
+                raise ValueError("Expected a JSON array of string arguments")
+            command_args = parse_args(argv)
+            if command_args.command in ("init", "daemon") or getattr(command_args, "admin_action", None) == "doctor":
+                raise ValueError(f"Command not supported in daemon mode: {command_args.command}")
+            command_args.db = args.db
+            command_args.profile = args.profile
+            command_args.in_daemon = True
+            with state_file_memo():
+                result = _dispatch_command(conn, command_args)
+        conn.commit()
+        if result is None:
+            result = {"ok": True}
+        if captured.getvalue():
+            result["stdout"] = captured.getvalue()
+    except SystemExit as exc:
+        if exc.code in (0, None):
+            # --help: argparse printed usage and exited successfully
+            result = {"ok": True, "stdout": captured.getvalue()}
+        else:
+            # argparse has already reported the problem on stderr
+            result = {"ok": False, "error": "Invalid arguments"}
+    except ValueError as exc:
+        conn.rollback()
+        result = {"ok": False, "error": str(exc)}
+    except Exception as exc:
+        conn.rollback()
+        result = {"ok": False, "error": f"Unexpected error: {exc}"}
+    return json.dumps(result, ensure_ascii=False, default=str)
+
+
+@contextmanager
+def _isolated_stdio(captured: io.StringIO) -> Iterator[None]:
+    """Send stdout to ``captured`` and give the command an empty stdin."""
+    saved_stdin = sys.stdin
+    sys.stdin = io.StringIO("")
+    try:
+        with redirect_stdout(captured):
+            yield
+    finally:
+        sys.stdin = saved_stdin
 
 
 def _dispatch_command(conn, args) -> dict | None:
@@ -487,6 +747,8 @@ def _dispatch_command(conn, args) -> dict | None:
         action = args.obs_action
         if action == "add":
             return _handle_obs_add(conn, args)
+        elif action == "bulk-add":
+            return _handle_obs_bulk_add(conn, args)
         elif action == "edit":
             return _handle_obs_edit(conn, args)
         elif action == "delete":
@@ -534,6 +796,7 @@ def _dispatch_command(conn, args) -> dict | None:
     # Extension commands (incident, recovery, knowledge, attribution)
     # Dispatch via extension system for consistent handling
     elif cmd in ("incident", "recovery", "knowledge", "attribution"):
+        from .extensions import dispatch_extension_command
         result = dispatch_extension_command(cmd, conn, args)
         if result is not None:
             return result
@@ -670,11 +933,32 @@ def _print_output(args, data: dict, command_type: str) -> None:
             return
 
     # Default JSON output
-    import json
-    print(json.dumps(data, indent=2, ensure_ascii=False, default=str))
+    from ._fastjson import dumps_indented_bytes
+    _write_bytes(dumps_indented_bytes(data, default=str))
+
+
+def _write_bytes(payload: bytes) -> None:
+    """Write an encoded payload and newline to stdout, skipping the text layer when possible."""
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        print(payload.decode("utf-8"))
+        return
+    sys.stdout.flush()
+    buffer.write(payload)
+    buffer.write(b"\n")
+
+
+def _with_db_info(result: dict, args) -> dict:
+    """Tag a handler result with the database and profile it ran against."""
+    result["db"] = args.db
+    result["profile"] = args.profile
+    return result
 
 
 def _handle_obs_add(conn, args):
+    from .operations import add_observation
+    from .projects import get_active_project
+    from .sessions import get_active_session
     title = normalize_text(args.title)
     summary = normalize_text(args.summary)
     tags_list = normalize_tags_list(args.tags)
@@ -703,9 +987,10 @@ def _handle_obs_add(conn, args):
     active_session = get_active_session(args.profile)
     session_id = active_session["session_id"] if active_session else None
 
+    tags_json, tags_text = tags_to_json_and_text(tags_list)
     obs_id = add_observation(
-        conn, args.timestamp, project, args.kind, title, summary,
-        tags_to_json(tags_list), tags_to_text(tags_list), raw, session_id,
+        conn, args.timestamp or utc_now(), project, args.kind, title, summary,
+        tags_json, tags_text, raw, session_id,
     )
     result = {"ok": True, "id": obs_id}
     if session_id:
@@ -713,7 +998,70 @@ def _handle_obs_add(conn, args):
     return result
 
 
+def _handle_obs_bulk_add(conn, args):
+    """Insert one observation per JSON line, indexed for FTS after the batch.
+
+    Each line is an object with string ``title`` and ``summary`` and
+    optionally ``timestamp`` (``ISO_FORMAT``), ``project``, ``kind``, ``tags``
+    and ``raw``. The LLM hook is not run; use ``observation add`` for
+    per-observation enrichment.
+    """
+    from .operations import _parse_utc, add_observation_many
+    from .projects import get_active_project
+    from .sessions import get_active_session
+    project = args.project or get_active_project(args.profile) or "general"
+    active_session = get_active_session(args.profile)
+    session_id = active_session["session_id"] if active_session else None
+    now = utc_now()
+
+    if args.file == "-" and getattr(args, "in_daemon", False):
+        # The daemon's stdin carries its own commands
+        raise ValueError("observation bulk-add needs --file in daemon mode")
+    stream = sys.stdin if args.file == "-" else open(os.path.expanduser(args.file), "r", encoding="utf-8")
+    rows = []
+    try:
+        for line_no, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+                if not isinstance(item, dict):
+                    raise TypeError("not a JSON object")
+                for field in ("title", "summary"):
+                    if not isinstance(item.get(field), str):
+                        raise TypeError(f"{field} must be a string")
+                for field in ("timestamp", "project", "kind", "raw"):
+                    if item.get(field) is not None and not isinstance(item[field], str):
+                        raise TypeError(f"{field} must be a string")
+                if item.get("timestamp"):
+                    # Stored as given, so it must be one run_timeline can parse back
+                    _parse_utc(item["timestamp"])
+            except (ValueError, TypeError) as exc:
+                raise ValueError(f"Line {line_no}: {exc}") from exc
+            title = normalize_text(item["title"])
+            summary = normalize_text(item["summary"])
+            tags_list = normalize_tags_list(item.get("tags", ""))
+            if args.auto_tags and not tags_list:
+                tags_list = auto_tags_from_text(title, summary)
+            tags_json, tags_text = tags_to_json_and_text(tags_list)
+            rows.append((
+                item.get("timestamp") or now, item.get("project") or project,
+                item.get("kind") or args.kind, title, summary,
+                tags_json, tags_text, item.get("raw") or "", session_id,
+            ))
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    added = add_observation_many(conn, rows) if rows else 0
+    result = {"ok": True, "added": added}
+    if session_id:
+        result["session_id"] = session_id
+    return result
+
+
 def _handle_memory_search(conn, args):
+    from .operations import run_search
     required_tags = normalize_tags_list(args.require_tags)
     results = run_search(
         conn,
@@ -728,8 +1076,9 @@ def _handle_memory_search(conn, args):
 
 
 def _handle_memory_timeline(conn, args):
+    from .operations import generate_visual_timeline, run_timeline
     results = run_timeline(conn, args.start, args.end, args.around_id, args.window_minutes, args.limit, offset=args.offset)
-    output = {"ok": True, "results": [asdict(r) for r in results]}
+    output = {"ok": True, "results": [r.to_dict() for r in results]}
     if args.visual:
         visual = generate_visual_timeline(results, group_by=args.group_by)
         output["visual"] = visual
@@ -738,79 +1087,91 @@ def _handle_memory_timeline(conn, args):
 
 
 def _handle_memory_get(conn, args):
+    from .operations import run_get
     ids = parse_ids(args.ids)
     results = run_get(conn, ids)
-    return {"ok": True, "results": [asdict(r) for r in results]}
+    return {"ok": True, "results": [r.to_dict() for r in results]}
 
 
 def _handle_obs_edit(conn, args):
-    result = run_edit(conn, args.id, args.project, args.kind, args.title, args.summary, args.tags, args.raw, args.timestamp, args.auto_tags)
-    result["db"] = args.db
-    result["profile"] = args.profile
-    return result
+    from .operations import run_edit
+    return _with_db_info(run_edit(conn, args.id, args.project, args.kind, args.title, args.summary, args.tags, args.raw, args.timestamp, args.auto_tags), args)
 
 
 def _handle_obs_delete(conn, args):
-    result = run_delete(conn, parse_ids(args.ids), args.dry_run)
-    result["db"] = args.db
-    result["profile"] = args.profile
-    return result
+    from .operations import run_delete
+    return _with_db_info(run_delete(conn, parse_ids(args.ids), args.dry_run), args)
 
 
 def _handle_memory_list(conn, args):
+    from .operations import run_list
     required_tags = normalize_tags_list(args.require_tags)
     results = run_list(conn, args.limit, offset=args.offset, required_tags=required_tags)
-    return {"ok": True, "results": [asdict(r) for r in results]}
+    return {"ok": True, "results": [r.to_dict() for r in results]}
 
 
 def _handle_memory_export(conn, args):
+    from .operations import iter_export
     import csv
-    results = run_export(conn, args.limit, offset=args.offset)
+    results = iter_export(conn, args.limit, offset=args.offset)
+    count = 0
     output = sys.stdout
     if args.output:
         output = open(args.output, "w", encoding="utf-8", newline="")
     try:
         if args.format == "json":
-            json.dump([asdict(r) for r in results], output, indent=2)
+            # Same text as json.dump(list, indent=2), written one item at a time
+            output.write("[")
+            for item in results:
+                output.write(",\n  " if count else "\n  ")
+                output.write(json.dumps(item.to_dict(), indent=2).replace("\n", "\n  "))
+                count += 1
+            output.write("\n]" if count else "]")
             if output is sys.stdout:
                 output.write("\n")
             else:
-                return {"ok": True, "output": args.output, "count": len(results)}
+                return {"ok": True, "output": args.output, "count": count}
         else:
-            writer = csv.DictWriter(
-                output,
-                fieldnames=["id", "timestamp", "project", "kind", "title", "summary", "tags", "raw", "session_id"],
-            )
-            writer.writeheader()
+            writer = csv.writer(output)
+            writer.writerow(("id", "timestamp", "project", "kind", "title", "summary", "tags", "raw", "session_id"))
             for item in results:
-                row = asdict(item)
-                row["tags"] = tags_to_json(item.tags)
-                writer.writerow(row)
+                writer.writerow((
+                    item.id, item.timestamp, item.project, item.kind, item.title,
+                    item.summary, tags_to_json(item.tags), item.raw, item.session_id,
+                ))
+                count += 1
             if output is not sys.stdout:
-                return {"ok": True, "output": args.output, "count": len(results)}
+                return {"ok": True, "output": args.output, "count": count}
     finally:
         if output is not sys.stdout:
             output.close()
-    return {"ok": True, "count": len(results)}
+    return {"ok": True, "count": count}
 
 
 def _handle_memory_clean(conn, args):
-    result = run_clean(conn, args.before, args.older_than_days, args.project, args.kind, args.tag, args.all, args.dry_run, args.vacuum)
-    result["db"] = args.db
-    result["profile"] = args.profile
-    return result
+    from .operations import run_clean
+    return _with_db_info(run_clean(conn, args.before, args.older_than_days, args.project, args.kind, args.tag, args.all, args.dry_run, args.vacuum), args)
 
 
 def _handle_admin_manage(conn, args):
-    result = run_manage(conn, args.action, args.limit)
-    result["db"] = args.db
-    result["profile"] = args.profile
-    return result
+    from .operations import run_manage
+    return _with_db_info(run_manage(conn, args.action, args.limit), args)
 
 
 def _handle_session(conn, args):
+    from .sessions import (
+        clear_active_session,
+        end_session,
+        generate_session_summary,
+        get_active_session,
+        get_session,
+        get_session_observations,
+        list_sessions,
+        set_active_session,
+        start_session,
+    )
     if args.session_action == "start":
-        session_id = start_session(conn, args.project, args.working_dir, args.agent_type, args.summary)
+        session_id = start_session(conn, args.project, args.working_dir or os.getcwd(), args.agent_type, args.summary)
         set_active_session(args.profile, session_id, "")
         return {"ok": True, "action": "start", "session_id": session_id}
     elif args.session_action == "stop":
@@ -823,15 +1184,15 @@ def _handle_session(conn, args):
         return {"ok": True, "action": "stop", "session_id": active["session_id"], "summary": summary}
     elif args.session_action == "list":
         sessions = list_sessions(conn, status=args.status, limit=args.limit)
-        return {"ok": True, "action": "list", "sessions": [asdict(s) for s in sessions]}
+        return {"ok": True, "action": "list", "sessions": [s.to_dict() for s in sessions]}
     elif args.session_action == "show":
         session = get_session(conn, args.session_id)
         if not session:
             raise ValueError(f"Session {args.session_id} not found")
-        result = {"ok": True, "action": "show", "session": asdict(session)}
+        result = {"ok": True, "action": "show", "session": session.to_dict()}
         if args.observations:
             observations = get_session_observations(conn, args.session_id)
-            result["observations"] = [asdict(o) for o in observations]
+            result["observations"] = [o.to_dict() for o in observations]
         return result
     elif args.session_action == "resume":
         if args.session_id:
@@ -845,6 +1206,7 @@ def _handle_session(conn, args):
 
 
 def _handle_project(conn, args):
+    from .projects import archive_project, get_active_project, get_project_stats, list_projects, set_active_project
     if args.project_action == "list":
         projects = list_projects(conn, args.limit)
         active = get_active_project(args.profile)
@@ -864,14 +1226,20 @@ def _handle_project(conn, args):
         stats = get_project_stats(conn, project_name)
         return {"ok": True, "action": "stats", **stats}
     elif args.project_action == "archive":
-        new_name = f"archived/{args.project_name}"
-        conn.execute("UPDATE observations SET project = ? WHERE project = ?", (new_name, args.project_name))
-        conn.execute("UPDATE sessions SET project = ? WHERE project = ?", (new_name, args.project_name))
-        conn.commit()
+        new_name = archive_project(conn, args.project_name)
         return {"ok": True, "action": "archive", "old_name": args.project_name, "new_name": new_name}
 
 
 def _handle_checkpoint(conn, args):
+    from .checkpoints import (
+        create_checkpoint,
+        get_checkpoint,
+        get_checkpoint_observations_as_dicts,
+        list_checkpoints,
+        resume_from_checkpoint,
+    )
+    from .projects import get_active_project
+    from .sessions import get_active_session
     if args.checkpoint_action == "create":
         active_session = get_active_session(args.profile)
         session_id = active_session["session_id"] if active_session else None
@@ -880,34 +1248,31 @@ def _handle_checkpoint(conn, args):
         return {"ok": True, "action": "create", "checkpoint_id": checkpoint_id}
     elif args.checkpoint_action == "list":
         checkpoints = list_checkpoints(conn, limit=args.limit)
-        return {"ok": True, "action": "list", "checkpoints": [asdict(c) for c in checkpoints]}
+        return {"ok": True, "action": "list", "checkpoints": [c.to_dict() for c in checkpoints]}
     elif args.checkpoint_action == "show":
         checkpoint = get_checkpoint(conn, args.checkpoint_id)
         if not checkpoint:
             raise ValueError(f"Checkpoint {args.checkpoint_id} not found")
-        observations = get_checkpoint_observations(conn, args.checkpoint_id)
-        return {"ok": True, "checkpoint": asdict(checkpoint), "observations": [asdict(o) for o in observations]}
+        observations = get_checkpoint_observations_as_dicts(conn, args.checkpoint_id)
+        return {"ok": True, "checkpoint": checkpoint.to_dict(), "observations": observations}
     elif args.checkpoint_action == "resume":
         result = resume_from_checkpoint(conn, args.checkpoint_id, args.profile)
         return {"ok": True, "action": "resume", **result}
 
 
 def _handle_admin_share(conn, args):
-    result = run_share(conn, args.output, args.format, args.project, args.kind, args.tag, args.session, args.since, args.limit)
-    result["db"] = args.db
-    result["profile"] = args.profile
-    return result
+    from .share import run_share
+    return _with_db_info(run_share(conn, args.output, args.format, args.project, args.kind, args.tag, args.session, args.since, args.limit), args)
 
 
 def _handle_admin_import(conn, args):
-    result = run_import(conn, args.file, args.project, args.dry_run)
-    result["db"] = args.db
-    result["profile"] = args.profile
-    return result
+    from .share import run_import
+    return _with_db_info(run_import(conn, args.file, args.project, args.dry_run), args)
 
 
 def _handle_admin_extensions(conn, args):
     """Handle admin extensions command."""
+    from .extensions import get_disabled_extensions, list_extensions
     action = args.action or "list"
 
     if action == "list":
@@ -930,8 +1295,11 @@ def _handle_admin_extensions(conn, args):
 
 
 def _handle_obs_capture(conn, args):
+    from .operations import add_observation
+    from .projects import get_active_project
+    from .sessions import get_active_session
     full_text = " ".join(args.text)
-    sentences = full_text.replace("! ", "!|").replace("? ", "?|").replace(". ", ".|").split("|")
+    sentences = _SENTENCE_SPLIT.split(full_text)
     if len(sentences) > 1 and len(sentences[0]) < 100:
         title = sentences[0].strip()
         summary = " ".join(s.strip() for s in sentences[1:]).strip()
@@ -942,11 +1310,12 @@ def _handle_obs_capture(conn, args):
             title = full_text
             summary = full_text
         else:
-            break_point = full_text.rfind(" ", 0, 80)
+            # Strip once; the title is a prefix of the summary
+            summary = full_text.strip()
+            break_point = summary.rfind(" ", 0, 80)
             if break_point == -1:
                 break_point = 80
-            title = full_text[:break_point].strip()
-            summary = full_text.strip()
+            title = summary[:break_point].rstrip()
 
     project = args.project or get_active_project(args.profile) or "general"
     tags_list = normalize_tags_list(args.tags)
@@ -956,8 +1325,9 @@ def _handle_obs_capture(conn, args):
     active_session = get_active_session(args.profile)
     session_id = active_session["session_id"] if active_session else None
 
+    tags_json, tags_text = tags_to_json_and_text(tags_list)
     obs_id = add_observation(conn, utc_now(), project, args.kind, title, summary,
-                             tags_to_json(tags_list), tags_to_text(tags_list), full_text, session_id)
+                             tags_json, tags_text, full_text, session_id)
     result = {"ok": True, "id": obs_id, "title": title, "project": project}
     if session_id:
         result["session_id"] = session_id
@@ -965,6 +1335,7 @@ def _handle_obs_capture(conn, args):
 
 
 def _handle_obs_feedback(conn, args):
+    from .feedback import apply_feedback, get_feedback_history
     full_text = " ".join(args.text)
 
     if args.history:
@@ -972,13 +1343,12 @@ def _handle_obs_feedback(conn, args):
         return {"ok": True, "observation_id": args.observation_id, "history": history}
 
     result = apply_feedback(conn, args.observation_id, full_text, auto_apply=not args.dry_run)
-    result["db"] = args.db
-    result["profile"] = args.profile
     result["dry_run"] = args.dry_run
-    return result
+    return _with_db_info(result, args)
 
 
 def _handle_review_apply(conn, args):
+    from .review_feedback import apply_review_feedback
     payload = json.loads(Path(args.file).read_text(encoding="utf-8"))
     if isinstance(payload, dict):
         items = payload.get("items")
@@ -992,13 +1362,13 @@ def _handle_review_apply(conn, args):
     if not isinstance(items, list):
         raise ValueError("review_feedback_items_must_be_array")
 
-    result = apply_review_feedback(conn, items, auto_apply=not args.dry_run)
-    result["db"] = args.db
-    result["profile"] = args.profile
-    return result
+    return _with_db_info(apply_review_feedback(conn, items, auto_apply=not args.dry_run), args)
 
 
 def _handle_tool_log(conn, args):
+    from .analytics import log_tool_call
+    from .projects import get_active_project
+    from .sessions import get_active_session
     import json
 
     tool_input = json.loads(args.input)
@@ -1015,6 +1385,9 @@ def _handle_tool_log(conn, args):
 
 
 def _handle_tool_transition(conn, args):
+    from .analytics import log_agent_transition
+    from .projects import get_active_project
+    from .sessions import get_active_session
     import json
 
     transition_input = json.loads(args.input)
@@ -1038,21 +1411,18 @@ def _handle_tool_transition(conn, args):
 
 
 def _handle_tool_stats(conn, args):
-    result = get_tool_stats(conn, args.project, args.limit)
-    result["db"] = args.db
-    result["profile"] = args.profile
-    return result
+    from .analytics import get_tool_stats
+    return _with_db_info(get_tool_stats(conn, args.project, args.limit), args)
 
 
 def _handle_tool_suggest(conn, args):
+    from .analytics import suggest_tools_for_task
     task = " ".join(args.task)
-    result = suggest_tools_for_task(conn, task, args.limit)
-    result["db"] = args.db
-    result["profile"] = args.profile
-    return result
+    return _with_db_info(suggest_tools_for_task(conn, task, args.limit), args)
 
 
 def _handle_obs_link(conn, args):
+    from .links import create_link
     link_id = create_link(conn, args.from_id, args.to_id, args.type)
     return {
         "ok": True,
@@ -1064,6 +1434,7 @@ def _handle_obs_link(conn, args):
 
 
 def _handle_obs_unlink(conn, args):
+    from .links import delete_link
     deleted = delete_link(conn, args.from_id, args.to_id, args.type)
     return {
         "ok": True,
@@ -1075,6 +1446,7 @@ def _handle_obs_unlink(conn, args):
 
 
 def _handle_obs_related(conn, args):
+    from .links import find_similar_observations, get_related_observations
     if args.suggest:
         suggestions = find_similar_observations(conn, args.id, args.limit)
         return {
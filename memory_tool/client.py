@@ -36,11 +36,10 @@ from __future__ import annotations
 import json
 import sqlite3
 from contextlib import contextmanager
-from dataclasses import asdict
 from pathlib import Path
 from typing import Any, Dict, Iterator, List, Optional, Union
 
-from .database import connect_db, ensure_fts, ensure_schema, init_db
+from .database import close_db, connect_db, ensure_current_schema, init_db
 from .models import Observation, Session, Checkpoint
 from .operations import (
     add_observation,
@@ -269,8 +268,7 @@ class MemoryClient:
         try:
             db_path = self._resolve_db_path()
             self._conn = connect_db(db_path)
-            ensure_schema(self._conn)
-            ensure_fts(self._conn)
+            ensure_current_schema(self._conn)
             return self
         except sqlite3.Error as e:
             raise ConnectionError(f"Failed to connect to database: {e}")
@@ -278,7 +276,7 @@ class MemoryClient:
     def close(self) -> None:
         """Close the database connection."""
         if self._conn:
-            self._conn.close()
+            close_db(self._conn)
             self._conn = None
 
     def init_database(self) -> "MemoryClient":
@@ -441,7 +439,7 @@ class MemoryClient:
             query: Search query
             limit: Maximum results
             offset: Result offset
-            mode: Search mode (auto, fts, like)
+            mode: Search mode (auto, fts, like, scan)
             require_tags: Tags that results must have
 
         Returns:
@@ -834,6 +832,7 @@ class MemoryClient:
         project = get_active_project(self.profile) or "general"
 
         checkpoint_id = create_checkpoint(conn, name, description, tag, session_id, project)
+        conn.commit()
         return {"id": checkpoint_id, "name": name, "project": project}
 
     def list_checkpoints(self, limit: int = 20) -> List[Dict[str, Any]]:
@@ -847,7 +846,7 @@ class MemoryClient:
         """
         conn = self._ensure_connected()
         checkpoints = list_checkpoints(conn, limit=limit)
-        return [asdict(c) for c in checkpoints]
+        return [c.to_dict() for c in checkpoints]
 
     def get_checkpoint(self, checkpoint_id: int) -> Dict[str, Any]:
         """Get checkpoint by ID.
@@ -869,8 +868,8 @@ class MemoryClient:
 
         observations = get_checkpoint_observations(conn, checkpoint_id)
         return {
-            "checkpoint": asdict(checkpoint),
-            "observations": [asdict(o) for o in observations],
+            "checkpoint": checkpoint.to_dict(),
+            "observations": [o.to_dict() for o in observations],
         }
 
     def resume_from_checkpoint(self, checkpoint_id: int) -> Dict[str, Any]:
@@ -944,6 +943,7 @@ class MemoryClient:
         """
         conn = self._ensure_connected()
         link_id = create_link(conn, from_id, to_id, link_type)
+        conn.commit()
         return {
             "id": link_id,
             "from_id": from_id,
@@ -968,7 +968,9 @@ class MemoryClient:
             True if link was deleted
         """
         conn = self._ensure_connected()
-        return delete_link(conn, from_id, to_id, link_type)
+        deleted = delete_link(conn, from_id, to_id, link_type)
+        conn.commit()
+        return deleted
 
     def get_related(
         self,
@@ -18,6 +18,7 @@ from __future__ import annotations
 # Core operations
 from .operations import (
     add_observation,
+    add_observation_many,
     run_add,
     run_get,
     run_list,
@@ -44,6 +45,7 @@ from .checkpoints import (
     list_checkpoints,
     get_checkpoint,
     get_checkpoint_observations,
+    get_checkpoint_observations_as_dicts,
     resume_from_checkpoint,
 )
 
@@ -76,6 +78,7 @@ from .analytics import (
 __all__ = [
     # Operations
     "add_observation",
+    "add_observation_many",
     "run_add",
     "run_get",
     "run_list",
@@ -96,6 +99,7 @@ __all__ = [
     "list_checkpoints",
     "get_checkpoint",
     "get_checkpoint_observations",
+    "get_checkpoint_observations_as_dicts",
     "resume_from_checkpoint",
     # Feedback
     "FeedbackIntent",
@@ -3,12 +3,16 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Optional
 
-from memory_tool.utils import utc_now
+from memory_tool.utils import tags_json_parser, utc_now
 
 if TYPE_CHECKING:
     import sqlite3
     from memory_tool.models import Checkpoint, Observation
 
+# Column lists in dataclass field order, so rows can be unpacked positionally
+_CHECKPOINT_COLUMNS = "id, timestamp, name, description, tag, session_id, observation_count, project"
+_OBSERVATION_COLUMNS = "id, timestamp, project, kind, title, summary, tags, raw, session_id"
+
 
 def create_checkpoint(
     conn: "sqlite3.Connection",
@@ -18,26 +22,24 @@ def create_checkpoint(
     session_id: Optional[int],
     project: str,
 ) -> int:
-    """Create a new checkpoint."""
+    """Create a new checkpoint.
+
+    The observation count is read inside the INSERT from the trigger-maintained
+    session_counts/project_counts tables. The caller owns the transaction and
+    is responsible for committing.
+    """
     if session_id:
-        count = conn.execute(
-            "SELECT COUNT(*) FROM observations WHERE session_id = ?",
-            (session_id,),
-        ).fetchone()[0]
+        count_sql, count_param = "SELECT n FROM session_counts WHERE session_id = ?", session_id
     else:
-        count = conn.execute(
-            "SELECT COUNT(*) FROM observations WHERE project = ?",
-            (project,),
-        ).fetchone()[0]
+        count_sql, count_param = "SELECT n FROM project_counts WHERE project = ?", project
 
     cursor = conn.execute(
-        """
+        f"""
         INSERT INTO checkpoints (timestamp, name, description, tag, session_id, observation_count, project)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
+        SELECT ?, ?, ?, ?, ?, COALESCE(({count_sql}), 0), ?
         """,
-        (utc_now(), name, description, tag, session_id, count, project),
+        (utc_now(), name, description, tag, session_id, count_param, project),
     )
-    conn.commit()
     return int(cursor.lastrowid)
 
 
@@ -49,7 +51,7 @@ def list_checkpoints(
     """List checkpoints."""
     from memory_tool.models import Checkpoint
 
-    query = "SELECT * FROM checkpoints"
+    query = f"SELECT {_CHECKPOINT_COLUMNS} FROM checkpoints"
     params: list[object] = []
     if tag:
         query += " WHERE tag = ?"
@@ -57,20 +59,7 @@ def list_checkpoints(
     query += " ORDER BY timestamp DESC LIMIT ? OFFSET 0"
     params.append(limit)
 
-    rows = conn.execute(query, params).fetchall()
-    return [
-        Checkpoint(
-            id=row["id"],
-            timestamp=row["timestamp"],
-            name=row["name"],
-            description=row["description"],
-            tag=row["tag"],
-            session_id=row["session_id"],
-            observation_count=row["observation_count"],
-            project=row["project"],
-        )
-        for row in rows
-    ]
+    return [Checkpoint(*row) for row in conn.execute(query, params)]
 
 
 def get_checkpoint(conn: "sqlite3.Connection", checkpoint_id: int) -> Optional["Checkpoint"]:
@@ -78,21 +67,12 @@ def get_checkpoint(conn: "sqlite3.Connection", checkpoint_id: int) -> Optional["
     from memory_tool.models import Checkpoint
 
     row = conn.execute(
-        "SELECT * FROM checkpoints WHERE id = ?",
+        f"SELECT {_CHECKPOINT_COLUMNS} FROM checkpoints WHERE id = ?",
         (checkpoint_id,),
     ).fetchone()
     if row is None:
         return None
-    return Checkpoint(
-        id=row["id"],
-        timestamp=row["timestamp"],
-        name=row["name"],
-        description=row["description"],
-        tag=row["tag"],
-        session_id=row["session_id"],
-        observation_count=row["observation_count"],
-        project=row["project"],
-    )
+    return Checkpoint(*row)
 
 
 def get_checkpoint_observations(
@@ -102,46 +82,75 @@ def get_checkpoint_observations(
 ) -> list["Observation"]:
     """Get observations relevant to a checkpoint."""
     from memory_tool.models import Observation
-    from memory_tool.utils import parse_tags_json
 
     checkpoint = get_checkpoint(conn, checkpoint_id)
     if not checkpoint:
         return []
 
+    rows = _checkpoint_observation_rows(conn, checkpoint, limit)
+    parse_tags = tags_json_parser()
+    return [
+        Observation(obs_id, timestamp, project, kind, title, summary, parse_tags(tags), raw, session_id)
+        for obs_id, timestamp, project, kind, title, summary, tags, raw, session_id in rows
+    ]
+
+
+def get_checkpoint_observations_as_dicts(
+    conn: "sqlite3.Connection",
+    checkpoint_id: int,
+    limit: int = 100,
+) -> list[dict]:
+    """Get observations relevant to a checkpoint as ready-to-serialize dicts."""
+    checkpoint = get_checkpoint(conn, checkpoint_id)
+    if not checkpoint:
+        return []
+    return _checkpoint_observation_dicts(conn, checkpoint, limit)
+
+
+def _checkpoint_scope(checkpoint: "Checkpoint") -> tuple[str, tuple]:
+    """WHERE clause and params selecting the observations a checkpoint covers."""
     if checkpoint.session_id:
-        rows = conn.execute(
-            """
-            SELECT * FROM observations
-            WHERE session_id = ?
-            ORDER BY timestamp DESC
-            LIMIT ?
-            """,
-            (checkpoint.session_id, limit),
-        ).fetchall()
-    else:
-        rows = conn.execute(
-            """
-            SELECT * FROM observations
-            WHERE project = ? AND timestamp >= ?
-            ORDER BY timestamp DESC
-            LIMIT ?
-            """,
-            (checkpoint.project, checkpoint.timestamp, limit),
-        ).fetchall()
+        return "session_id = ?", (checkpoint.session_id,)
+    return "project = ? AND timestamp >= ?", (checkpoint.project, checkpoint.timestamp)
 
+
+def _checkpoint_observation_rows(
+    conn: "sqlite3.Connection",
+    checkpoint: "Checkpoint",
+    limit: int,
+) -> list[tuple]:
+    where, params = _checkpoint_scope(checkpoint)
+    return conn.execute(
+        f"""
+        SELECT {_OBSERVATION_COLUMNS} FROM observations
+        WHERE {where}
+        ORDER BY timestamp DESC
+        LIMIT ?
+        """,
+        (*params, limit),
+    ).fetchall()
+
+
+def _checkpoint_observation_dicts(
+    conn: "sqlite3.Connection",
+    checkpoint: "Checkpoint",
+    limit: int,
+) -> list[dict]:
+    parse_tags = tags_json_parser()
     return [
-        Observation(
-            id=row["id"],
-            timestamp=row["timestamp"],
-            project=row["project"],
-            kind=row["kind"],
-            title=row["title"],
-            summary=row["summary"],
-            tags=parse_tags_json(row["tags"]),
-            raw=row["raw"],
-            session_id=row["session_id"] if "session_id" in row.keys() else None,
-        )
-        for row in rows
+        {
+            "id": obs_id,
+            "timestamp": timestamp,
+            "project": project,
+            "kind": kind,
+            "title": title,
+            "summary": summary,
+            "tags": parse_tags(tags),
+            "raw": raw,
+            "session_id": session_id,
+        }
+        for obs_id, timestamp, project, kind, title, summary, tags, raw, session_id
+        in _checkpoint_observation_rows(conn, checkpoint, limit)
     ]
 
 
@@ -151,7 +160,6 @@ def resume_from_checkpoint(
     profile: str,
 ) -> dict:
     """Resume work from a checkpoint."""
-    from dataclasses import asdict
 
     from memory_tool.projects import set_active_project
     from memory_tool.sessions import set_active_session
@@ -168,13 +176,19 @@ def resume_from_checkpoint(
     else:
         session_info = {"session_id": None}
 
-    observations = get_checkpoint_observations(conn, checkpoint_id, limit=20)
+    # Report how many observations the checkpoint covers (capped at 20) without
+    # materializing them; only the 5 returned ones are built, directly as dicts
+    where, params = _checkpoint_scope(checkpoint)
+    observation_count = conn.execute(
+        f"SELECT COUNT(*) FROM (SELECT 1 FROM observations WHERE {where} LIMIT 20)",
+        params,
+    ).fetchone()[0]
 
     return {
         "checkpoint_id": checkpoint_id,
         "checkpoint_name": checkpoint.name,
         "project": checkpoint.project,
         **session_info,
-        "observation_count": len(observations),
-        "recent_observations": [asdict(o) for o in observations[:5]],
+        "observation_count": observation_count,
+        "recent_observations": _checkpoint_observation_dicts(conn, checkpoint, 5),
     }
@@ -358,6 +358,7 @@ def handle_memory_command(args: argparse.Namespace, conn: "sqlite3.Connection")
         if args.link_command == "add":
             try:
                 link_id = create_link(conn, args.from_id, args.to_id, args.type)
+                conn.commit()
                 print_success(f"Created link {link_id}")
                 return 0
             except ValueError as e:
@@ -366,6 +367,7 @@ def handle_memory_command(args: argparse.Namespace, conn: "sqlite3.Connection")
 
         elif args.link_command == "delete":
             deleted = delete_link(conn, args.from_id, args.to_id, args.type)
+            conn.commit()
             if deleted:
                 print_success("Link deleted")
                 return 0
@@ -467,6 +469,7 @@ def handle_checkpoint_command(args: argparse.Namespace, conn: "sqlite3.Connectio
             session_id=args.session,
             project=get_active_project(profile) or "default",
         )
+        conn.commit()
         print_success(f"Created checkpoint {checkpoint_id}")
         return 0
 
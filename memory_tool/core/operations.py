@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import json
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Iterable, Optional
 
 from memory_tool.utils import normalize_tags_list, tags_to_json, utc_now
 
@@ -24,9 +24,15 @@ def add_observation(
 ) -> int:
     """Add a new observation to the database.
 
+    Commits unless the caller already has a transaction open, so several
+    adds (or an add plus related writes) can share one commit. No helper
+    commits or rolls back a transaction it did not open: the multi-statement
+    ones join it through ``database.write_transaction``'s savepoint.
+
     Returns:
         The ID of the newly created observation
     """
+    owns_transaction = not conn.in_transaction
     cursor = conn.execute(
         """
         INSERT INTO observations
@@ -35,10 +41,41 @@ def add_observation(
         """,
         (timestamp, project, kind, title, summary, tags, tags_text, raw, session_id),
     )
-    conn.commit()
+    if owns_transaction:
+        conn.commit()
     return int(cursor.lastrowid)
 
 
+def add_observation_many(
+    conn: "sqlite3.Connection",
+    rows: "Iterable[tuple]",
+) -> int:
+    """Insert many observations in a single statement and transaction.
+
+    Each row is ``(timestamp, project, kind, title, summary, tags, tags_text,
+    raw, session_id)`` - the same order as :func:`add_observation`.
+
+    The rows are full-text indexed by one statement after the insert rather
+    than by the per-row trigger. Inside a caller's transaction the batch runs
+    under a savepoint, so a failed batch leaves the caller's writes alone.
+
+    Returns:
+        The number of inserted observations
+    """
+    from memory_tool.database import deferred_fts_index, write_transaction
+
+    with write_transaction(conn), deferred_fts_index(conn):
+        cursor = conn.executemany(
+            """
+            INSERT INTO observations
+            (timestamp, project, kind, title, summary, tags, tags_text, raw, session_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+    return cursor.rowcount
+
+
 def run_add(
     conn: "sqlite3.Connection",
     project: str,
@@ -97,10 +134,9 @@ def run_get(conn: "sqlite3.Connection", ids: list[int]) -> list[dict]:
     if not ids:
         return []
 
-    placeholders = ",".join("?" for _ in ids)
     rows = conn.execute(
-        f"SELECT * FROM observations WHERE id IN ({placeholders})",
-        ids,
+        "SELECT * FROM observations WHERE id IN (SELECT value FROM json_each(?))",
+        (json.dumps(ids),),
     ).fetchall()
 
     return [
@@ -167,15 +203,19 @@ def run_delete(
     ids: list[int],
     dry_run: bool = True,
 ) -> dict:
-    """Delete observations by IDs."""
+    """Delete observations by IDs.
+
+    Commits unless the caller already has a transaction open.
+    """
     if not ids:
         return {"ok": False, "error": "No IDs provided"}
+    owns_transaction = not conn.in_transaction
 
     # Check what will be deleted
-    placeholders = ",".join("?" for _ in ids)
+    ids_json = json.dumps(ids)
     to_delete = conn.execute(
-        f"SELECT id, title FROM observations WHERE id IN ({placeholders})",
-        ids,
+        "SELECT id, title FROM observations WHERE id IN (SELECT value FROM json_each(?))",
+        (ids_json,),
     ).fetchall()
 
     if not to_delete:
@@ -190,10 +230,11 @@ def run_delete(
 
     if not dry_run:
         conn.execute(
-            f"DELETE FROM observations WHERE id IN ({placeholders})",
-            ids,
+            "DELETE FROM observations WHERE id IN (SELECT value FROM json_each(?))",
+            (ids_json,),
         )
-        conn.commit()
+        if owns_transaction:
+            conn.commit()
         result["deleted"] = True
 
     return result
@@ -211,7 +252,11 @@ def run_edit(
     timestamp: Optional[str] = None,
     auto_tags: bool = False,
 ) -> dict:
-    """Edit an observation."""
+    """Edit an observation.
+
+    Commits unless the caller already has a transaction open.
+    """
+    owns_transaction = not conn.in_transaction
     # Check if observation exists
     row = conn.execute(
         "SELECT * FROM observations WHERE id = ?",
@@ -266,7 +311,8 @@ def run_edit(
         f"UPDATE observations SET {', '.join(updates)} WHERE id = ?",
         params,
     )
-    conn.commit()
+    if owns_transaction:
+        conn.commit()
 
     return {
         "ok": True,
@@ -1,16 +1,27 @@
 """Database operations and schema management."""
 from __future__ import annotations
 
+import atexit
 import os
 import sqlite3
-from typing import TYPE_CHECKING
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator
 
 from .utils import ISO_FORMAT, utc_now
 
 if TYPE_CHECKING:
     pass
 
-SCHEMA_VERSION = 12
+SCHEMA_VERSION = 16
+
+# Per-row FTS indexing for new observations (see deferred_fts_index)
+_FTS_INSERT_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS observations_ai
+    AFTER INSERT ON observations BEGIN
+        INSERT INTO observations_fts(rowid, title, summary, tags_text, raw)
+        VALUES (new.id, new.title, new.summary, new.tags_text, new.raw);
+    END;
+"""
 
 
 def connect_db(path: str) -> sqlite3.Connection:
@@ -18,12 +29,58 @@ def connect_db(path: str) -> sqlite3.Connection:
     directory = os.path.dirname(path)
     if directory:
         os.makedirs(directory, exist_ok=True)
-    conn = sqlite3.connect(path)
+    # Room for every fixed statement plus the IN (?, ...) variants, so
+    # long-lived connections (daemon, MemoryClient) keep reusing prepared SQL
+    conn = sqlite3.connect(path, cached_statements=256)
     conn.row_factory = sqlite3.Row
     optimize_connection(conn)
     return conn
 
 
+def close_db(conn: sqlite3.Connection) -> None:
+    """Close a connection, first letting SQLite refresh planner statistics.
+
+    ``PRAGMA optimize`` only runs ANALYZE on tables whose queries on this
+    connection would have benefited, so it is usually a no-op.
+    """
+    try:
+        conn.execute("PRAGMA optimize")
+    except sqlite3.Error:
+        # Stats are best-effort; a locked or read-only database still closes
+        pass
+    conn.close()
+
+
+# Process-wide connections by absolute path (see shared_connection)
+_shared_connections: dict[str, sqlite3.Connection] = {}
+
+
+def shared_connection(path: str) -> sqlite3.Connection:
+    """Return a long-lived, schema-checked connection for ``path``.
+
+    The first call opens and prepares it; later calls reuse it, keeping
+    SQLite's page and statement caches warm. Callers must not close it;
+    close_shared_connections() runs at exit.
+    """
+    key = os.path.abspath(path)
+    conn = _shared_connections.get(key)
+    if conn is None:
+        conn = connect_db(path)
+        ensure_current_schema(conn)
+        _shared_connections[key] = conn
+    return conn
+
+
+def close_shared_connections() -> None:
+    """Close every connection opened by shared_connection()."""
+    while _shared_connections:
+        _, conn = _shared_connections.popitem()
+        close_db(conn)
+
+
+atexit.register(close_shared_connections)
+
+
 def optimize_connection(conn: sqlite3.Connection) -> None:
     """Apply PRAGMA optimizations for better performance.
 
@@ -33,12 +90,14 @@ def optimize_connection(conn: sqlite3.Connection) -> None:
     - Memory temp store for faster temp tables
     - 64MB cache for better query performance
     - 256MB memory-mapped I/O for faster access
+    - 5s busy timeout so writers wait for a lock instead of failing
     """
     conn.execute("PRAGMA journal_mode=WAL")          # WAL mode for better concurrency
     conn.execute("PRAGMA synchronous=NORMAL")        # Balance performance and safety
     conn.execute("PRAGMA temp_store=MEMORY")         # Store temp tables in memory
     conn.execute("PRAGMA cache_size=-64000")         # 64MB cache (negative = KB)
     conn.execute("PRAGMA mmap_size=268435456")       # 256MB memory-mapped I/O
+    conn.execute("PRAGMA busy_timeout=5000")         # Wait up to 5s for locks
 
 
 def ensure_meta_table(conn: sqlite3.Connection) -> None:
@@ -132,7 +191,7 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
 
 def migrate_schema(conn: sqlite3.Connection) -> None:
     """Migrate database to current schema version."""
-    from .utils import normalize_tags_list, tags_to_json, tags_to_text
+    from .utils import normalize_tags_list, tags_to_json_and_text
 
     version = get_schema_version(conn)
     if version > SCHEMA_VERSION:
@@ -152,13 +211,17 @@ def migrate_schema(conn: sqlite3.Connection) -> None:
             )
         except sqlite3.OperationalError:
             pass
-        rows = conn.execute("SELECT id, tags FROM observations").fetchall()
-        for row in rows:
-            tags_list = normalize_tags_list(row["tags"])
-            conn.execute(
-                "UPDATE observations SET tags = ?, tags_text = ? WHERE id = ?",
-                (tags_to_json(tags_list), tags_to_text(tags_list), row["id"]),
-            )
+        # Streamed rather than fetched whole: the scan is in rowid order and
+        # the UPDATE never changes a rowid, so every row is visited once
+        rows = conn.execute("SELECT id, tags FROM observations")
+        # One statement, one transaction (committed by ensure_schema)
+        conn.executemany(
+            "UPDATE observations SET tags = ?, tags_text = ? WHERE id = ?",
+            (
+                (*tags_to_json_and_text(normalize_tags_list(row["tags"])), row["id"])
+                for row in rows
+            ),
+        )
         rebuild_fts(conn)
         set_schema_version(conn, 2)
         version = 2
@@ -641,26 +704,144 @@ def migrate_schema(conn: sqlite3.Connection) -> None:
             """
         )
         set_schema_version(conn, 12)
+        version = 12
 
+    if version < 13:
+        # Analytics/checkpoint indexes: kind-first for tool_call stats,
+        # session-first for checkpoint and session observation listings
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_obs_kind_project_ts
+            ON observations(kind, project, timestamp DESC)
+            """
+        )
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_obs_session_ts
+            ON observations(session_id, timestamp DESC)
+            """
+        )
+        set_schema_version(conn, 13)
+        version = 13
 
-def ensure_fts(conn: sqlite3.Connection) -> bool:
-    """Ensure FTS5 virtual table and triggers exist."""
-    try:
+    if version < 14:
+        # Per-project and per-session observation counts, kept current by
+        # triggers so checkpoint creation reads one row instead of COUNT(*)
         conn.execute(
             """
-            CREATE VIRTUAL TABLE IF NOT EXISTS observations_fts
-            USING fts5(title, summary, tags_text, raw, content='observations', content_rowid='id')
+            CREATE TABLE IF NOT EXISTS project_counts (
+                project TEXT PRIMARY KEY,
+                n INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS session_counts (
+                session_id INTEGER PRIMARY KEY,
+                n INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO project_counts (project, n)
+            SELECT project, COUNT(*) FROM observations GROUP BY project
+            """
+        )
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO session_counts (session_id, n)
+            SELECT session_id, COUNT(*) FROM observations
+            WHERE session_id IS NOT NULL GROUP BY session_id
             """
         )
         conn.execute(
             """
-            CREATE TRIGGER IF NOT EXISTS observations_ai
+            CREATE TRIGGER IF NOT EXISTS observations_counts_ai
             AFTER INSERT ON observations BEGIN
-                INSERT INTO observations_fts(rowid, title, summary, tags_text, raw)
-                VALUES (new.id, new.title, new.summary, new.tags_text, new.raw);
+                INSERT INTO project_counts (project, n) VALUES (new.project, 1)
+                ON CONFLICT(project) DO UPDATE SET n = n + 1;
+                INSERT INTO session_counts (session_id, n)
+                SELECT new.session_id, 1 WHERE new.session_id IS NOT NULL
+                ON CONFLICT(session_id) DO UPDATE SET n = n + 1;
             END;
             """
         )
+        conn.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS observations_counts_ad
+            AFTER DELETE ON observations BEGIN
+                UPDATE project_counts SET n = n - 1 WHERE project = old.project;
+                UPDATE session_counts SET n = n - 1 WHERE session_id = old.session_id;
+            END;
+            """
+        )
+        conn.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS observations_counts_au
+            AFTER UPDATE OF project, session_id ON observations
+            WHEN old.project IS NOT new.project OR old.session_id IS NOT new.session_id
+            BEGIN
+                UPDATE project_counts SET n = n - 1 WHERE project = old.project;
+                UPDATE session_counts SET n = n - 1 WHERE session_id = old.session_id;
+                INSERT INTO project_counts (project, n) VALUES (new.project, 1)
+                ON CONFLICT(project) DO UPDATE SET n = n + 1;
+                INSERT INTO session_counts (session_id, n)
+                SELECT new.session_id, 1 WHERE new.session_id IS NOT NULL
+                ON CONFLICT(session_id) DO UPDATE SET n = n + 1;
+            END;
+            """
+        )
+        set_schema_version(conn, 14)
+        version = 14
+
+    if version < 15:
+        # Link and feedback lookups as covering range seeks. Incoming links
+        # get (to_id, from_id, link_type); outgoing ones already use the
+        # unique (from_id, to_id, link_type) index, which makes
+        # idx_links_from_to redundant. Feedback history reads in the
+        # index's order.
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_links_to_from_type
+            ON observation_links(to_id, from_id, link_type)
+            """
+        )
+        conn.execute("DROP INDEX IF EXISTS idx_links_to_type")
+        conn.execute("DROP INDEX IF EXISTS idx_links_from_to")
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_feedback_target_ts
+            ON feedback_log(target_observation_id, timestamp DESC, id DESC)
+            """
+        )
+        conn.execute("DROP INDEX IF EXISTS idx_feedback_target")
+        set_schema_version(conn, 15)
+        version = 15
+
+    if version < 16:
+        # Unfiltered list/timeline/export read newest-first; this lets them
+        # walk the index and stop at LIMIT instead of sorting every row
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_observations_timestamp
+            ON observations(timestamp DESC)
+            """
+        )
+        set_schema_version(conn, 16)
+
+
+def ensure_fts(conn: sqlite3.Connection) -> bool:
+    """Ensure FTS5 virtual table and triggers exist."""
+    try:
+        conn.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS observations_fts
+            USING fts5(title, summary, tags_text, raw, content='observations', content_rowid='id')
+            """
+        )
+        conn.execute(_FTS_INSERT_TRIGGER)
         conn.execute(
             """
             CREATE TRIGGER IF NOT EXISTS observations_ad
@@ -687,18 +868,100 @@ def ensure_fts(conn: sqlite3.Connection) -> bool:
         return False
 
 
+@contextmanager
+def write_transaction(conn: sqlite3.Connection) -> Iterator[None]:
+    """Run the block atomically without touching the caller's transaction.
+
+    With no transaction open, the block runs in BEGIN IMMEDIATE and is
+    committed, or rolled back if it raises. Inside a caller's transaction
+    it runs under a SAVEPOINT instead: on error only the block's own writes
+    are undone, and committing stays the caller's job.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        return
+    conn.execute("SAVEPOINT memory_tool_write")
+    try:
+        yield
+    except BaseException:
+        conn.execute("ROLLBACK TO memory_tool_write")
+        conn.execute("RELEASE memory_tool_write")
+        raise
+    conn.execute("RELEASE memory_tool_write")
+
+
+@contextmanager
+def deferred_fts_index(conn: sqlite3.Connection) -> Iterator[None]:
+    """Index observations inserted inside the block with one FTS statement.
+
+    Must run inside the caller's write transaction: the ``observations_ai``
+    trigger is dropped for the block, rows with an id above the previous
+    maximum are indexed by a single INSERT ... SELECT, and the trigger is
+    recreated. If the block raises, the caller's rollback restores it.
+    """
+    has_trigger = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'observations_ai'"
+    ).fetchone()
+    if has_trigger is None:
+        yield
+        return
+    # AUTOINCREMENT ids never go back, so new rows are exactly id > max_id
+    max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM observations").fetchone()[0]
+    conn.execute("DROP TRIGGER observations_ai")
+    yield
+    conn.execute(
+        """
+        INSERT INTO observations_fts(rowid, title, summary, tags_text, raw)
+        SELECT id, title, summary, tags_text, raw FROM observations WHERE id > ?
+        """,
+        (max_id,),
+    )
+    conn.execute(_FTS_INSERT_TRIGGER)
+
+
+def ensure_current_schema(conn: sqlite3.Connection) -> None:
+    """Run ensure_schema/ensure_fts unless this database is already current.
+
+    ``PRAGMA user_version`` is stamped with SCHEMA_VERSION once both have
+    succeeded, so steady-state connections skip the DDL after one header read.
+    """
+    if conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+        return
+    ensure_schema(conn)
+    if ensure_fts(conn):
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
 def rebuild_fts(conn: sqlite3.Connection) -> None:
-    """Rebuild FTS index."""
-    conn.execute("DROP TRIGGER IF EXISTS observations_ai")
-    conn.execute("DROP TRIGGER IF EXISTS observations_ad")
-    conn.execute("DROP TRIGGER IF EXISTS observations_au")
-    conn.execute("DROP TABLE IF EXISTS observations_fts")
-    ensure_fts(conn)
+    """Rebuild FTS index in place from the observations table.
+
+    Uses the FTS5 'rebuild' command, so the virtual table and its triggers
+    are kept and the index is repopulated from the content table.
+    """
+    if not ensure_fts(conn):
+        return
+    conn.execute("INSERT INTO observations_fts(observations_fts) VALUES('rebuild')")
+    # A large rebuild is flushed as several segments; merge them into one
+    conn.execute("INSERT INTO observations_fts(observations_fts) VALUES('optimize')")
+    conn.commit()
 
 
 def init_db(path: str) -> None:
     """Initialize database."""
     conn = connect_db(path)
-    ensure_schema(conn)
-    ensure_fts(conn)
-    conn.close()
+    ensure_current_schema(conn)
+    # Seed sqlite_stat1 so the planner starts from real row distributions;
+    # analysis_limit bounds the cost on a large existing database
+    conn.execute("PRAGMA analysis_limit=1000")
+    conn.execute("ANALYZE")
+    # Merge FTS segments left behind by per-row trigger inserts into one b-tree
+    if ensure_fts(conn):
+        conn.execute("INSERT INTO observations_fts(observations_fts) VALUES('optimize')")
+    conn.commit()
+    close_db(conn)
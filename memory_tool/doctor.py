@@ -122,16 +122,16 @@ def check_python_stdlib() -> Tuple[bool, str, Optional[str]]:
 
 @register_check(
     name="sqlite_version",
-    description="SQLite version >= 3.25",
+    description="SQLite version >= 3.35",
     category="sqlite",
     priority="P0",
 )
 def check_sqlite_version() -> Tuple[bool, str, Optional[str]]:
     """Check SQLite version."""
     version = sqlite3.sqlite_version_info
-    ok = version[0] > 3 or (version[0] == 3 and version[1] >= 25)
+    ok = version[0] > 3 or (version[0] == 3 and version[1] >= 35)
     message = f"SQLite {version[0]}.{version[1]}.{version[2]}"
-    suggestion = None if ok else "Upgrade SQLite to 3.25 or later"
+    suggestion = None if ok else "Upgrade SQLite to 3.35 or later (needed for INSERT ... RETURNING)"
     return ok, message, suggestion
 
 
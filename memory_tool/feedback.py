@@ -10,6 +10,24 @@ from .utils import utc_now
 if TYPE_CHECKING:
     import sqlite3
 
+# Intent markers at the start of the feedback text, classified in one
+# anchored match; the named group that matched is the action. Delete is
+# tried first, then correct, then supplement.
+_INTENT_RE = re.compile(
+    r"^(?:"
+    r"(?P<delete>删除|delete|remove|drop|标记删除|mark.*delete)"
+    r"|(?P<correct>(?:修正|correct|修改|update|改为|should be|应该是|实际是|actually)[:：])"
+    r"|(?P<supplement>(?:补充|supplement|add|添加|补充说明|note|还需要|also|additionally)[:：])"
+    r")",
+    re.IGNORECASE,
+)
+# Unmarked text that reads like a correction ("X instead of Y", "is A not B")
+_CORRECTION_HINT_RE = re.compile(r"而非|instead of|not\s+\w+|is\s+\w+\s+not")
+_TITLE_SUMMARY_RES = (
+    re.compile(r"title[:：]\s*(.+?)(?:\s+summary[:：]|\s+内容[:：]|$)", re.IGNORECASE | re.DOTALL),
+    re.compile(r"标题[:：]\s*(.+?)(?:\s+summary[:：]|\s+内容[:：]|\s+正文[:：]|$)", re.IGNORECASE | re.DOTALL),
+)
+
 
 @dataclass
 class FeedbackIntent:
@@ -29,56 +47,19 @@ def parse_feedback_intent(feedback_text: str) -> FeedbackIntent:
     - "删除" / "delete this"
     """
     text = feedback_text.strip()
-    lower_text = text.lower()
 
-    # Check for delete intent
-    delete_patterns = [
-        r"^删除", r"^delete", r"^remove", r"^drop",
-        r"^标记删除", r"^mark.*delete",
-    ]
-    for pattern in delete_patterns:
-        if re.search(pattern, lower_text, re.IGNORECASE):
+    match = _INTENT_RE.match(text)
+    if match:
+        if match.lastgroup == "delete":
             return FeedbackIntent(action="delete")
-
-    # Check for correct intent
-    correct_patterns = [
-        r"^修正[:：]",
-        r"^correct[:：]",
-        r"^修改[:：]",
-        r"^update[:：]",
-        r"^改为[:：]",
-        r"^should be[:：]",
-        r"^应该是[:：]",
-        r"^实际是[:：]",
-        r"^actually[:：]",
-    ]
-    for pattern in correct_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            content = text[match.end():].strip()
+        content = text[match.end():].strip()
+        if match.lastgroup == "correct":
             return _parse_correction_content(content)
-
-    # Check for supplement intent
-    supplement_patterns = [
-        r"^补充[:：]",
-        r"^supplement[:：]",
-        r"^add[:：]",
-        r"^添加[:：]",
-        r"^补充说明[:：]",
-        r"^note[:：]",
-        r"^还需要[:：]",
-        r"^also[:：]",
-        r"^additionally[:：]",
-    ]
-    for pattern in supplement_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            content = text[match.end():].strip()
-            return FeedbackIntent(action="supplement", supplement_text=content)
+        return FeedbackIntent(action="supplement", supplement_text=content)
 
     # Default: try to infer from content
     # If it contains "而非" / "instead of" / "not", treat as correction
-    if re.search(r"而非|instead of|not\s+\w+|is\s+\w+\s+not", text):
+    if _CORRECTION_HINT_RE.search(text):
         return _parse_correction_content(text)
 
     # Default to supplement for any other text
@@ -94,13 +75,8 @@ def _parse_correction_content(content: str) -> FeedbackIntent:
     new_summary = None
 
     # Check for title/summary separation patterns
-    title_summary_patterns = [
-        r"title[:：]\s*(.+?)(?:\s+summary[:：]|\s+内容[:：]|$)",
-        r"标题[:：]\s*(.+?)(?:\s+summary[:：]|\s+内容[:：]|\s+正文[:：]|$)",
-    ]
-
-    for pattern in title_summary_patterns:
-        match = re.search(pattern, content, re.IGNORECASE | re.DOTALL)
+    for pattern in _TITLE_SUMMARY_RES:
+        match = pattern.search(content)
         if match:
             new_title = match.group(1).strip()
             # Try to extract summary if present
@@ -132,79 +108,84 @@ def apply_feedback(
     Returns:
         Result dictionary with action taken
     """
+    from .database import write_transaction
     from .operations import run_delete, run_edit, run_get
 
-    # First check if observation exists
-    results = run_get(conn, [observation_id])
-    if not results:
-        raise ValueError(f"Observation {observation_id} not found")
-
-    observation = results[0]
-    intent = parse_feedback_intent(feedback_text)
-
-    result = {
-        "ok": True,
-        "observation_id": observation_id,
-        "action": intent.action,
-        "feedback_text": feedback_text,
-    }
-
-    if intent.action == "delete":
-        if auto_apply:
-            run_delete(conn, [observation_id], dry_run=False)
-            result["deleted"] = True
-        record_feedback(conn, observation_id, "delete", feedback_text)
-
-    elif intent.action == "correct":
-        if auto_apply:
-            # Prepare updates
-            title = intent.new_title
-            summary = intent.new_summary
-            # If only summary provided, keep current title
-            if title is None and summary is not None:
-                title = observation.title
-            run_edit(
-                conn,
-                observation_id,
-                project=None,
-                kind=None,
-                title=title,
-                summary=summary,
-                tags=None,
-                raw=None,
-                timestamp=None,
-                auto_tags=False,
-            )
-            result["updated"] = True
-        record_feedback(conn, observation_id, "correct", feedback_text)
-
-    elif intent.action == "supplement":
-        if auto_apply and intent.supplement_text:
-            # Append supplement to summary
-            new_summary = observation.summary
-            if new_summary:
-                new_summary += "\n\n[补充] " + intent.supplement_text
-            else:
-                new_summary = "[补充] " + intent.supplement_text
-
-            run_edit(
-                conn,
-                observation_id,
-                project=None,
-                kind=None,
-                title=None,
-                summary=new_summary,
-                tags=None,
-                raw=None,
-                timestamp=None,
-                auto_tags=False,
-            )
-            result["updated"] = True
-        record_feedback(conn, observation_id, "supplement", feedback_text)
+    # One write transaction for the lookup, the edit and its feedback_log
+    # row: no edit without its record. Inside a caller's transaction this
+    # is a savepoint, so a failure leaves the caller's other writes alone
+    with write_transaction(conn):
+        # First check if observation exists
+        results = run_get(conn, [observation_id])
+        if not results:
+            raise ValueError(f"Observation {observation_id} not found")
+
+        observation = results[0]
+        intent = parse_feedback_intent(feedback_text)
+
+        result = {
+            "ok": True,
+            "observation_id": observation_id,
+            "action": intent.action,
+            "feedback_text": feedback_text,
+        }
 
-    else:
-        result["action"] = "unknown"
-        result["message"] = "Could not determine feedback intent"
+        if intent.action == "delete":
+            if auto_apply:
+                run_delete(conn, [observation_id], dry_run=False)
+                result["deleted"] = True
+            record_feedback(conn, observation_id, "delete", feedback_text)
+
+        elif intent.action == "correct":
+            if auto_apply:
+                # Prepare updates
+                title = intent.new_title
+                summary = intent.new_summary
+                # If only summary provided, keep current title
+                if title is None and summary is not None:
+                    title = observation.title
+                run_edit(
+                    conn,
+                    observation_id,
+                    project=None,
+                    kind=None,
+                    title=title,
+                    summary=summary,
+                    tags=None,
+                    raw=None,
+                    timestamp=None,
+                    auto_tags=False,
+                )
+                result["updated"] = True
+            record_feedback(conn, observation_id, "correct", feedback_text)
+
+        elif intent.action == "supplement":
+            if auto_apply and intent.supplement_text:
+                # Append supplement to summary
+                new_summary = observation.summary
+                if new_summary:
+                    new_summary += "\n\n[补充] " + intent.supplement_text
+                else:
+                    new_summary = "[补充] " + intent.supplement_text
+
+                run_edit(
+                    conn,
+                    observation_id,
+                    project=None,
+                    kind=None,
+                    title=None,
+                    summary=new_summary,
+                    tags=None,
+                    raw=None,
+                    timestamp=None,
+                    auto_tags=False,
+                )
+                result["updated"] = True
+            record_feedback(conn, observation_id, "supplement", feedback_text)
+
+        else:
+            result["action"] = "unknown"
+            result["message"] = "Could not determine feedback intent"
 
     return result
 
@@ -217,6 +198,8 @@ def record_feedback(
 ) -> int:
     """Record feedback to the feedback_log table.
 
+    Does not commit; the caller controls the transaction.
+
     Returns:
         The ID of the newly created feedback record
     """
@@ -224,11 +207,11 @@ def record_feedback(
         """
         INSERT INTO feedback_log (target_observation_id, action_type, feedback_text, timestamp)
         VALUES (?, ?, ?, ?)
+        RETURNING id
         """,
         (observation_id, action_type, feedback_text, utc_now()),
     )
-    conn.commit()
-    return int(cursor.lastrowid)
+    return int(cursor.fetchone()[0])
 
 
 def get_feedback_history(
@@ -2,16 +2,23 @@
 """Ingest helper for the memory tool.
 
 Reads raw input (stdin or --raw-file), derives title/summary if missing,
-then calls memory_tool.py add with optional auto-tagging/LLM hook.
+then runs the memory tool's add command in-process with optional
+auto-tagging/LLM hook.
 """
 from __future__ import annotations
 
 import argparse
-import subprocess
+import re
 import sys
 from pathlib import Path
 
-MEMORY_TOOL = Path(__file__).resolve().parent / "memory_tool.py"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from memory_tool.cli import main as memory_main
+
+# Characters of the raw body examined when deriving title/summary
+DERIVE_HEAD_CHARS = 4096
+_NON_SPACE_RE = re.compile(r"\S")
 
 
 def read_raw(args: argparse.Namespace) -> str:
@@ -23,14 +30,17 @@ def read_raw(args: argparse.Namespace) -> str:
 
 
 def derive_title_summary(raw: str, title: str | None, summary: str | None) -> tuple[str, str]:
-    raw = raw.strip()
-    first_line = raw.splitlines()[0] if raw else "Observation"
+    # Title and summary only need the start of the body; look at a bounded
+    # head instead of stripping and splitting a possibly large payload.
+    start = _NON_SPACE_RE.search(raw)
+    head = raw[start.start():start.start() + DERIVE_HEAD_CHARS].rstrip() if start else ""
+    first_line = head.splitlines()[0] if head else "Observation"
     derived_title = title or first_line[:80]
-    derived_summary = summary or (raw[:240] if raw else derived_title)
+    derived_summary = summary or (head[:240] if head else derived_title)
     return derived_title, derived_summary
 
 
-def main() -> None:
+def main() -> int:
     parser = argparse.ArgumentParser(description="Ingest helper for memory tool")
     parser.add_argument("--profile", choices=["codex", "claude", "shared"], default="codex")
     parser.add_argument("--db", default=None, help="SQLite database path (overrides --profile)")
@@ -47,27 +57,27 @@ def main() -> None:
     raw = read_raw(args)
     title, summary = derive_title_summary(raw, args.title, args.summary)
 
-    cmd = [sys.executable, str(MEMORY_TOOL)]
+    argv: list[str] = []
     if args.db:
-        cmd += ["--db", args.db]
+        argv += ["--db", args.db]
     else:
-        cmd += ["--profile", args.profile]
-    cmd += ["add", "--title", title, "--summary", summary]
+        argv += ["--profile", args.profile]
+    argv += ["observation", "add", "--title", title, "--summary", summary]
     if args.project:
-        cmd += ["--project", args.project]
+        argv += ["--project", args.project]
     if args.kind:
-        cmd += ["--kind", args.kind]
+        argv += ["--kind", args.kind]
     if args.tags:
-        cmd += ["--tags", args.tags]
+        argv += ["--tags", args.tags]
     if raw:
-        cmd += ["--raw", raw]
+        argv += ["--raw", raw]
     if args.auto_tags:
-        cmd += ["--auto-tags"]
+        argv += ["--auto-tags"]
     if args.llm_hook:
-        cmd += ["--llm-hook", args.llm_hook]
+        argv += ["--llm-hook", args.llm_hook]
 
-    subprocess.run(cmd, check=False)
+    return memory_main(argv)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
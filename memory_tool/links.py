@@ -1,12 +1,12 @@
 """Observation link management for graph relationships."""
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Literal, Optional
+import heapq
+import json
+import sqlite3
+from typing import Literal, Optional
 
-from .utils import utc_now
-
-if TYPE_CHECKING:
-    import sqlite3
+from .utils import parse_tags_json, quote_fts_query, utc_now
 
 LinkType = Literal["related", "child", "parent", "refines"]
 
@@ -19,6 +19,8 @@ def create_link(
 ) -> int:
     """Create a link between two observations.
 
+    Does not commit; the caller controls the transaction.
+
     Args:
         conn: Database connection
         from_id: Source observation ID
@@ -31,26 +33,25 @@ def create_link(
     Raises:
         ValueError: If either observation doesn't exist
     """
-    # Verify both observations exist
+    # The existence check is part of the insert: no row comes back when
+    # either id is missing (or both are the same observation)
     row = conn.execute(
-        "SELECT COUNT(*) as count FROM observations WHERE id IN (?, ?)",
-        (from_id, to_id),
-    ).fetchone()
-    if row["count"] != 2:
-        raise ValueError(f"One or both observations ({from_id}, {to_id}) not found")
-
-    cursor = conn.execute(
         """
         INSERT INTO observation_links (from_id, to_id, link_type, created_at)
-        VALUES (?, ?, ?, ?)
+        SELECT :from_id, :to_id, :link_type, :created_at
+        WHERE :from_id != :to_id
+          AND EXISTS (SELECT 1 FROM observations WHERE id = :from_id)
+          AND EXISTS (SELECT 1 FROM observations WHERE id = :to_id)
         ON CONFLICT(from_id, to_id, link_type) DO UPDATE SET
             link_type = excluded.link_type,
             created_at = excluded.created_at
+        RETURNING id
         """,
-        (from_id, to_id, link_type, utc_now()),
-    )
-    conn.commit()
-    return int(cursor.lastrowid)
+        {"from_id": from_id, "to_id": to_id, "link_type": link_type, "created_at": utc_now()},
+    ).fetchone()
+    if row is None:
+        raise ValueError(f"One or both observations ({from_id}, {to_id}) not found")
+    return int(row[0])
 
 
 def delete_link(
@@ -61,6 +62,8 @@ def delete_link(
 ) -> bool:
     """Delete a link between observations.
 
+    Does not commit; the caller controls the transaction.
+
     Args:
         conn: Database connection
         from_id: Source observation ID
@@ -86,7 +89,6 @@ def delete_link(
             """,
             (from_id, to_id),
         )
-    conn.commit()
     return cursor.rowcount > 0
 
 
@@ -109,33 +111,26 @@ def get_related_observations(
     """
     from .operations import normalize_rows
 
-    if link_type:
-        rows = conn.execute(
-            """
-            SELECT o.*, l.link_type, l.from_id as link_source
-            FROM observation_links l
-            JOIN observations o ON (l.to_id = o.id OR l.from_id = o.id)
-            WHERE (l.from_id = ? OR l.to_id = ?)
-              AND l.link_type = ?
-              AND o.id != ?
-            ORDER BY l.created_at DESC
-            LIMIT ?
-            """,
-            (observation_id, observation_id, link_type, observation_id, limit),
-        ).fetchall()
-    else:
-        rows = conn.execute(
-            """
-            SELECT o.*, l.link_type, l.from_id as link_source
-            FROM observation_links l
-            JOIN observations o ON (l.to_id = o.id OR l.from_id = o.id)
-            WHERE (l.from_id = ? OR l.to_id = ?)
-              AND o.id != ?
-            ORDER BY l.created_at DESC
-            LIMIT ?
-            """,
-            (observation_id, observation_id, observation_id, limit),
-        ).fetchall()
+    # Each half seeks its own links index; self-links are never created
+    # (create_link needs two distinct existing ids), so o.id != ? is implied.
+    type_filter = " AND l.link_type = ?" if link_type else ""
+    type_params = (link_type,) if link_type else ()
+    rows = conn.execute(
+        f"""
+        SELECT o.*, l.link_type, l.created_at AS link_created_at, 'outgoing' AS direction
+        FROM observation_links l
+        JOIN observations o ON o.id = l.to_id
+        WHERE l.from_id = ?{type_filter}
+        UNION ALL
+        SELECT o.*, l.link_type, l.created_at AS link_created_at, 'incoming' AS direction
+        FROM observation_links l
+        JOIN observations o ON o.id = l.from_id
+        WHERE l.to_id = ?{type_filter}
+        ORDER BY link_created_at DESC
+        LIMIT ?
+        """,
+        (observation_id, *type_params, observation_id, *type_params, limit),
+    ).fetchall()
 
     results = []
     seen_ids = set()
@@ -155,7 +150,7 @@ def get_related_observations(
             "summary": row["summary"],
             "tags": row["tags"],
             "link_type": row["link_type"],
-            "direction": "outgoing" if row["link_source"] == observation_id else "incoming",
+            "direction": row["direction"],
         })
 
     return results
@@ -180,7 +175,7 @@ def find_similar_observations(
     """
     # Get the source observation
     row = conn.execute(
-        "SELECT title, summary, tags, tags_text FROM observations WHERE id = ?",
+        "SELECT title, summary, tags FROM observations WHERE id = ?",
         (observation_id,),
     ).fetchone()
 
@@ -189,57 +184,94 @@ def find_similar_observations(
 
     source_title = row["title"].lower()
     source_summary = row["summary"].lower()
-    source_tags_text = row["tags_text"].lower() if row["tags_text"] else ""
-    source_tags = set(source_tags_text.split()) if source_tags_text else set()
-
-    # Find candidates using broader criteria
-    candidates = conn.execute(
-        """
-        SELECT id, title, summary, tags, tags_text, timestamp, project, kind
-        FROM observations
-        WHERE id != ?
-        LIMIT 100
-        """,
-        (observation_id,),
-    ).fetchall()
+    # Whole stored tags, matching what json_each yields on the candidate side
+    source_tags = {str(tag).lower() for tag in parse_tags_json(row["tags"])}
+    source_words = frozenset(source_title.split())
+    # Only longer, meaningful summary words count
+    source_summary_words = frozenset(word for word in source_summary.split() if len(word) > 4)
+
+    # Only rows sharing a tag or word with the source can reach the threshold
+    terms = source_tags | source_words | source_summary_words
+    if not terms:
+        return []
+    candidates = _similar_candidates(conn, observation_id, terms, source_tags)
 
     scored = []
     for cand in candidates:
-        score = 0.0
-
-        cand_tags_text = (cand["tags_text"] or "").lower()
-        cand_tags = set(cand_tags_text.split())
-
-        # Tag similarity (weighted heavily)
-        if source_tags and cand_tags:
-            shared_tags = source_tags & cand_tags
-            score += len(shared_tags) * 25  # 25 points per shared tag
+        # Tag similarity (weighted heavily): 25 points per shared tag
+        score = cand["shared_tags"] * 25.0
 
-        # Title word overlap
-        source_words = set(source_title.split())
-        cand_words = set(cand["title"].lower().split())
-        shared_words = source_words & cand_words
-        if source_words:
-            score += len(shared_words) * 10  # 10 points per shared word
+        # Title word overlap: 10 points per shared word
+        score += len(source_words & set(cand["title"].lower().split())) * 10
 
-        # Summary keyword overlap (simpler approach)
-        cand_summary_lower = cand["summary"].lower()
-        for word in source_summary.split():
-            if len(word) > 4 and word in cand_summary_lower:  # Only longer, meaningful words
-                score += 3
+        # Summary keyword overlap: 3 points per shared word
+        score += len(source_summary_words & set(cand["summary"].lower().split())) * 3
 
         if score >= 20:  # Minimum threshold
-            scored.append((score, {
-                "id": cand["id"],
-                "title": cand["title"],
-                "summary": cand["summary"],
-                "project": cand["project"],
-                "kind": cand["kind"],
-                "similarity_score": round(score, 1),
-            }))
+            scored.append((score, cand))
 
-    scored.sort(key=lambda x: -x[0])
-    return [s[1] for s in scored[:limit]]
+    # Partial top-k selection; ties keep candidate (bm25) order
+    top = heapq.nlargest(limit, scored, key=lambda x: x[0])
+    if not top:
+        return []
+
+    # project/kind are only needed for the rows actually returned
+    placeholders = ",".join("?" for _ in top)
+    extra = {
+        r["id"]: r
+        for r in conn.execute(
+            f"SELECT id, project, kind FROM observations WHERE id IN ({placeholders})",
+            [cand["id"] for _, cand in top],
+        )
+    }
+    return [
+        {
+            "id": cand["id"],
+            "title": cand["title"],
+            "summary": cand["summary"],
+            "project": extra[cand["id"]]["project"],
+            "kind": extra[cand["id"]]["kind"],
+            "similarity_score": round(score, 1),
+        }
+        for score, cand in top
+    ]
+
+
+def _similar_candidates(
+    conn: sqlite3.Connection,
+    observation_id: int,
+    terms: set[str],
+    source_tags: set[str],
+) -> list:
+    """Fetch up to 100 candidates matching any of ``terms``, best bm25 first.
+
+    Each row carries ``shared_tags``, the number of its tags (from the JSON
+    ``tags`` column, via json_each) that are in ``source_tags``. Falls back
+    to scanning the first 100 observations without FTS5.
+    """
+    columns = """o.id, o.title, o.summary, (
+        SELECT COUNT(DISTINCT lower(t.value))
+        FROM json_each(CASE WHEN json_valid(o.tags) THEN o.tags ELSE '[]' END) t
+        WHERE lower(t.value) IN (SELECT value FROM json_each(:source_tags))
+    ) AS shared_tags"""
+    params = {"observation_id": observation_id, "source_tags": json.dumps(sorted(source_tags))}
+    try:
+        return conn.execute(
+            f"""
+            SELECT {columns}
+            FROM observations_fts
+            JOIN observations o ON o.id = observations_fts.rowid
+            WHERE observations_fts MATCH :query AND o.id != :observation_id
+            ORDER BY bm25(observations_fts)
+            LIMIT 100
+            """,
+            {**params, "query": " OR ".join(quote_fts_query(term) for term in sorted(terms))},
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return conn.execute(
+            f"SELECT {columns} FROM observations o WHERE o.id != :observation_id LIMIT 100",
+            params,
+        ).fetchall()
 
 
 def get_links_for_observations(
@@ -260,41 +292,30 @@ def get_links_for_observations(
     if not observation_ids:
         return {}
 
-    placeholders = ",".join("?" for _ in observation_ids)
+    # One index range scan per direction instead of OR-ed IN lists
     rows = conn.execute(
-        f"""
-        SELECT l.from_id, l.to_id, l.link_type, o.title, o.id as related_id
+        """
+        SELECT l.from_id AS anchor_id, l.to_id AS related_id, l.link_type, o.title,
+               'outgoing' AS direction
         FROM observation_links l
-        JOIN observations o ON (
-            (l.from_id IN ({placeholders}) AND o.id = l.to_id)
-            OR (l.to_id IN ({placeholders}) AND o.id = l.from_id)
-        )
-        WHERE l.from_id IN ({placeholders}) OR l.to_id IN ({placeholders})
+        JOIN observations o ON o.id = l.to_id
+        WHERE l.from_id IN (SELECT value FROM json_each(:ids))
+        UNION ALL
+        SELECT l.to_id, l.from_id, l.link_type, o.title, 'incoming'
+        FROM observation_links l
+        JOIN observations o ON o.id = l.from_id
+        WHERE l.to_id IN (SELECT value FROM json_each(:ids))
         """,
-        observation_ids * 4,
+        {"ids": json.dumps(observation_ids)},
     ).fetchall()
 
     result: dict[int, list[dict]] = {obs_id: [] for obs_id in observation_ids}
-
     for row in rows:
-        from_id = row["from_id"]
-        to_id = row["to_id"]
-        related_id = row["related_id"]
-
-        # Determine which observation this link belongs to
-        if from_id in result:
-            result[from_id].append({
-                "id": related_id,
-                "title": row["title"],
-                "link_type": row["link_type"],
-                "direction": "outgoing",
-            })
-        if to_id in result:
-            result[to_id].append({
-                "id": related_id,
-                "title": row["title"],
-                "link_type": row["link_type"],
-                "direction": "incoming",
-            })
+        result[row["anchor_id"]].append({
+            "id": row["related_id"],
+            "title": row["title"],
+            "link_type": row["link_type"],
+            "direction": row["direction"],
+        })
 
     return result
@@ -18,7 +18,17 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 # Re-export everything from the package for backwards compatibility
 from memory_tool.models import Checkpoint, Observation, Session
-from memory_tool.database import connect_db, ensure_fts, ensure_schema, init_db, SCHEMA_VERSION
+from memory_tool.database import (
+    SCHEMA_VERSION,
+    close_db,
+    close_shared_connections,
+    connect_db,
+    ensure_current_schema,
+    ensure_fts,
+    ensure_schema,
+    init_db,
+    shared_connection,
+)
 from memory_tool.utils import (
     auto_tags_from_text,
     normalize_tags_list,
@@ -28,6 +38,7 @@ from memory_tool.utils import (
     tags_to_json,
     tags_to_text,
     utc_now,
+    freeze_now,
     DEFAULT_PROFILE,
     PROFILE_CHOICES,
     PROFILE_DB_PATHS,
@@ -40,6 +51,7 @@ from memory_tool.operations import (
     run_get,
     run_list,
     run_export,
+    iter_export,
     run_edit,
     run_delete,
     run_clean,
@@ -72,10 +84,14 @@ __all__ = [
     "Checkpoint",
     "Observation",
     "Session",
+    "close_db",
+    "close_shared_connections",
     "connect_db",
+    "ensure_current_schema",
     "ensure_fts",
     "ensure_schema",
     "init_db",
+    "shared_connection",
     "SCHEMA_VERSION",
     "auto_tags_from_text",
     "normalize_tags_list",
@@ -85,6 +101,7 @@ __all__ = [
     "tags_to_json",
     "tags_to_text",
     "utc_now",
+    "freeze_now",
     "DEFAULT_PROFILE",
     "PROFILE_CHOICES",
     "PROFILE_DB_PATHS",
@@ -95,6 +112,7 @@ __all__ = [
     "run_get",
     "run_list",
     "run_export",
+    "iter_export",
     "run_edit",
     "run_delete",
     "run_clean",
@@ -1,11 +1,15 @@
 """Data models for the memory tool."""
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
+# dataclass(slots=...) is 3.10+; on 3.9 the models fall back to a __dict__
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_SLOTS)
 class Observation:
     id: int
     timestamp: str
@@ -17,8 +21,22 @@ class Observation:
     raw: str
     session_id: Optional[int] = None
 
-
-@dataclass
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary without the deep copy done by asdict()."""
+        return {
+            "id": self.id,
+            "timestamp": self.timestamp,
+            "project": self.project,
+            "kind": self.kind,
+            "title": self.title,
+            "summary": self.summary,
+            "tags": list(self.tags),
+            "raw": self.raw,
+            "session_id": self.session_id,
+        }
+
+
+@dataclass(**_SLOTS)
 class Session:
     id: int
     start_time: str
@@ -29,8 +47,21 @@ class Session:
     summary: str
     status: str
 
-
-@dataclass
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary without the deep copy done by asdict()."""
+        return {
+            "id": self.id,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "project": self.project,
+            "working_dir": self.working_dir,
+            "agent_type": self.agent_type,
+            "summary": self.summary,
+            "status": self.status,
+        }
+
+
+@dataclass(**_SLOTS)
 class Checkpoint:
     id: int
     timestamp: str
@@ -41,6 +72,19 @@ class Checkpoint:
     observation_count: int
     project: str
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary without the deep copy done by asdict()."""
+        return {
+            "id": self.id,
+            "timestamp": self.timestamp,
+            "name": self.name,
+            "description": self.description,
+            "tag": self.tag,
+            "session_id": self.session_id,
+            "observation_count": self.observation_count,
+            "project": self.project,
+        }
+
 
 @dataclass
 class Feedback:
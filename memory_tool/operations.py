@@ -1,10 +1,11 @@
 """CRUD operations for observations."""
 from __future__ import annotations
 
+import json
+import re
 import sqlite3
-from dataclasses import asdict
 from datetime import datetime, timedelta, timezone
-from typing import TYPE_CHECKING, Iterable, List, Optional
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional
 
 if TYPE_CHECKING:
     from .models import Observation
@@ -13,20 +14,24 @@ if TYPE_CHECKING:
 def normalize_rows(rows: Iterable[sqlite3.Row]) -> List["Observation"]:
     """Convert database rows to Observation objects."""
     from .models import Observation
-    from .utils import parse_tags_json
+    from .utils import tags_json_parser
+    parse_tags = tags_json_parser()
     results: List[Observation] = []
+    has_session = None
     for row in rows:
+        if has_session is None:
+            has_session = "session_id" in row.keys()
         results.append(
             Observation(
-                id=row["id"],
-                timestamp=row["timestamp"],
-                project=row["project"],
-                kind=row["kind"],
-                title=row["title"],
-                summary=row["summary"],
-                tags=parse_tags_json(row["tags"]),
-                raw=row["raw"],
-                session_id=row["session_id"] if "session_id" in row.keys() else None,
+                row["id"],
+                row["timestamp"],
+                row["project"],
+                row["kind"],
+                row["title"],
+                row["summary"],
+                parse_tags(row["tags"]),
+                row["raw"],
+                row["session_id"] if has_session else None,
             )
         )
     return results
@@ -44,7 +49,14 @@ def add_observation(
     raw: str,
     session_id: Optional[int] = None,
 ) -> int:
-    """Add a new observation and return its ID."""
+    """Add a new observation and return its ID.
+
+    Commits unless the caller already has a transaction open, so several
+    adds (or an add plus related writes) can share one commit. No helper
+    commits or rolls back a transaction it did not open: the multi-statement
+    ones join it through ``database.write_transaction``'s savepoint.
+    """
+    owns_transaction = not conn.in_transaction
     cursor = conn.execute(
         """
         INSERT INTO observations (timestamp, project, kind, title, summary, tags, tags_text, raw, session_id)
@@ -52,10 +64,33 @@ def add_observation(
         """,
         (timestamp, project, kind, title, summary, tags, tags_text, raw, session_id),
     )
-    conn.commit()
+    if owns_transaction:
+        conn.commit()
     return int(cursor.lastrowid)
 
 
+def add_observation_many(conn: sqlite3.Connection, rows: Iterable[tuple]) -> int:
+    """Add many observations in one transaction and return the inserted count.
+
+    Each row is ``(timestamp, project, kind, title, summary, tags, tags_text,
+    raw, session_id)`` - the same order as :func:`add_observation`. The
+    rows are full-text indexed by one statement after the insert rather
+    than by the per-row trigger. Inside a caller's transaction the batch runs
+    under a savepoint, so a failed batch leaves the caller's writes alone.
+    """
+    from .database import deferred_fts_index, write_transaction
+
+    with write_transaction(conn), deferred_fts_index(conn):
+        cursor = conn.executemany(
+            """
+            INSERT INTO observations (timestamp, project, kind, title, summary, tags, tags_text, raw, session_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+    return cursor.rowcount
+
+
 def _normalize_required_tags(required_tags: Optional[List[str]]) -> List[str]:
     from .utils import normalize_tags_list
     if not required_tags:
@@ -79,61 +114,76 @@ def run_search(
     quote: bool = False,
     required_tags: Optional[List[str]] = None,
 ) -> List[dict]:
-    """Search observations using FTS or LIKE."""
-    from .utils import parse_tags_json, quote_fts_query
+    """Search observations using FTS, with a LIKE scan as the last resort.
+
+    Modes:
+        auto: MATCH the query as FTS5 syntax; if it does not parse, MATCH
+            each word as a quoted prefix instead.
+        fts: MATCH the query as given; errors propagate.
+        like: MATCH each word as a quoted prefix ("word"*), which covers the
+            usual "starts with" intent through the index.
+        scan: infix ``LIKE '%query%'`` over title, summary, tags and raw.
+            This reads every row; use it only when infix matching is needed.
+
+    Every mode except ``fts`` falls back to the scan when FTS5 is unavailable.
+    """
+    from .utils import quote_fts_query, tags_json_parser
     query = query.strip()
     if not query:
         return []
     required = _normalize_required_tags(required_tags)
-    fts_query = quote_fts_query(query) if quote else query
-    if mode != "like":
+
+    if mode == "like":
+        match_queries = [_prefix_fts_query(query)]
+    elif mode == "scan":
+        match_queries = []
+    else:
+        match_queries = [quote_fts_query(query) if quote else query]
+        if mode == "auto":
+            match_queries.append(_prefix_fts_query(query))
+
+    rows = None
+    for match_query in match_queries:
         try:
+            # Rank inside the FTS index first, then read only the page of
+            # observations rows that is returned
             rows = conn.execute(
                 """
-                SELECT observations.id, observations.timestamp, observations.project,
-                       observations.kind, observations.title, observations.summary,
-                       observations.tags, observations.raw, observations.session_id,
-                       bm25(observations_fts) AS score
-                FROM observations_fts
-                JOIN observations ON observations_fts.rowid = observations.id
-                WHERE observations_fts MATCH ?
-                ORDER BY score
-                LIMIT ? OFFSET ?
+                WITH hits AS (
+                    SELECT rowid, bm25(observations_fts) AS score
+                    FROM observations_fts
+                    WHERE observations_fts MATCH ?
+                    ORDER BY score
+                    LIMIT ? OFFSET ?
+                )
+                SELECT o.id, o.timestamp, o.project, o.kind, o.title, o.summary,
+                       o.tags, o.session_id, hits.score
+                FROM hits
+                JOIN observations o ON o.id = hits.rowid
+                ORDER BY hits.score
                 """,
-                (fts_query, limit, offset),
+                (match_query, limit, offset),
             ).fetchall()
-            fts_results = [
-                {
-                    "id": row["id"],
-                    "timestamp": row["timestamp"],
-                    "project": row["project"],
-                    "kind": row["kind"],
-                    "title": row["title"],
-                    "summary": row["summary"],
-                    "tags": parse_tags_json(row["tags"]),
-                    "score": row["score"],
-                    "session_id": row["session_id"] if "session_id" in row.keys() else None,
-                }
-                for row in rows
-            ]
-            if not required:
-                return fts_results
-            return [item for item in fts_results if _matches_required_tags(item.get("tags", []), required)]
+            break
         except sqlite3.OperationalError:
             if mode == "fts":
                 raise
 
-    rows = conn.execute(
-        """
-        SELECT id, timestamp, project, kind, title, summary, tags, raw, session_id
-        FROM observations
-        WHERE title LIKE ? OR summary LIKE ? OR tags_text LIKE ? OR raw LIKE ?
-        ORDER BY id DESC
-        LIMIT ? OFFSET ?
-        """,
-        tuple([f"%{query}%"] * 4 + [limit, offset]),
-    ).fetchall()
-    like_results = [
+    if rows is None:
+        rows = conn.execute(
+            """
+            SELECT id, timestamp, project, kind, title, summary, tags, session_id,
+                   NULL AS score
+            FROM observations
+            WHERE title LIKE ? OR summary LIKE ? OR tags_text LIKE ? OR raw LIKE ?
+            ORDER BY id DESC
+            LIMIT ? OFFSET ?
+            """,
+            tuple([f"%{query}%"] * 4 + [limit, offset]),
+        ).fetchall()
+
+    parse_tags = tags_json_parser()
+    results = [
         {
             "id": row["id"],
             "timestamp": row["timestamp"],
@@ -141,15 +191,37 @@ def run_search(
             "kind": row["kind"],
             "title": row["title"],
             "summary": row["summary"],
-            "tags": parse_tags_json(row["tags"]),
-            "score": None,
-            "session_id": row["session_id"] if "session_id" in row.keys() else None,
+            "tags": parse_tags(row["tags"]),
+            "score": row["score"],
+            "session_id": row["session_id"],
         }
         for row in rows
     ]
     if not required:
-        return like_results
-    return [item for item in like_results if _matches_required_tags(item.get("tags", []), required)]
+        return results
+    return [item for item in results if _matches_required_tags(item.get("tags", []), required)]
+
+
+def _prefix_fts_query(query: str) -> str:
+    """Turn free text into an FTS5 query matching every word as a prefix."""
+    from .utils import quote_fts_query
+    return " ".join(f"{quote_fts_query(word)}*" for word in query.split())
+
+
+# Exactly ISO_FORMAT ("%Y-%m-%dT%H:%M:%SZ"); offsets and date-only strings are rejected
+_ISO_UTC_RE = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z")
+
+
+def _parse_utc(timestamp: str) -> datetime:
+    """Parse a stored ``ISO_FORMAT`` timestamp as an aware UTC datetime.
+
+    The shape is checked up front, as strptime(ISO_FORMAT) did, then
+    fromisoformat (a C parser, far cheaper than strptime) reads it without
+    the trailing ``Z``, which it only accepts from 3.11.
+    """
+    if not _ISO_UTC_RE.fullmatch(timestamp):
+        raise ValueError(f"Timestamp {timestamp!r} is not in %Y-%m-%dT%H:%M:%SZ format")
+    return datetime.fromisoformat(timestamp[:-1]).replace(tzinfo=timezone.utc)
 
 
 def run_timeline(
@@ -170,7 +242,7 @@ def run_timeline(
         ).fetchone()
         if row is None:
             raise ValueError(f"Observation {around_id} not found")
-        ts = datetime.strptime(row["timestamp"], ISO_FORMAT).replace(tzinfo=timezone.utc)
+        ts = _parse_utc(row["timestamp"])
         start_dt = ts - timedelta(minutes=window_minutes)
         end_dt = ts + timedelta(minutes=window_minutes)
         start = start_dt.strftime(ISO_FORMAT)
@@ -197,7 +269,6 @@ def run_timeline(
 def generate_visual_timeline(observations: List["Observation"], group_by: Optional[str] = None) -> str:
     """Generate a visual ASCII timeline of observations."""
     from collections import defaultdict
-    from .utils import ISO_FORMAT
     if not observations:
         return "No observations to display."
 
@@ -237,7 +308,7 @@ def generate_visual_timeline(observations: List["Observation"], group_by: Option
     else:
         prev_time: Optional[datetime] = None
         for obs in sorted_obs:
-            obs_time = datetime.strptime(obs.timestamp, ISO_FORMAT).replace(tzinfo=timezone.utc)
+            obs_time = _parse_utc(obs.timestamp)
             time_str = obs.timestamp[11:16]
 
             if prev_time:
@@ -258,11 +329,14 @@ def generate_visual_timeline(observations: List["Observation"], group_by: Option
 
 
 def run_get(conn: sqlite3.Connection, ids: List[int]) -> List["Observation"]:
-    """Get observations by IDs."""
-    placeholders = ",".join("?" for _ in ids)
+    """Get observations by IDs.
+
+    The ids are bound as one JSON array, so the statement text is the same
+    for any number of ids and is not limited by SQLite's parameter cap.
+    """
     rows = conn.execute(
-        f"SELECT * FROM observations WHERE id IN ({placeholders}) ORDER BY timestamp DESC",
-        ids,
+        "SELECT * FROM observations WHERE id IN (SELECT value FROM json_each(?)) ORDER BY timestamp DESC",
+        (json.dumps(ids),),
     ).fetchall()
     return normalize_rows(rows)
 
@@ -287,7 +361,22 @@ def run_list(
 
 def run_export(conn: sqlite3.Connection, limit: int, offset: int = 0) -> List["Observation"]:
     """Export observations."""
-    return run_list(conn, limit, offset=offset)
+    return list(iter_export(conn, limit, offset=offset))
+
+
+def iter_export(conn: sqlite3.Connection, limit: int, offset: int = 0) -> Iterator["Observation"]:
+    """Yield observations for export one at a time, newest first."""
+    from .models import Observation
+    from .utils import parse_tags_json
+    cursor = conn.execute(
+        """
+        SELECT id, timestamp, project, kind, title, summary, tags, raw, session_id
+        FROM observations ORDER BY timestamp DESC LIMIT ? OFFSET ?
+        """,
+        (limit, offset),
+    )
+    for obs_id, timestamp, project, kind, title, summary, tags, raw, session_id in cursor:
+        yield Observation(obs_id, timestamp, project, kind, title, summary, parse_tags_json(tags), raw, session_id)
 
 
 def run_edit(
@@ -302,8 +391,12 @@ def run_edit(
     timestamp: Optional[str],
     auto_tags: bool,
 ) -> dict:
-    """Edit an observation."""
+    """Edit an observation.
+
+    Commits unless the caller already has a transaction open.
+    """
     from .utils import auto_tags_from_text, normalize_tags_list, normalize_text, tags_to_json, tags_to_text
+    owns_transaction = not conn.in_transaction
     row = conn.execute("SELECT * FROM observations WHERE id = ?", (obs_id,)).fetchone()
     if row is None:
         raise ValueError(f"Observation {obs_id} not found")
@@ -342,30 +435,40 @@ def run_edit(
     set_clause = ", ".join(f"{column} = ?" for column in updates.keys())
     params = list(updates.values()) + [obs_id]
     conn.execute(f"UPDATE observations SET {set_clause} WHERE id = ?", params)
-    conn.commit()
+    if owns_transaction:
+        conn.commit()
 
     updated = conn.execute("SELECT * FROM observations WHERE id = ?", (obs_id,)).fetchone()
     result = normalize_rows([updated])[0]
-    return {"ok": True, "updated": asdict(result)}
+    return {"ok": True, "updated": result.to_dict()}
 
 
 def run_delete(conn: sqlite3.Connection, ids: List[int], dry_run: bool) -> dict:
-    """Delete observations by IDs."""
+    """Delete observations by IDs.
+
+    Commits (or, for a dry run, rolls back) unless the caller already has a
+    transaction open.
+    """
     if not ids:
         raise ValueError("No ids provided")
-    placeholders = ",".join("?" for _ in ids)
+    owns_transaction = not conn.in_transaction
+    ids_json = json.dumps(ids)
     matched = int(
         conn.execute(
-            f"SELECT COUNT(*) AS c FROM observations WHERE id IN ({placeholders})",
-            ids,
+            "SELECT COUNT(*) AS c FROM observations WHERE id IN (SELECT value FROM json_each(?))",
+            (ids_json,),
         ).fetchone()["c"]
     )
     deleted = 0
     if not dry_run and matched:
-        cursor = conn.execute(f"DELETE FROM observations WHERE id IN ({placeholders})", ids)
+        cursor = conn.execute(
+            "DELETE FROM observations WHERE id IN (SELECT value FROM json_each(?))",
+            (ids_json,),
+        )
         deleted = int(cursor.rowcount)
-        conn.commit()
-    elif dry_run:
+        if owns_transaction:
+            conn.commit()
+    elif dry_run and owns_transaction:
         conn.rollback()
     return {
         "ok": True,
@@ -410,11 +513,13 @@ def run_clean(
 
     tag_values = normalize_tags_list(tag) if tag else []
     if tag_values:
-        tag_filters: List[str] = []
-        for item in tag_values:
-            tag_filters.append("tags_text LIKE ?")
-            params.append(f"%{item}%")
-        filters.append(f"({' OR '.join(tag_filters)})")
+        # Whole-tag match on the stored JSON list; LIKE on tags_text also
+        # matched substrings (py -> pytest)
+        filters.append(
+            "EXISTS (SELECT 1 FROM json_each(CASE WHEN json_valid(tags) THEN tags END) t"
+            " WHERE t.value IN (SELECT value FROM json_each(?)))"
+        )
+        params.append(json.dumps(tag_values))
 
     if not filters and not delete_all:
         raise ValueError("Refusing to clean without filters. Use --all to delete everything.")
@@ -450,7 +555,6 @@ def run_clean(
 
 def run_manage(conn: sqlite3.Connection, action: str, limit: int) -> dict:
     """Manage and inspect database."""
-    from .utils import parse_tags_json
     if action == "stats":
         row = conn.execute(
             """
@@ -512,18 +616,34 @@ def run_manage(conn: sqlite3.Connection, action: str, limit: int) -> dict:
         }
 
     if action == "tags":
-        counts: dict[str, int] = {}
-        for row in conn.execute("SELECT tags FROM observations").fetchall():
-            for tag in parse_tags_json(row["tags"]):
-                counts[tag] = counts.get(tag, 0) + 1
-        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        # Counted by json_each in SQLite; rows whose tags are not a JSON
+        # array contribute nothing, as with parse_tags_json
+        rows = conn.execute(
+            """
+            SELECT t.value AS tag, COUNT(*) AS count
+            FROM observations o,
+                 json_each(CASE WHEN json_valid(o.tags)
+                           THEN CASE json_type(o.tags) WHEN 'array' THEN o.tags END
+                           END) t
+            GROUP BY t.value
+            ORDER BY count DESC, tag ASC
+            LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
         return {
             "ok": True,
             "action": action,
-            "tags": [{"tag": tag, "count": count} for tag, count in ranked],
+            "tags": [{"tag": row["tag"], "count": row["count"]} for row in rows],
         }
 
     if action == "vacuum":
+        try:
+            # Merge FTS segments first so VACUUM reclaims the freed pages
+            conn.execute("INSERT INTO observations_fts(observations_fts) VALUES('optimize')")
+            conn.commit()
+        except sqlite3.OperationalError:
+            pass
         conn.execute("VACUUM")
         return {"ok": True, "action": action, "vacuumed": True}
 
@@ -22,24 +22,20 @@ def get_project_file_path(profile: str) -> str:
 
 def get_active_project(profile: str) -> str | None:
     """Get the currently active project."""
-    project_file = get_project_file_path(profile)
-    if not os.path.exists(project_file):
-        return None
-    try:
-        with open(project_file, "r", encoding="utf-8") as f:
-            return f.read().strip() or None
-    except IOError:
-        return None
+    from .utils import read_state_file
+    return read_state_file(get_project_file_path(profile), lambda text: text.strip() or None)
 
 
 def set_active_project(profile: str, project: str) -> None:
     """Set the active project."""
+    from .utils import forget_state_file
     project_file = get_project_file_path(profile)
     project_dir = os.path.dirname(project_file)
     if project_dir:
         os.makedirs(project_dir, exist_ok=True)
     with open(project_file, "w", encoding="utf-8") as f:
         f.write(project)
+    forget_state_file(project_file)
 
 
 def list_projects(conn: sqlite3.Connection, limit: int) -> list[dict]:
@@ -120,3 +116,20 @@ def get_project_stats(conn: sqlite3.Connection, project: str) -> dict:
         "top_tags": [{"tag": t, "count": c} for t, c in top_tags],
         "recent_sessions": sessions,
     }
+
+
+def archive_project(conn: sqlite3.Connection, project: str) -> str:
+    """Rename a project to ``archived/<project>`` and return the new name.
+
+    Observations and sessions are renamed in one BEGIN IMMEDIATE transaction:
+    the write lock is taken before the first UPDATE, so a concurrent writer
+    makes us wait on busy_timeout up front instead of failing halfway. Inside
+    a caller's transaction the renames run under a savepoint and are left
+    for the caller to commit.
+    """
+    from .database import write_transaction
+    new_name = f"archived/{project}"
+    with write_transaction(conn):
+        conn.execute("UPDATE observations SET project = ? WHERE project = ?", (new_name, project))
+        conn.execute("UPDATE sessions SET project = ? WHERE project = ?", (new_name, project))
+    return new_name
@@ -6,7 +6,7 @@ import os
 from typing import TYPE_CHECKING, Optional
 
 from .database import ensure_schema
-from .utils import utc_now
+from .utils import forget_state_file, read_state_file, utc_now
 
 if TYPE_CHECKING:
     import sqlite3
@@ -27,14 +27,8 @@ def get_session_file_path(profile: str) -> str:
 
 def get_active_session(profile: str) -> Optional[dict]:
     """Get the currently active session from the session file."""
-    session_file = get_session_file_path(profile)
-    if not os.path.exists(session_file):
-        return None
-    try:
-        with open(session_file, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return None
+    session = read_state_file(get_session_file_path(profile), json.loads)
+    return dict(session) if isinstance(session, dict) else session
 
 
 def set_active_session(profile: str, session_id: int, db_path: str) -> None:
@@ -45,6 +39,7 @@ def set_active_session(profile: str, session_id: int, db_path: str) -> None:
         os.makedirs(session_dir, exist_ok=True)
     with open(session_file, "w", encoding="utf-8") as f:
         json.dump({"session_id": session_id, "db_path": db_path}, f)
+    forget_state_file(session_file)
 
 
 def clear_active_session(profile: str) -> None:
@@ -52,6 +47,7 @@ def clear_active_session(profile: str) -> None:
     session_file = get_session_file_path(profile)
     if os.path.exists(session_file):
         os.remove(session_file)
+    forget_state_file(session_file)
 
 
 def start_session(
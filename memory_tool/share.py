@@ -57,10 +57,9 @@ def run_share(
     session_ids = {obs.session_id for obs in observations if obs.session_id}
     sessions: list[Session] = []
     if session_ids:
-        placeholders = ",".join("?" for _ in session_ids)
         session_rows = conn.execute(
-            f"SELECT * FROM sessions WHERE id IN ({placeholders})",
-            list(session_ids),
+            "SELECT * FROM sessions WHERE id IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(session_ids)),),
         ).fetchall()
         sessions = [
             Session(
@@ -91,8 +90,8 @@ def run_share(
             "observation_count": len(observations),
             "session_count": len(sessions),
         },
-        "sessions": [s.__dict__ for s in sessions],
-        "observations": [obs.__dict__ for obs in observations],
+        "sessions": [s.to_dict() for s in sessions],
+        "observations": [obs.to_dict() for obs in observations],
     }
 
     output_path = os.path.expanduser(output_path)
@@ -238,22 +237,31 @@ def run_import(
     project_override: Optional[str],
     dry_run: bool,
 ) -> dict:
-    """Import a shared context bundle."""
+    """Import a shared context bundle.
+
+    The bundle is written in one BEGIN IMMEDIATE transaction, with the
+    observations inserted by a single executemany and full-text indexed
+    afterwards, so an import either lands completely or not at all. Inside a
+    caller's transaction it runs under a savepoint and leaves the commit to
+    the caller; a failed import then undoes only its own rows.
+    """
     import json
-    from .utils import tags_to_json, tags_to_text
+    from .database import deferred_fts_index, write_transaction
+    from .utils import tags_to_json_and_text
 
     file_path = os.path.expanduser(file_path)
     with open(file_path, "r", encoding="utf-8") as f:
         bundle = json.load(f)
 
-    imported_observations = 0
-    imported_sessions = 0
-    session_id_map: dict[int, int] = {}
+    sessions = bundle.get("sessions") or []
+    observations = bundle.get("observations") or []
+    imported_sessions = len(sessions)
+    imported_observations = len(observations)
 
-    if "sessions" in bundle and bundle["sessions"]:
-        for session_data in bundle["sessions"]:
-            old_id = session_data["id"]
-            if not dry_run:
+    if not dry_run:
+        with write_transaction(conn):
+            session_id_map: dict[int, int] = {}
+            for session_data in sessions:
                 cursor = conn.execute(
                     """
                     INSERT INTO sessions (start_time, end_time, project, working_dir, agent_type, summary, status)
@@ -269,39 +277,28 @@ def run_import(
                         session_data.get("status", "completed"),
                     ),
                 )
-                new_id = int(cursor.lastrowid)
-                session_id_map[old_id] = new_id
-            imported_sessions += 1
-
-    if "observations" in bundle and bundle["observations"]:
-        for obs_data in bundle["observations"]:
-            project = project_override or obs_data["project"]
-            old_session_id = obs_data.get("session_id")
-            new_session_id = session_id_map.get(old_session_id) if old_session_id else None
+                session_id_map[session_data["id"]] = int(cursor.lastrowid)
 
-            if not dry_run:
-                tags_list = obs_data.get("tags", [])
-                conn.execute(
+            with deferred_fts_index(conn):
+                conn.executemany(
                     """
                     INSERT INTO observations (timestamp, project, kind, title, summary, tags, tags_text, raw, session_id)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                     """,
                     (
-                        obs_data["timestamp"],
-                        project,
-                        obs_data["kind"],
-                        obs_data["title"],
-                        obs_data["summary"],
-                        tags_to_json(tags_list),
-                        tags_to_text(tags_list),
-                        obs_data.get("raw", ""),
-                        new_session_id,
+                        (
+                            obs_data["timestamp"],
+                            project_override or obs_data["project"],
+                            obs_data["kind"],
+                            obs_data["title"],
+                            obs_data["summary"],
+                            *tags_to_json_and_text(obs_data.get("tags", [])),
+                            obs_data.get("raw", ""),
+                            session_id_map.get(obs_data["session_id"]) if obs_data.get("session_id") else None,
+                        )
+                        for obs_data in observations
                     ),
                 )
-            imported_observations += 1
-
-    if not dry_run:
-        conn.commit()
 
     return {
         "ok": True,
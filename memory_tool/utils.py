@@ -1,13 +1,19 @@
 """Utility functions for the memory tool."""
 from __future__ import annotations
 
+import heapq
 import json
 import os
 import re
 import shlex
 import subprocess
-from datetime import datetime, timezone
-from typing import List
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, List, Optional
+
+from . import _fastjson
 
 ISO_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
 
@@ -21,19 +27,107 @@ DEFAULT_PROFILE = os.environ.get("MEMORY_PROFILE", "codex").strip().lower() or "
 if DEFAULT_PROFILE not in PROFILE_DB_PATHS:
     DEFAULT_PROFILE = "codex"
 
-TAG_BLACKLIST = {
+TAG_BLACKLIST = frozenset({
     "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "from",
     "has", "have", "if", "in", "into", "is", "it", "its", "of", "on",
     "or", "over", "that", "the", "their", "this", "to", "under", "was",
     "were", "with",
-}
+})
 
 DEFAULT_LLM_HOOK = os.environ.get("MEMORY_LLM_HOOK", "")
+# Seconds a hook may run before it is killed and the observation is stored as-is
+try:
+    LLM_HOOK_TIMEOUT = float(os.environ.get("MEMORY_LLM_HOOK_TIMEOUT", "30"))
+except ValueError:
+    LLM_HOOK_TIMEOUT = 30.0
+
+# Tokenizer patterns used on every add and auto-tag pass
+_WS_RE = re.compile(r"\s+")
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9\-]{2,}")
+_STEM_SUFFIXES = ("ing", "ed", "es", "s")
+# FTS5 barewords: ASCII alphanumerics, underscore, SUB and any non-ASCII char
+_FTS_BAREWORD_RE = re.compile(r"[A-Za-z0-9_\x1a\u0080-\U0010ffff]+")
+_FTS_OPERATORS = frozenset({"AND", "OR", "NOT", "NEAR"})
+
+
+# Parsed profile state files (active session/project) for the current
+# state_file_memo() block; None outside one, where every read hits the file
+_state_file_memo: ContextVar[Optional[dict[str, Any]]] = ContextVar("state_file_memo", default=None)
+
+
+@contextmanager
+def state_file_memo() -> Iterator[None]:
+    """Reuse each state file's parse for the duration of the block.
+
+    Meant to span one command dispatch: another process may rewrite the
+    file at any time, so nothing is reused across commands in a long-lived
+    process (daemon, viewer). Scoped to the current thread/context.
+    """
+    token = _state_file_memo.set({})
+    try:
+        yield
+    finally:
+        _state_file_memo.reset(token)
+
+
+def read_state_file(path: str, parse: Callable[[str], Any]) -> Optional[Any]:
+    """Read and parse a small state file.
+
+    Returns None when the file is missing, unreadable or ``parse`` raises
+    ValueError. Inside ``state_file_memo`` the first result is reused;
+    writers in this process should call ``forget_state_file``.
+    """
+    memo = _state_file_memo.get()
+    if memo is not None and path in memo:
+        return memo[path]
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            value = parse(f.read())
+    except (OSError, ValueError):
+        value = None
+    if memo is not None:
+        memo[path] = value
+    return value
+
+
+def forget_state_file(path: str) -> None:
+    """Drop the memoized parse of a state file after writing or removing it."""
+    memo = _state_file_memo.get()
+    if memo is not None:
+        memo.pop(path, None)
+
+
+# ISO_FORMAT has one-second resolution, so the formatted string is reused
+# until the second changes; freeze_now() pins one value for a batch
+_utc_now_cache: tuple[int, str] = (-1, "")
+_frozen_now: ContextVar[Optional[str]] = ContextVar("frozen_now", default=None)
 
 
 def utc_now() -> str:
     """Get current UTC time in ISO format."""
-    return datetime.now(timezone.utc).strftime(ISO_FORMAT)
+    global _utc_now_cache
+    frozen = _frozen_now.get()
+    if frozen is not None:
+        return frozen
+    seconds = int(time.time())
+    cached = _utc_now_cache
+    if cached[0] != seconds:
+        cached = _utc_now_cache = (seconds, time.strftime(ISO_FORMAT, time.gmtime(seconds)))
+    return cached[1]
+
+
+@contextmanager
+def freeze_now(value: Optional[str] = None) -> Iterator[str]:
+    """Make utc_now() return one timestamp for the duration of the block.
+
+    Rows written in the same logical operation then share ``created_at``.
+    Defaults to the current time; scoped to the current thread/context.
+    """
+    token = _frozen_now.set(value or utc_now())
+    try:
+        yield _frozen_now.get()
+    finally:
+        _frozen_now.reset(token)
 
 
 def resolve_db_path(profile: str, explicit_db: str | None) -> str:
@@ -48,15 +142,26 @@ def resolve_db_path(profile: str, explicit_db: str | None) -> str:
 
 def normalize_text(value: str) -> str:
     """Normalize whitespace in text."""
-    return re.sub(r"\s+", " ", value).strip()
+    return _WS_RE.sub(" ", value).strip()
 
 
 def stem_token(token: str) -> str:
-    """Simple stemming for common suffixes."""
-    for suffix in ("ing", "ed", "es", "s"):
-        if token.endswith(suffix) and len(token) > len(suffix) + 2:
-            return token[: -len(suffix)]
-    return token
+    """Simple stemming for common suffixes (ing, ed, es, s).
+
+    A suffix is removed only if more than two characters remain.
+    """
+    # One C-level check rejects most tokens; the suffixes end in distinct
+    # letters, so at most one branch below can apply
+    n = len(token)
+    if n < 4 or not token.endswith(_STEM_SUFFIXES):
+        return token
+    if token[-1] == "s":
+        if n > 4 and token.endswith("es"):
+            return token[:-2]
+        return token[:-1]
+    if token[-1] == "g":
+        return token[:-3] if n > 5 else token
+    return token[:-2] if n > 4 else token
 
 
 def normalize_tags_list(tags: object) -> List[str]:
@@ -67,36 +172,26 @@ def normalize_tags_list(tags: object) -> List[str]:
         candidates = [str(tag) for tag in tags]
     elif isinstance(tags, str):
         raw = tags.strip()
-        if not raw:
+        if not raw or raw == "[]":
+            # Empty input and the stored empty tag list skip json.loads
             return []
         if raw.startswith("["):
             try:
-                loaded = json.loads(raw)
+                loaded = _fastjson.loads(raw)
                 if isinstance(loaded, list):
                     candidates = [str(tag) for tag in loaded]
                 else:
                     candidates = [str(loaded)]
-            except json.JSONDecodeError:
+            except _fastjson.JSONDecodeError:
                 candidates = [part.strip() for part in raw.split(",")]
         else:
             candidates = [part.strip() for part in raw.split(",")]
     else:
         candidates = [str(tags)]
 
-    normalized: List[str] = []
-    seen: set[str] = set()
-    for token in candidates:
-        clean = normalize_text(token).lower()
-        if not clean:
-            continue
-        clean = stem_token(clean)
-        if clean in TAG_BLACKLIST:
-            continue
-        if clean in seen:
-            continue
-        seen.add(clean)
-        normalized.append(clean)
-    return normalized
+    # One generator pipeline; dict.fromkeys dedupes while keeping first-seen order
+    stemmed = (stem_token(normalize_text(token).lower()) for token in candidates)
+    return list(dict.fromkeys(tag for tag in stemmed if tag and tag not in TAG_BLACKLIST))
 
 
 def tags_to_json(tags_list: List[str]) -> str:
@@ -109,31 +204,52 @@ def tags_to_text(tags_list: List[str]) -> str:
     return " ".join(tags_list)
 
 
+def tags_to_json_and_text(tags_list: List[str]) -> tuple[str, str]:
+    """Convert tags list to its (JSON, space-separated text) column pair."""
+    return json.dumps(tags_list, ensure_ascii=False), " ".join(tags_list)
+
+
 def parse_tags_json(tags_json: str) -> List[str]:
     """Parse JSON string to tags list."""
-    if not tags_json:
+    if not tags_json or tags_json == "[]":
         return []
     try:
-        result = json.loads(tags_json)
+        # orjson when installed; stored tags are written already normalized,
+        # so they are only decoded here, never re-normalized
+        result = _fastjson.loads(tags_json)
         if isinstance(result, list):
             return result
         return []
-    except json.JSONDecodeError:
+    except _fastjson.JSONDecodeError:
         return []
 
 
+def tags_json_parser() -> Callable[[str], List[str]]:
+    """Return a parse_tags_json that decodes each distinct tags string once.
+
+    Rows read together mostly share a handful of tag sets, so this turns
+    one json.loads per row into one per distinct value. Each call returns
+    a fresh list so callers may mutate their copy.
+    """
+    parsed: dict[str, List[str]] = {}
+
+    def parse(tags_json: str) -> List[str]:
+        tags = parsed.get(tags_json)
+        if tags is None:
+            tags = parsed[tags_json] = parse_tags_json(tags_json)
+        return list(tags)
+
+    return parse
+
+
 def auto_tags_from_text(title: str, summary: str, limit: int = 6) -> List[str]:
     """Auto-generate tags from title and summary."""
-    text = normalize_text(f"{title} {summary}").lower()
-    tokens = re.findall(r"[a-z0-9][a-z0-9\\-]{2,}", text)
-    counts: dict[str, int] = {}
-    for token in tokens:
-        token = stem_token(token)
-        if token in TAG_BLACKLIST:
-            continue
-        counts[token] = counts.get(token, 0) + 1
-    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
-    return [tag for tag, _ in ranked[:limit]]
+    # Tokens never contain whitespace, so the text is not normalized first
+    tokens = _TOKEN_RE.findall(f"{title} {summary}".lower())
+    counts = Counter(token for token in map(stem_token, tokens) if token not in TAG_BLACKLIST)
+    # Top `limit` by count, ties alphabetical, without sorting every token
+    ranked = heapq.nsmallest(limit, counts.items(), key=lambda item: (-item[1], item[0]))
+    return [tag for tag, _ in ranked]
 
 
 def parse_ids(ids_raw: str) -> List[int]:
@@ -149,8 +265,16 @@ def parse_ids(ids_raw: str) -> List[int]:
     return unique_ids
 
 
-def run_llm_hook(payload: dict, hook_cmd: str | List[str]) -> dict:
-    """Run LLM hook command and return result."""
+def run_llm_hook(
+    payload: dict,
+    hook_cmd: str | List[str],
+    timeout: Optional[float] = None,
+) -> dict:
+    """Run LLM hook command and return result.
+
+    A hook that outlives ``timeout`` (default LLM_HOOK_TIMEOUT) is killed and
+    treated like a failed one, so a stuck hook cannot hang ``add``.
+    """
     if not hook_cmd:
         return {}
     if isinstance(hook_cmd, str):
@@ -167,20 +291,30 @@ def run_llm_hook(payload: dict, hook_cmd: str | List[str]) -> dict:
             cmd_parts,
             input=json.dumps(payload).encode("utf-8"),
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=LLM_HOOK_TIMEOUT if timeout is None else timeout,
             check=False,
         )
-    except OSError:
+    except (OSError, subprocess.TimeoutExpired):
         return {}
     if proc.returncode != 0:
         return {}
     try:
-        return json.loads(proc.stdout.decode("utf-8"))
-    except json.JSONDecodeError:
+        # Both json and orjson take the bytes directly; no separate decode pass
+        return _fastjson.loads(proc.stdout)
+    except ValueError:
         return {}
 
 
 def quote_fts_query(query: str) -> str:
-    """Quote query for safe FTS parsing."""
+    """Quote query for safe FTS parsing.
+
+    A lone FTS5 bareword is already a valid MATCH expression and is returned
+    as-is; anything else becomes a single quoted phrase.
+    """
+    if not query:
+        return ""
+    if _FTS_BAREWORD_RE.fullmatch(query) and query not in _FTS_OPERATORS:
+        return query
     escaped = query.replace('"', '""')
     return f'"{escaped}"'
@@ -12,7 +12,7 @@ from urllib.parse import parse_qs, urlparse
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 # Import from the new package structure
-from memory_tool.database import ensure_fts, ensure_schema, connect_db
+from memory_tool.database import ensure_current_schema, ensure_fts, ensure_schema, connect_db, shared_connection
 from memory_tool.utils import resolve_db_path
 from memory_tool.operations import normalize_rows, run_search, run_timeline, run_get, run_list
 from memory_tool.sessions import list_sessions
@@ -30,12 +30,13 @@ mem.resolve_db_path = resolve_db_path
 mem.connect_db = connect_db
 mem.ensure_schema = ensure_schema
 mem.ensure_fts = ensure_fts
+mem.ensure_current_schema = ensure_current_schema
+mem.shared_connection = shared_connection
 mem.run_search = run_search
 mem.run_timeline = run_timeline
 mem.run_get = run_get
 mem.run_list = run_list
 mem.normalize_rows = normalize_rows
-mem.asdict = lambda x: x.__dict__ if hasattr(x, '__dict__') else x
 mem.list_sessions = list_sessions
 
 HTML = """<!doctype html>
@@ -694,11 +695,9 @@ class Handler(BaseHTTPRequestHandler):
 
         if parsed.path.startswith("/api/"):
             query = parse_qs(parsed.query)
-            conn = None
             try:
-                conn = mem.connect_db(self.db_path)
-                mem.ensure_schema(conn)
-                mem.ensure_fts(conn)
+                # One connection for the server's lifetime (requests are serial)
+                conn = mem.shared_connection(self.db_path)
 
                 if parsed.path == "/api/search":
                     search_query = query.get("query", [""])[0]
@@ -734,36 +733,33 @@ class Handler(BaseHTTPRequestHandler):
                         limit,
                         offset=offset,
                     )
-                    self._json({"ok": True, "results": [mem.asdict(r) for r in results]})
+                    self._json({"ok": True, "results": [r.to_dict() for r in results]})
                     return
 
                 if parsed.path == "/api/get":
                     ids_raw = query.get("ids", [""])[0]
                     ids = [int(part.strip()) for part in ids_raw.split(",") if part.strip()]
                     results = mem.run_get(conn, ids)
-                    self._json({"ok": True, "results": [mem.asdict(r) for r in results]})
+                    self._json({"ok": True, "results": [r.to_dict() for r in results]})
                     return
 
                 if parsed.path == "/api/list":
                     limit = int(query.get("limit", ["20"])[0])
                     offset = int(query.get("offset", ["0"])[0])
                     results = mem.run_list(conn, limit, offset=offset)
-                    self._json({"ok": True, "results": [mem.asdict(r) for r in results]})
+                    self._json({"ok": True, "results": [r.to_dict() for r in results]})
                     return
 
                 if parsed.path == "/api/sessions":
                     limit = int(query.get("limit", ["20"])[0])
                     offset = int(query.get("offset", ["0"])[0])
                     sessions = mem.list_sessions(conn, limit=limit, offset=offset)
-                    self._json({"ok": True, "sessions": [mem.asdict(s) for s in sessions]})
+                    self._json({"ok": True, "sessions": [s.to_dict() for s in sessions]})
                     return
 
             except Exception as exc:  # noqa: BLE001
                 self._json({"ok": False, "error": str(exc)}, status=500)
                 return
-            finally:
-                if conn is not None:
-                    conn.close()
 
         self.send_response(404)
         self.end_headers()
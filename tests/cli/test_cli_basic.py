@@ -1,7 +1,9 @@
 """Basic CLI tests for los-memory."""
 import json
+import socket
 import subprocess
 import sys
+import time
 
 import pytest
 
@@ -123,6 +125,136 @@ class TestCLIObservation:
         assert output["ok"] is True
         assert "results" in output
 
+    def test_memory_export_json_and_csv(self, tmp_path):
+        """Test streamed export keeps the json.dump(indent=2) layout and CSV rows."""
+        db_path = tmp_path / "test.db"
+        for title in ("First", "Second"):
+            subprocess.run(
+                [
+                    sys.executable, "-m", "memory_tool.cli",
+                    "--db", str(db_path),
+                    "observation", "add",
+                    "--title", title,
+                    "--summary", "Test"
+                ],
+                capture_output=True
+            )
+
+        json_out = tmp_path / "export.json"
+        csv_out = tmp_path / "export.csv"
+        for fmt, path in (("json", json_out), ("csv", csv_out)):
+            result = subprocess.run(
+                [
+                    sys.executable, "-m", "memory_tool.cli",
+                    "--db", str(db_path),
+                    "memory", "export",
+                    "--format", fmt,
+                    "--output", str(path)
+                ],
+                capture_output=True,
+                text=True
+            )
+            assert result.returncode == 0
+            assert json.loads(result.stdout)["count"] == 2
+
+        exported_text = json_out.read_text(encoding="utf-8")
+        exported = json.loads(exported_text)
+        assert {item["title"] for item in exported} == {"First", "Second"}
+        assert exported_text == json.dumps(exported, indent=2)
+
+        csv_lines = csv_out.read_text(encoding="utf-8").splitlines()
+        assert csv_lines[0] == "id,timestamp,project,kind,title,summary,tags,raw,session_id"
+        assert len(csv_lines) == 3
+
+    def test_observation_bulk_add_reads_jsonl(self, tmp_path):
+        """Test bulk-add inserts every JSON line and indexes it for search."""
+        db_path = tmp_path / "test.db"
+        lines = "\n".join(json.dumps(item) for item in [
+            {"title": "First", "summary": "alpha note", "tags": "one"},
+            {"title": "Second", "summary": "beta note", "kind": "decision"},
+        ])
+        result = subprocess.run(
+            [
+                sys.executable, "-m", "memory_tool.cli",
+                "--db", str(db_path),
+                "observation", "bulk-add", "--project", "bulk",
+            ],
+            input=lines + "\n",
+            capture_output=True,
+            text=True
+        )
+        assert result.returncode == 0, result.stderr
+        assert json.loads(result.stdout)["added"] == 2
+
+        search = subprocess.run(
+            [
+                sys.executable, "-m", "memory_tool.cli",
+                "--db", str(db_path),
+                "memory", "search", "beta",
+            ],
+            capture_output=True,
+            text=True
+        )
+        results = json.loads(search.stdout)["results"]
+        assert [(item["title"], item["project"], item["kind"]) for item in results] == [
+            ("Second", "bulk", "decision")
+        ]
+
+    def test_observation_bulk_add_rejects_bad_fields(self, tmp_path):
+        """Test bulk-add reports the line of a mistyped field or timestamp."""
+        db_path = tmp_path / "test.db"
+        good = {"title": "Fine", "summary": "ok"}
+        for bad, error in [
+            ({"title": "T", "summary": "S", "raw": {"x": 1}}, "Line 2: raw must be a string"),
+            ({"title": "T", "summary": "S", "timestamp": "yesterday"}, "Line 2: Timestamp 'yesterday'"),
+        ]:
+            result = subprocess.run(
+                [
+                    sys.executable, "-m", "memory_tool.cli",
+                    "--db", str(db_path),
+                    "observation", "bulk-add",
+                ],
+                input=json.dumps(good) + "\n" + json.dumps(bad) + "\n",
+                capture_output=True,
+                text=True
+            )
+            assert result.returncode == 1
+            assert json.loads(result.stdout)["error"].startswith(error)
+
+    def test_observation_capture_splits_title(self, tmp_path):
+        """Test quick capture uses the first sentence as the title."""
+        db_path = tmp_path / "test.db"
+        result = subprocess.run(
+            [
+                sys.executable, "-m", "memory_tool.cli",
+                "--db", str(db_path),
+                "observation", "capture",
+                "Fixed the a|b parser!  It now handles pipes. Done?"
+            ],
+            capture_output=True,
+            text=True
+        )
+        assert result.returncode == 0
+        output = json.loads(result.stdout)
+        assert output["title"] == "Fixed the a|b parser!"
+
+    def test_observation_capture_long_text_title(self, tmp_path):
+        """Test long captures break the title at a word boundary."""
+        db_path = tmp_path / "test.db"
+        text = "  " + " ".join(["word"] * 30) + "  "
+        result = subprocess.run(
+            [
+                sys.executable, "-m", "memory_tool.cli",
+                "--db", str(db_path),
+                "observation", "capture", text
+            ],
+            capture_output=True,
+            text=True
+        )
+        assert result.returncode == 0
+        output = json.loads(result.stdout)
+        assert output["title"] == " ".join(["word"] * 16)
+
 
 class TestCLISession:
     """Test session commands."""
@@ -305,6 +437,104 @@ class TestCLIBackwardCompat:
         assert output["ok"] is True
 
 
+class TestCLIDaemon:
+    """Test daemon command."""
+
+    def test_daemon_runs_commands_from_stdin(self, tmp_path):
+        """Test daemon runs one command per line on a single connection."""
+        db_path = tmp_path / "test.db"
+        lines = [
+            ["observation", "add", "--title", "Daemon", "--summary", "Batched"],
+            ["memory", "search", "Daemon"],
+            ["init"],
+            "not an argv list",
+            ["memory", "export"],
+            ["memory", "list", "--help"],
+            ["observation", "bulk-add"],
+        ]
+        result = subprocess.run(
+            [sys.executable, "-m", "memory_tool.cli", "--db", str(db_path), "daemon"],
+            input="\n".join(json.dumps(line) for line in lines) + "\n",
+            capture_output=True,
+            text=True
+        )
+        assert result.returncode == 0
+        outputs = [json.loads(line) for line in result.stdout.splitlines()]
+        assert len(outputs) == 7
+        assert outputs[0]["ok"] is True
+        assert outputs[1]["results"][0]["title"] == "Daemon"
+        assert outputs[2]["ok"] is False
+        assert outputs[3]["ok"] is False
+        # Printed output is captured into the result, not the protocol stream
+        assert json.loads(outputs[4]["stdout"])[0]["title"] == "Daemon"
+        assert outputs[5]["ok"] is True and "usage:" in outputs[5]["stdout"]
+        assert outputs[6] == {"ok": False, "error": "observation bulk-add needs --file in daemon mode"}
+
+    @pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs unix sockets")
+    def test_daemon_serves_unix_socket(self, tmp_path):
+        """Test daemon --socket answers each client line on the shared connection."""
+        db_path = tmp_path / "test.db"
+        sock_path = tmp_path / "memory.sock"
+        proc = subprocess.Popen(
+            [
+                sys.executable, "-m", "memory_tool.cli", "--db", str(db_path),
+                "daemon", "--socket", str(sock_path), "--client-timeout", "0.5",
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        stalled = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            deadline = time.monotonic() + 10
+            while not sock_path.exists():
+                assert proc.poll() is None and time.monotonic() < deadline
+                time.sleep(0.05)
+            # Undecodable input only ends that client's session
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(str(sock_path))
+                client.sendall(b"\xff\xfe\n")
+                assert json.loads(client.makefile("rb").readline())["ok"] is False
+            # A client that never finishes its line is dropped after the timeout
+            stalled.connect(str(sock_path))
+            stalled.sendall(b'["memory", "list"')
+            outputs = []
+            for argv in (
+                ["observation", "add", "--title", "Socket", "--summary", "Warm"],
+                ["memory", "search", "Socket"],
+            ):
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                    client.settimeout(10)
+                    client.connect(str(sock_path))
+                    with client.makefile("rw", encoding="utf-8") as stream:
+                        stream.write(json.dumps(argv) + "\n")
+                        stream.flush()
+                        outputs.append(json.loads(stream.readline()))
+        finally:
+            stalled.close()
+            proc.terminate()
+            proc.wait(timeout=10)
+        assert outputs[0]["ok"] is True
+        assert outputs[1]["results"][0]["title"] == "Socket"
+
+    @pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs unix sockets")
+    def test_daemon_socket_refuses_regular_file(self, tmp_path):
+        """Test daemon --socket leaves an existing non-socket path alone."""
+        notes = tmp_path / "notes.txt"
+        notes.write_text("keep me", encoding="utf-8")
+        result = subprocess.run(
+            [
+                sys.executable, "-m", "memory_tool.cli", "--db", str(tmp_path / "test.db"),
+                "daemon", "--socket", str(notes),
+            ],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        assert result.returncode == 1
+        assert "not a socket" in json.loads(result.stdout)["error"]
+        assert notes.read_text(encoding="utf-8") == "keep me"
+
+
 class TestCLIErrorHandling:
     """Test CLI error handling."""
 
@@ -354,3 +584,76 @@ class TestCLIErrorHandling:
         )
         # Should fail due to invalid choice
         assert result.returncode != 0
+
+
+class TestParseArgs:
+    """Test lazy subcommand parser construction."""
+
+    def test_peek_command_skips_global_options(self):
+        """Test the subcommand is found after global options and their values."""
+        from memory_tool.cli import _peek_command
+
+        assert _peek_command(["--db", "x.db", "-o", "json", "--human", "memory", "list"]) == "memory"
+        assert _peek_command(["--profile", "codex", "--help", "memory"]) is None
+        assert _peek_command(["--verbose"]) is None
+
+    def test_core_command_parses_with_global_options(self):
+        """Test a core command parses the same when built on its own."""
+        from memory_tool.cli import parse_args
+
+        args = parse_args(["--db", "x.db", "observation", "add", "--title", "t", "--summary", "s"])
+        assert args.db == "x.db"
+        assert args.command == "observation"
+        assert args.obs_action == "add"
+        assert args.title == "t"
+
+    def test_extension_command_uses_full_parser(self):
+        """Test extension commands are still registered."""
+        from memory_tool.cli import parse_args
+
+        args = parse_args(["knowledge", "list"])
+        assert args.command == "knowledge"
+
+    def test_time_and_cwd_defaults_resolved_at_run_time(self):
+        """Test --timestamp and --working-dir are not computed while parsing."""
+        from memory_tool.cli import parse_args
+
+        assert parse_args(["observation", "add", "--title", "t", "--summary", "s"]).timestamp is None
+        assert parse_args(["session", "start"]).working_dir is None
+
+    def test_init_builds_only_init_parser(self, monkeypatch):
+        """Test init parses without constructing any other subcommand parser."""
+        from memory_tool import cli
+
+        built = []
+        builders = {
+            name: (lambda sub, name=name, build=build: (built.append(name), build(sub)))
+            for name, build in cli._COMMAND_BUILDERS.items()
+        }
+        monkeypatch.setattr(cli, "_COMMAND_BUILDERS", builders)
+
+        args = cli.parse_args(["--profile", "claude", "--db", "x.db", "init"])
+        assert args.command == "init"
+        assert built == ["init"]
+
+    def test_hot_action_builds_only_that_action(self, monkeypatch):
+        """Test memory search builds only the search action parser."""
+        from memory_tool import cli
+
+        built = []
+        actions = {
+            name: (lambda sub, name=name, build=build: (built.append(name), build(sub)))
+            for name, build in cli._MEMORY_ACTIONS.items()
+        }
+        monkeypatch.setattr(cli, "_MEMORY_ACTIONS", actions)
+
+        args = cli.parse_args(["--db", "memory", "memory", "search", "q", "--limit", "3"])
+        assert (args.memory_action, args.query, args.limit) == ("search", "q", 3)
+        assert built == ["search"]
+
+    def test_unknown_action_uses_all_action_parsers(self):
+        """Test an unknown action still fails through the full action parser."""
+        from memory_tool.cli import parse_args
+
+        with pytest.raises(SystemExit):
+            parse_args(["observation", "bogus"])
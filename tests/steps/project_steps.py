@@ -87,16 +87,8 @@ def given_observations_for_project(test_context: BDDTestContext, project: str):
 @when(parsers.parse('I archive project "{project}"'))
 def archive_project(test_context: BDDTestContext, project: str):
     """Archive a project."""
-    new_name = f"archived/{project}"
-    test_context.conn.execute(
-        "UPDATE observations SET project = ? WHERE project = ?",
-        (new_name, project),
-    )
-    test_context.conn.execute(
-        "UPDATE sessions SET project = ? WHERE project = ?",
-        (new_name, project),
-    )
-    test_context.conn.commit()
+    from memory_tool.projects import archive_project as archive
+    archive(test_context.conn, project)
 
 
 @then(parsers.parse('all observations should be moved to "{new_project}"'))
@@ -6,6 +6,8 @@ import subprocess
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 MEMORY_DIR = ROOT / "memory_tool"
 sys.path.append(str(MEMORY_DIR))
@@ -61,9 +63,19 @@ def test_add_search_timeline_get(tmp_path: Path) -> None:
 
     timeline = mem.run_timeline(conn, start=ts1, end=ts2, around_id=None, window_minutes=60, limit=10)
     assert [item.id for item in timeline] == [second_id, first_id]
+    around = mem.run_timeline(conn, start=None, end=None, around_id=second_id, window_minutes=30, limit=10)
+    assert [item.id for item in around] == [second_id]
+    offset_id = mem.add_observation(
+        conn, "2024-01-01T10:00:00+02:00", "proj", "note", "Offset", "s", "[]", "", ""
+    )
+    with pytest.raises(ValueError):
+        mem.run_timeline(conn, start=None, end=None, around_id=offset_id, window_minutes=30, limit=10)
 
     fetched = mem.run_get(conn, [second_id, first_id])
     assert [item.id for item in fetched] == [second_id, first_id]
+    # More ids than SQLite's bound-parameter limit still go through one statement
+    many = mem.run_get(conn, [first_id, *range(10_000, 50_000)])
+    assert [item.id for item in many] == [first_id]
     conn.close()
 
 
@@ -178,6 +190,9 @@ def test_pagination_offsets(tmp_path: Path) -> None:
 
     search_page = mem.run_search(conn, "Title", limit=2, offset=2)
     assert len(search_page) == 2
+    search_all = mem.run_search(conn, "Title", limit=5)
+    assert [item["id"] for item in search_page] == [item["id"] for item in search_all[2:4]]
+    assert [item["score"] for item in search_all] == sorted(item["score"] for item in search_all)
 
     timeline_page = mem.run_timeline(
         conn,
@@ -238,6 +253,27 @@ def test_required_tags_filter_for_search_and_list(tmp_path: Path) -> None:
     conn.close()
 
 
+def test_search_modes(tmp_path: Path) -> None:
+    db_path = tmp_path / "memory.db"
+    conn = mem.connect_db(str(db_path))
+    mem.ensure_schema(conn)
+    mem.ensure_fts(conn)
+    first = mem.add_observation(conn, mem.utc_now(), "p", "note", "Migration plan", "postgres upgrade", "[]", "", "")
+    second = mem.add_observation(conn, mem.utc_now(), "p", "note", "Remigrate", "c++ build", "[]", "", "")
+
+    # like: word prefixes through the FTS index
+    assert [r["id"] for r in mem.run_search(conn, "migr post", 10, mode="like")] == [first]
+    # scan: infix LIKE, no score
+    scanned = mem.run_search(conn, "igrat", 10, mode="scan")
+    assert sorted(r["id"] for r in scanned) == [first, second]
+    assert all(r["score"] is None for r in scanned)
+    # auto: invalid FTS syntax is retried as a prefix match
+    assert [r["id"] for r in mem.run_search(conn, "c++ build", 10)] == [second]
+    with pytest.raises(sqlite3.OperationalError):
+        mem.run_search(conn, "c++ build", 10, mode="fts")
+    conn.close()
+
+
 def test_profile_resolution() -> None:
     codex_path = mem.resolve_db_path("codex", None)
     claude_path = mem.resolve_db_path("claude", None)
@@ -311,6 +347,41 @@ def test_clean_and_manage(tmp_path: Path) -> None:
     assert projects["projects"][0]["project"] == "ops"
     tags = mem.run_manage(conn, "tags", 10)
     assert tags["tags"][0]["tag"] == "keep"
+    assert mem.run_manage(conn, "vacuum", 10)["vacuumed"] is True
+    assert [item["title"] for item in mem.run_search(conn, "keep", limit=5)] == ["New entry"]
+    conn.close()
+
+
+def test_clean_by_tag_matches_whole_tags(tmp_path: Path) -> None:
+    conn = mem.connect_db(str(tmp_path / "memory.db"))
+    mem.ensure_schema(conn)
+    mem.ensure_fts(conn)
+    ids = {}
+    for tags in (["py"], ["pytest"], ["docs", "py"], ["docs"]):
+        ids[tags[-1] if len(tags) == 1 else "both"] = mem.add_observation(
+            conn, "2024-01-01T00:00:00Z", "p", "note", "t", "s",
+            mem.tags_to_json(tags), mem.tags_to_text(tags), "",
+        )
+
+    cleaned = mem.run_clean(
+        conn, before=None, older_than_days=None, project=None, kind=None,
+        tag="py", delete_all=False, dry_run=False, vacuum=False,
+    )
+    assert cleaned["deleted"] == 2
+    remaining = {row["id"] for row in conn.execute("SELECT id FROM observations")}
+    assert remaining == {ids["pytest"], ids["docs"]}
+    conn.close()
+
+
+def test_manage_tags_counts_in_sql(tmp_path: Path) -> None:
+    conn = mem.connect_db(str(tmp_path / "memory.db"))
+    mem.ensure_schema(conn)
+    mem.ensure_fts(conn)
+    for tags in ('["b", "a"]', '["a"]', '["c", "b"]', "legacy,text", '{"a": 1}', "", '"a"'):
+        mem.add_observation(conn, "2024-01-01T00:00:00Z", "p", "note", "t", "s", tags, "", "")
+
+    tags = mem.run_manage(conn, "tags", 2)["tags"]
+    assert tags == [{"tag": "a", "count": 2}, {"tag": "b", "count": 2}]
     conn.close()
 
 
@@ -369,6 +440,265 @@ def test_edit_and_delete(tmp_path: Path) -> None:
     assert remaining[0].id == first_id
 
 
+def test_add_observation_many(tmp_path: Path) -> None:
+    db_path = tmp_path / "memory.db"
+    conn = mem.connect_db(str(db_path))
+    mem.ensure_schema(conn)
+    mem.ensure_fts(conn)
+
+    tags = mem.normalize_tags_list("batch")
+    rows = [
+        (mem.utc_now(), "proj", "note", f"Batch {i}", "bulk insert", mem.tags_to_json(tags),
+         mem.tags_to_text(tags), "", None)
+        for i in range(3)
+    ]
+    inserted = mem.add_observation_many(conn, rows)
+
+    assert inserted == 3
+    results = mem.run_search(conn, "bulk", 10)
+    assert sorted(item["title"] for item in results) == ["Batch 0", "Batch 1", "Batch 2"]
+
+    # The per-row FTS trigger is back for ordinary inserts
+    mem.add_observation(conn, mem.utc_now(), "proj", "note", "Single", "after bulk", "[]", "", "")
+    assert [item["title"] for item in mem.run_search(conn, "after", 10)] == ["Single"]
+
+    # A failing batch rolls back both the rows and the trigger drop
+    with pytest.raises(sqlite3.IntegrityError):
+        mem.add_observation_many(conn, [rows[0], (None,) + rows[0][1:]])
+    assert conn.execute("SELECT COUNT(*) FROM observations").fetchone()[0] == 4
+    assert conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name = 'observations_ai'"
+    ).fetchone()[0] == 1
+
+    # Inside a caller's transaction only the failed batch is undone
+    conn.execute("BEGIN")
+    mem.add_observation(conn, mem.utc_now(), "proj", "note", "Pending", "s", "[]", "", "")
+    with pytest.raises(sqlite3.IntegrityError):
+        mem.add_observation_many(conn, [rows[0], (None,) + rows[0][1:]])
+    assert conn.in_transaction
+    conn.commit()
+    assert conn.execute("SELECT COUNT(*) FROM observations").fetchone()[0] == 5
+    assert [item["title"] for item in mem.run_search(conn, "Pending", 10)] == ["Pending"]
+    assert conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name = 'observations_ai'"
+    ).fetchone()[0] == 1
+    conn.close()
+
+
+def test_archive_project(tmp_path: Path) -> None:
+    db_path = tmp_path / "memory.db"
+    conn = mem.connect_db(str(db_path))
+    mem.ensure_schema(conn)
+    mem.ensure_fts(conn)
+
+    session_id = mem.start_session(conn, "old", str(tmp_path), "codex", "")
+    mem.add_observation(conn, mem.utc_now(), "old", "note", "Old", "s", "[]", "", "", session_id)
+    mem.add_observation(conn, mem.utc_now(), "keep", "note", "Keep", "s", "[]", "", "")
+
+    assert mem.archive_project(conn, "old") == "archived/old"
+    assert not conn.in_transaction
+    projects = [row[0] for row in conn.execute("SELECT project FROM observations ORDER BY id")]
+    assert projects == ["archived/old", "keep"]
+    assert conn.execute("SELECT project FROM sessions").fetchone()[0] == "archived/old"
+
+    # Inside a caller's transaction the rename is left for the caller to commit
+    conn.execute("BEGIN")
+    mem.add_observation(conn, mem.utc_now(), "keep", "note", "Pending", "s", "[]", "", "")
+    assert mem.archive_project(conn, "keep") == "archived/keep"
+    assert conn.in_transaction
+    conn.rollback()
+    projects = [row[0] for row in conn.execute("SELECT project FROM observations ORDER BY id")]
+    assert projects == ["archived/old", "keep"]
+    conn.close()
+
+
+def test_run_import_is_atomic(tmp_path: Path) -> None:
+    db_path = tmp_path / "memory.db"
+    conn = mem.connect_db(str(db_path))
+    mem.ensure_schema(conn)
+    mem.ensure_fts(conn)
+
+    session = {"id": 5, "start_time": "2024-01-01T00:00:00Z", "project": "p",
+               "working_dir": "/", "agent_type": "codex"}
+    obs = {"timestamp": "2024-01-01T00:00:00Z", "project": "p", "kind": "note",
+           "title": "T", "summary": "S", "tags": ["a", "b"], "session_id": 5}
+    bundle = tmp_path / "bundle.json"
+
+    bundle.write_text(json.dumps({"sessions": [session], "observations": [obs, {"title": "broken"}]}))
+    with pytest.raises(KeyError):
+        mem.run_import(conn, str(bundle), None, False)
+    assert conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM observations").fetchone()[0] == 0
+
+    bundle.write_text(json.dumps({"sessions": [session], "observations": [obs, obs]}))
+    result = mem.run_import(conn, str(bundle), "q", False)
+    assert (result["imported_sessions"], result["imported_observations"]) == (1, 2)
+    session_id = conn.execute("SELECT id FROM sessions").fetchone()[0]
+    rows = conn.execute("SELECT project, tags, tags_text, session_id FROM observations").fetchall()
+    assert [tuple(row) for row in rows] == [("q", '["a", "b"]', "a b", session_id)] * 2
+
+    # A failed import inside a caller's transaction keeps the caller's writes
+    bundle.write_text(json.dumps({"sessions": [session], "observations": [obs, {"title": "broken"}]}))
+    conn.execute("BEGIN")
+    mem.add_observation(conn, mem.utc_now(), "p", "note", "Pending", "s", "[]", "", "")
+    with pytest.raises(KeyError):
+        mem.run_import(conn, str(bundle), None, False)
+    assert conn.in_transaction
+    conn.commit()
+    assert conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] == 1
+    assert conn.execute("SELECT COUNT(*) FROM observations").fetchone()[0] == 3
+    conn.close()
+
+
+def test_get_links_for_observations(tmp_path: Path) -> None:
+    db_path = tmp_path / "memory.db"
+    conn = mem.connect_db(str(db_path))
+    mem.ensure_schema(conn)
+    mem.ensure_fts(conn)
+
+    from memory_tool.links import create_link, get_links_for_observations
+
+    a, b, c = (
+        mem.add_observation(conn, mem.utc_now(), "p", "note", title, "s", "[]", "", "")
+        for title in ("A", "B", "C")
+    )
+    create_link(conn, a, b, "child")
+    create_link(conn, c, a)
+
+    links = get_links_for_observations(conn, [a, b])
+    assert sorted(links[a], key=lambda link: link["id"]) == [
+        {"id": b, "title": "B", "link_type": "child", "direction": "outgoing"},
+        {"id": c, "title": "C", "link_type": "related", "direction": "incoming"},
+    ]
+    assert links[b] == [{"id": a, "title": "A", "link_type": "child", "direction": "incoming"}]
+    assert get_links_for_observations(conn, []) == {}
+    conn.close()
+
+
+def test_get_related_observations_both_directions(tmp_path: Path) -> None:
+    db_path = tmp_path / "memory.db"
+    conn = mem.connect_db(str(db_path))
+    mem.ensure_schema(conn)
+    mem.ensure_fts(conn)
+
+    from memory_tool.links import create_link, get_related_observations
+
+    a, b, c = (
+        mem.add_observation(conn, mem.utc_now(), "p", "note", title, "s", "[]", "", "")
+        for title in ("A", "B", "C")
+    )
+    create_link(conn, a, b, "child")
+    create_link(conn, c, a)
+
+    related = get_related_observations(conn, a)
+    assert sorted((r["id"], r["link_type"], r["direction"]) for r in related) == [
+        (b, "child", "outgoing"),
+        (c, "related", "incoming"),
+    ]
+    assert [r["id"] for r in get_related_observations(conn, a, link_type="related")] == [c]
+    assert len(get_related_observations(conn, a, limit=1)) == 1
+    conn.close()
+
+
+def test_create_link_returns_id_and_leaves_commit_to_caller(tmp_path: Path) -> None:
+    db_path = tmp_path / "memory.db"
+    conn = mem.connect_db(str(db_path))
+    mem.ensure_schema(conn)
+    mem.ensure_fts(conn)
+
+    from memory_tool.links import create_link
+
+    a, b, c = (
+        mem.add_observation(conn, mem.utc_now(), "p", "note", title, "s", "[]", "", "")
+        for title in ("A", "B", "C")
+    )
+    first = create_link(conn, a, b)
+    other = create_link(conn, a, c)
+    assert create_link(conn, a, b) == first != other
+    for from_id, to_id in ((a, 999), (999, a), (a, a)):
+        with pytest.raises(ValueError, match="not found"):
+            create_link(conn, from_id, to_id)
+    assert conn.in_transaction
+    conn.rollback()
+    assert conn.execute("SELECT COUNT(*) FROM observation_links").fetchone()[0] == 0
+    conn.close()
+
+
+def test_find_similar_observations_beyond_first_rows(tmp_path: Path) -> None:
+    db_path = tmp_path / "memory.db"
+    conn = mem.connect_db(str(db_path))
+    mem.ensure_schema(conn)
+    mem.ensure_fts(conn)
+
+    from memory_tool.links import find_similar_observations
+
+    source = mem.add_observation(
+        conn, mem.utc_now(), "p", "note", "Cache invalidation bug", "s", '["cache"]', "cache", ""
+    )
+    mem.add_observation_many(conn, [
+        (mem.utc_now(), "p", "note", f"Unrelated {i}", "s", "[]", "", "", None) for i in range(120)
+    ])
+    similar = mem.add_observation(
+        conn, mem.utc_now(), "p", "note", "Cache invalidation fix", "s", '["cache"]', "cache", ""
+    )
+
+    # A legacy row whose tags column is not JSON still scores on its title
+    legacy = mem.add_observation(
+        conn, mem.utc_now(), "p", "note", "Cache invalidation", "s", "cache", "cache", ""
+    )
+
+    results = find_similar_observations(conn, source, limit=5)
+    assert [(item["id"], item["similarity_score"]) for item in results] == [
+        (similar, 45.0),
+        (legacy, 20.0),
+    ]
+    conn.close()
+
+
+def test_find_similar_observations_counts_shared_summary_words(tmp_path: Path) -> None:
+    db_path = tmp_path / "memory.db"
+    conn = mem.connect_db(str(db_path))
+    mem.ensure_schema(conn)
+    mem.ensure_fts(conn)
+
+    from memory_tool.links import find_similar_observations
+
+    source = mem.add_observation(
+        conn, mem.utc_now(), "p", "note", "Alpha", "database migration rollback script", "[]", "", ""
+    )
+    match = mem.add_observation(
+        conn, mem.utc_now(), "q", "decision", "Alpha", "script rollback for database migration", "[]", "", ""
+    )
+
+    results = find_similar_observations(conn, source)
+    # 10 for the title word, 3 for each of database/migration/rollback/script
+    assert [(r["id"], r["project"], r["kind"], r["similarity_score"]) for r in results] == [
+        (match, "q", "decision", 22.0)
+    ]
+    conn.close()
+
+
+def test_find_similar_observations_matches_multi_word_tags(tmp_path: Path) -> None:
+    conn = mem.connect_db(str(tmp_path / "memory.db"))
+    mem.ensure_schema(conn)
+    mem.ensure_fts(conn)
+
+    from memory_tool.links import find_similar_observations
+
+    tags = mem.normalize_tags_list("machine learning, api design")
+    source = mem.add_observation(
+        conn, mem.utc_now(), "p", "note", "First", "unrelated", mem.tags_to_json(tags), mem.tags_to_text(tags), ""
+    )
+    match = mem.add_observation(
+        conn, mem.utc_now(), "p", "note", "Second", "different", mem.tags_to_json(tags), mem.tags_to_text(tags), ""
+    )
+
+    results = find_similar_observations(conn, source)
+    # 25 for each of the two shared multi-word tags
+    assert [(r["id"], r["similarity_score"]) for r in results] == [(match, 50.0)]
+    conn.close()
+
+
 def test_log_agent_transition(tmp_path: Path) -> None:
     db_path = tmp_path / "memory.db"
     conn = mem.connect_db(str(db_path))
@@ -394,12 +724,113 @@ def test_log_agent_transition(tmp_path: Path) -> None:
     assert rows["kind"] == "agent_transition"
     assert rows["title"] == "Transition: review/check-regression"
     assert "Reward: 1.0" in rows["summary"]
+    # Same stored text as every other writer, whether or not orjson is installed
+    assert rows["tags"] == mem.tags_to_json(["transition", "review", "check-regression"])
     raw = json.loads(rows["raw"])
+    assert rows["raw"] == json.dumps(raw, ensure_ascii=False)
     assert raw["phase"] == "review"
     assert raw["action"] == "check-regression"
     conn.close()
 
 
+def test_add_observation_joins_open_transaction(tmp_path: Path) -> None:
+    db_path = tmp_path / "memory.db"
+    conn = mem.connect_db(str(db_path))
+    mem.ensure_schema(conn)
+    mem.ensure_fts(conn)
+
+    mem.add_observation(conn, mem.utc_now(), "p", "note", "Kept", "s", "[]", "", "")
+    assert not conn.in_transaction
+
+    conn.execute("BEGIN")
+    for title in ("A", "B"):
+        mem.add_observation(conn, mem.utc_now(), "p", "note", title, "s", "[]", "", "")
+    assert conn.in_transaction
+    conn.rollback()
+    assert [row[0] for row in conn.execute("SELECT title FROM observations")] == ["Kept"]
+    conn.close()
+
+
+def test_write_helpers_share_callers_transaction(tmp_path: Path) -> None:
+    db_path = tmp_path / "memory.db"
+    conn = mem.connect_db(str(db_path))
+    mem.ensure_schema(conn)
+    mem.ensure_fts(conn)
+
+    from memory_tool.feedback import apply_feedback
+    from memory_tool.links import create_link
+
+    a = mem.add_observation(conn, mem.utc_now(), "p", "note", "A", "s", "[]", "", "")
+    b = mem.add_observation(conn, mem.utc_now(), "p", "note", "B", "s", "[]", "", "")
+
+    def counts() -> tuple:
+        return (
+            conn.execute("SELECT COUNT(*) FROM observations").fetchone()[0],
+            conn.execute("SELECT COUNT(*) FROM observation_links").fetchone()[0],
+            conn.execute("SELECT COUNT(*) FROM feedback_log").fetchone()[0],
+        )
+
+    # Nothing is committed until the caller says so
+    conn.execute("BEGIN")
+    c = mem.add_observation(conn, mem.utc_now(), "p", "note", "C", "s", "[]", "", "")
+    create_link(conn, a, b)
+    apply_feedback(conn, c, "补充：more")
+    assert conn.in_transaction
+    conn.rollback()
+    assert counts() == (2, 0, 0)
+
+    # A failing helper undoes only its own writes
+    conn.execute("BEGIN")
+    mem.add_observation(conn, mem.utc_now(), "p", "note", "C", "s", "[]", "", "")
+    create_link(conn, a, b)
+    with pytest.raises(ValueError, match="not found"):
+        apply_feedback(conn, 9999, "tag: x")
+    assert conn.in_transaction
+    conn.commit()
+    assert counts() == (3, 1, 0)
+    conn.close()
+
+
+def test_apply_feedback_commits_edit_and_record_together(tmp_path: Path) -> None:
+    db_path = tmp_path / "memory.db"
+    conn = mem.connect_db(str(db_path))
+    mem.ensure_schema(conn)
+    mem.ensure_fts(conn)
+
+    from memory_tool.feedback import apply_feedback
+
+    obs_id = mem.add_observation(conn, mem.utc_now(), "p", "note", "T", "Before", "[]", "", "")
+    result = apply_feedback(conn, obs_id, "修正：After")
+    assert result["updated"] and not conn.in_transaction
+    assert conn.execute("SELECT COUNT(*) FROM feedback_log").fetchone()[0] == 1
+
+    # Inside a caller's transaction run_edit leaves the commit to the caller
+    conn.execute("BEGIN")
+    mem.run_edit(conn, obs_id, None, None, None, "Discarded", None, None, None, False)
+    conn.rollback()
+    assert conn.execute("SELECT summary FROM observations WHERE id = ?", (obs_id,)).fetchone()[0] == "After"
+    conn.close()
+
+
+def test_apply_feedback_failure_keeps_callers_writes(tmp_path: Path) -> None:
+    db_path = tmp_path / "memory.db"
+    conn = mem.connect_db(str(db_path))
+    mem.ensure_schema(conn)
+    mem.ensure_fts(conn)
+
+    from memory_tool.feedback import apply_feedback
+
+    conn.execute("BEGIN")
+    mem.add_observation(conn, mem.utc_now(), "p", "note", "Pending", "s", "[]", "", "")
+    with pytest.raises(ValueError, match="not found"):
+        apply_feedback(conn, 9999, "tag: x")
+    # The failed feedback neither committed nor rolled back the caller's work
+    assert conn.in_transaction
+    conn.commit()
+    assert [row[0] for row in conn.execute("SELECT title FROM observations")] == ["Pending"]
+    conn.close()
+
+
 def test_apply_review_feedback_batch(tmp_path: Path) -> None:
     db_path = tmp_path / "memory.db"
     conn = mem.connect_db(str(db_path))
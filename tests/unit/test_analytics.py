@@ -0,0 +1,113 @@
+"""Tests for tool usage analytics."""
+import pytest
+
+from memory_tool import analytics
+from memory_tool.analytics import get_tool_stats, log_tool_call, suggest_tools_for_task
+
+
+def _log(conn, tool, status="success", project="general"):
+    output = {"error": "boom"} if status == "error" else {"result": "ok"}
+    return log_tool_call(conn, tool, {"query": "x"}, output, status, 10, project)
+
+
+@pytest.fixture(autouse=True)
+def clear_suggest_cache():
+    analytics._suggest_cache.clear()
+    yield
+    analytics._suggest_cache.clear()
+
+
+class TestGetToolStats:
+    """Test get_tool_stats aggregation."""
+
+    def test_counts_by_status_and_tool(self, db_connection):
+        """Test success/error counts and per-tool breakdown."""
+        _log(db_connection, "search_files")
+        _log(db_connection, "search_files")
+        _log(db_connection, "api_request", status="error")
+
+        stats = get_tool_stats(db_connection)
+
+        assert stats["total_calls"] == 3
+        assert stats["success_count"] == 2
+        assert stats["error_count"] == 1
+        assert stats["tools"][0] == {"name": "search_files", "calls": 2}
+        assert stats["recent_errors"][0]["tool"] == "api_request"
+
+    def test_ignores_unparseable_raw(self, db_connection):
+        """Test rows with non-JSON raw count toward totals but not status."""
+        db_connection.execute(
+            "INSERT INTO observations (timestamp, project, kind, title, summary, tags, tags_text, raw) "
+            "VALUES ('2024-01-01T00:00:00Z', 'general', 'tool_call', 'Tool: legacy', '', '[]', '', 'not json')"
+        )
+
+        stats = get_tool_stats(db_connection)
+
+        assert stats["total_calls"] == 1
+        assert stats["success_count"] == 0
+        assert stats["tools"] == [{"name": "legacy", "calls": 1}]
+
+    def test_strips_only_leading_tool_prefix(self, db_connection):
+        """Test "Tool: " is removed only as a prefix of the title."""
+        _log(db_connection, "wrap Tool: inner")
+
+        stats = get_tool_stats(db_connection)
+
+        assert stats["tools"] == [{"name": "wrap Tool: inner", "calls": 1}]
+
+
+class TestLogToolCall:
+    """Test log_tool_call observation content."""
+
+    def test_zero_duration_kept_in_summary(self, db_connection):
+        """Test a 0ms call still records its duration."""
+        obs_id = log_tool_call(db_connection, "fast_tool", {}, {"error": "boom"}, "error", 0, "general")
+
+        row = db_connection.execute("SELECT summary FROM observations WHERE id = ?", (obs_id,)).fetchone()
+        assert row["summary"] == "Status: error | Duration: 0ms | Error: boom"
+
+
+class TestTagToken:
+    """Test tag normalization for logged tool and transition names."""
+
+    @pytest.mark.parametrize("value", ["Search Files", "already_lower", "Ünïcode Name", ""])
+    def test_matches_lower_replace(self, value):
+        """Test _tag_token equals lower() + space-to-underscore."""
+        assert analytics._tag_token(value) == value.lower().replace(" ", "_")
+
+
+class TestSuggestToolsForTask:
+    """Test suggest_tools_for_task ranking and memoization."""
+
+    def test_keyword_hits_rank_first(self, db_connection):
+        """Test tools matching task keywords outrank frequent ones."""
+        for _ in range(3):
+            _log(db_connection, "database_query")
+        _log(db_connection, "grep_search")
+
+        result = suggest_tools_for_task(db_connection, "grep the codebase")
+
+        assert [s["name"] for s in result["suggestions"]] == ["grep_search", "database_query"]
+
+    def test_no_keywords_returns_empty(self, db_connection):
+        """Test tasks without keywords longer than 2 chars suggest nothing."""
+        _log(db_connection, "grep_search")
+
+        for task in ("", "a to do"):
+            result = suggest_tools_for_task(db_connection, task)
+            assert result == {"ok": True, "task": task, "suggestions": []}
+        assert not analytics._suggest_cache
+
+    def test_cached_until_new_tool_call(self, db_connection):
+        """Test repeated requests are served from cache until history changes."""
+        _log(db_connection, "grep_search")
+        first = suggest_tools_for_task(db_connection, "grep text")
+        assert len(analytics._suggest_cache) == 1
+
+        again = suggest_tools_for_task(db_connection, "text  GREP")
+        assert again["suggestions"] == first["suggestions"]
+        assert len(analytics._suggest_cache) == 1
+
+        _log(db_connection, "file_read")
+        updated = suggest_tools_for_task(db_connection, "grep text")
+        assert {s["name"] for s in updated["suggestions"]} == {"grep_search", "file_read"}
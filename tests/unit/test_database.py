@@ -5,14 +5,19 @@ import pytest
 
 from memory_tool.database import (
     SCHEMA_VERSION,
+    close_db,
+    close_shared_connections,
     connect_db,
+    ensure_current_schema,
     ensure_schema,
     ensure_fts,
     get_schema_version,
+    init_db,
     set_schema_version,
     migrate_schema,
     rebuild_fts,
     optimize_connection,
+    shared_connection,
 )
 
 
@@ -33,6 +38,16 @@ class TestDatabaseConnection:
         assert result[0] == "wal"  # WAL mode enabled
         conn.close()
 
+    def test_connect_applies_tuned_pragmas(self, temp_db_path):
+        """Test the non-journal PRAGMAs set by optimize_connection."""
+        conn = connect_db(str(temp_db_path))
+        pragmas = {
+            name: conn.execute(f"PRAGMA {name}").fetchone()[0]
+            for name in ("synchronous", "temp_store", "cache_size", "busy_timeout")
+        }
+        assert pragmas == {"synchronous": 1, "temp_store": 2, "cache_size": -64000, "busy_timeout": 5000}
+        conn.close()
+
     def test_connect_sets_row_factory(self, temp_db_path):
         """Test that row factory is set to sqlite3.Row."""
         conn = connect_db(str(temp_db_path))
@@ -46,6 +61,46 @@ class TestDatabaseConnection:
         assert db_path.parent.exists()
         conn.close()
 
+    def test_close_db_closes_connection(self, temp_db_path):
+        """close_db runs PRAGMA optimize and closes the connection."""
+        conn = connect_db(str(temp_db_path))
+        close_db(conn)
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    def test_init_db_collects_statistics(self, temp_db_path):
+        """init_db runs ANALYZE so sqlite_stat1 exists for the planner."""
+        init_db(str(temp_db_path))
+        conn = connect_db(str(temp_db_path))
+        assert conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+        ).fetchone() is not None
+        conn.close()
+
+
+class TestSharedConnection:
+    """Test the process-wide connection cache."""
+
+    def test_reuses_connection_per_path(self, temp_db_path):
+        """One prepared connection is returned for the same path."""
+        try:
+            conn = shared_connection(str(temp_db_path))
+            assert shared_connection(str(temp_db_path)) is conn
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        finally:
+            close_shared_connections()
+
+    def test_close_drops_cached_connections(self, temp_db_path):
+        """After closing, the next call opens a fresh connection."""
+        conn = shared_connection(str(temp_db_path))
+        close_shared_connections()
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+        try:
+            assert shared_connection(str(temp_db_path)) is not conn
+        finally:
+            close_shared_connections()
+
 
 class TestSchemaManagement:
     """Test schema creation and migration."""
@@ -118,6 +173,65 @@ class TestSchemaManagement:
         version = get_schema_version(conn)
         assert version == SCHEMA_VERSION
 
+    def test_migrate_v1_normalizes_tags(self, empty_db):
+        """The v2 step rewrites legacy tags and fills tags_text."""
+        conn = empty_db
+        conn.execute(
+            """
+            CREATE TABLE observations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                project TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                title TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                tags TEXT NOT NULL,
+                raw TEXT NOT NULL
+            )
+            """
+        )
+        conn.executemany(
+            "INSERT INTO observations (timestamp, project, kind, title, summary, tags, raw) "
+            "VALUES ('2024-01-01T00:00:00Z', 'p', 'note', 't', 's', ?, '')",
+            [("Foo, bar,foo",), ('["X", "y"]',)],
+        )
+        set_schema_version(conn, 1)
+
+        ensure_schema(conn)
+
+        rows = conn.execute("SELECT tags, tags_text FROM observations ORDER BY id").fetchall()
+        assert [tuple(row) for row in rows] == [('["foo", "bar"]', "foo bar"), ('["x", "y"]', "x y")]
+
+
+class TestEnsureCurrentSchema:
+    """Test the user_version-gated schema setup."""
+
+    def test_stamps_user_version(self, empty_db):
+        """A fresh database is set up and stamped with SCHEMA_VERSION."""
+        ensure_current_schema(empty_db)
+        assert empty_db.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        assert get_schema_version(empty_db) == SCHEMA_VERSION
+
+    def test_skips_ddl_when_current(self, empty_db, monkeypatch):
+        """A stamped database does not re-run ensure_schema."""
+        ensure_current_schema(empty_db)
+
+        import memory_tool.database as database
+
+        def fail(conn):
+            raise AssertionError("ensure_schema should be skipped")
+
+        monkeypatch.setattr(database, "ensure_schema", fail)
+        ensure_current_schema(empty_db)
+
+    def test_reruns_after_version_bump(self, empty_db):
+        """A stamp from an older SCHEMA_VERSION triggers setup again."""
+        ensure_current_schema(empty_db)
+        empty_db.execute(f"PRAGMA user_version = {SCHEMA_VERSION - 1}")
+
+        ensure_current_schema(empty_db)
+        assert empty_db.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+
 
 class TestFTSTriggers:
     """Test FTS trigger functionality."""
@@ -185,6 +299,63 @@ class TestIndexes:
         assert "idx_observations_project_kind_timestamp" in index_names
         assert "idx_observations_tags_text" in index_names
 
+        # v15 link/feedback indexes replace the narrower v5/v6 ones
+        assert {"idx_links_unique", "idx_links_to_from_type", "idx_feedback_target_ts"} <= index_names
+        assert not {"idx_links_from_to", "idx_links_to_type", "idx_feedback_target"} & index_names
+
+        # v16 newest-first index for list/timeline/export
+        assert "idx_observations_timestamp" in index_names
+
+    def test_link_and_feedback_lookups_use_covering_indexes(self, db_connection):
+        """Verify incoming links and feedback history avoid table scans and sorts."""
+        incoming = " ".join(row[3] for row in db_connection.execute(
+            "EXPLAIN QUERY PLAN SELECT from_id, link_type FROM observation_links WHERE to_id = ?", (1,)
+        ))
+        assert "COVERING INDEX idx_links_to_from_type" in incoming
+
+        history = " ".join(row[3] for row in db_connection.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM feedback_log WHERE target_observation_id = ? "
+            "ORDER BY timestamp DESC, id DESC", (1,)
+        ))
+        assert "idx_feedback_target_ts" in history
+        assert "TEMP B-TREE" not in history
+
+    def test_newest_first_listing_avoids_sort(self, db_connection):
+        """Verify list/timeline ordering walks the timestamp index."""
+        plan = " ".join(row[3] for row in db_connection.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM observations ORDER BY timestamp DESC LIMIT 10"
+        ))
+        assert "idx_observations_timestamp" in plan
+        assert "TEMP B-TREE" not in plan
+
+
+class TestObservationCounts:
+    """Test trigger-maintained project/session observation counts."""
+
+    def _counts(self, conn):
+        projects = dict(conn.execute("SELECT project, n FROM project_counts").fetchall())
+        sessions = dict(conn.execute("SELECT session_id, n FROM session_counts").fetchall())
+        return projects, sessions
+
+    def test_counts_follow_insert_update_delete(self, db_connection):
+        """Verify counts track inserts, moves between projects and deletes."""
+        insert = (
+            """INSERT INTO observations
+               (timestamp, project, kind, title, summary, tags, tags_text, raw, session_id)
+               VALUES ('2024-01-15T10:00:00Z', ?, 'note', 't', 's', '[]', '', '', ?)"""
+        )
+        first = db_connection.execute(insert, ("alpha", 7)).lastrowid
+        db_connection.execute(insert, ("alpha", None))
+        assert self._counts(db_connection) == ({"alpha": 2}, {7: 1})
+
+        db_connection.execute(
+            "UPDATE observations SET project = 'beta', session_id = 8 WHERE id = ?", (first,)
+        )
+        assert self._counts(db_connection) == ({"alpha": 1, "beta": 1}, {7: 0, 8: 1})
+
+        db_connection.execute("DELETE FROM observations WHERE id = ?", (first,))
+        assert self._counts(db_connection) == ({"alpha": 1, "beta": 0}, {7: 0, 8: 0})
+
 
 class TestRebuildFTS:
     """Test FTS rebuild functionality."""
@@ -0,0 +1,58 @@
+"""Unit tests for memory_tool._fastjson module."""
+import json
+
+import pytest
+
+from memory_tool import _fastjson
+
+
+class TestDumps:
+    """Test dumps helper."""
+
+    def test_round_trips(self):
+        """Verify dumps output parses back to the same value."""
+        data = {"tool": "search", "input": {"q": "TODO"}, "duration_ms": None}
+        assert json.loads(_fastjson.dumps(data)) == data
+
+    def test_keeps_non_ascii(self):
+        """Verify non-ASCII text is not escaped."""
+        assert "修正" in _fastjson.dumps({"text": "修正"})
+
+    def test_non_str_keys_fall_back(self):
+        """Verify payloads orjson rejects still serialize."""
+        assert json.loads(_fastjson.dumps({1: "a"})) == {"1": "a"}
+
+    def test_stdlib_fallback(self, monkeypatch):
+        """Verify stdlib path is used when orjson is unavailable."""
+        monkeypatch.setattr(_fastjson, "HAS_ORJSON", False)
+        assert _fastjson.dumps({"a": "é"}) == '{"a": "é"}'
+
+
+class TestDumpsIndentedBytes:
+    """Test dumps_indented_bytes helper."""
+
+    def test_matches_stdlib_indent(self):
+        """Verify output is identical to json.dumps(indent=2, ensure_ascii=False)."""
+        from datetime import datetime
+
+        data = {"ok": True, "results": [{"title": "修正", "tags": []}], "at": datetime(2024, 1, 15, 10, 30)}
+        expected = json.dumps(data, indent=2, ensure_ascii=False, default=str)
+        assert _fastjson.dumps_indented_bytes(data, default=str) == expected.encode("utf-8")
+
+    def test_non_str_keys_fall_back(self):
+        """Verify payloads orjson rejects still serialize."""
+        assert _fastjson.dumps_indented_bytes({1: "a"}) == b'{\n  "1": "a"\n}'
+
+
+class TestLoads:
+    """Test loads helper."""
+
+    def test_parses_str_and_bytes(self):
+        """Verify both str and bytes input are accepted."""
+        assert _fastjson.loads('{"a": 1}') == {"a": 1}
+        assert _fastjson.loads(b'{"a": 1}') == {"a": 1}
+
+    def test_invalid_raises_decode_error(self):
+        """Verify invalid input raises the shared JSONDecodeError."""
+        with pytest.raises(_fastjson.JSONDecodeError):
+            _fastjson.loads("{not json")
@@ -0,0 +1,43 @@
+"""Unit tests for memory_tool.feedback intent parsing."""
+import pytest
+
+from memory_tool.feedback import parse_feedback_intent
+
+
+class TestParseFeedbackIntent:
+    """Test natural language feedback classification."""
+
+    @pytest.mark.parametrize("text", ["删除", "Delete this", "remove it", "DROP", "mark as deleted"])
+    def test_delete(self, text):
+        """Delete markers at the start of the text."""
+        assert parse_feedback_intent(text).action == "delete"
+
+    @pytest.mark.parametrize("text", ["修正：新内容", "Correct: new content", "should be: new content"])
+    def test_correct_marker_is_stripped(self, text):
+        """Correction markers are removed from the new summary."""
+        intent = parse_feedback_intent(text)
+        assert intent.action == "correct"
+        assert intent.new_summary in ("新内容", "new content")
+
+    def test_correct_with_title_and_summary(self):
+        """An explicit title: ... summary: ... pair sets both fields."""
+        intent = parse_feedback_intent("correct: title: New title summary: body")
+        assert (intent.new_title, intent.new_summary) == ("New title", "body")
+
+    @pytest.mark.parametrize(
+        "text,expected",
+        [("补充说明：细节", "细节"), ("Note: detail", "detail"), ("also: more", "more")],
+    )
+    def test_supplement_marker_is_stripped(self, text, expected):
+        """Supplement markers, including the longer 补充说明, are removed."""
+        intent = parse_feedback_intent(text)
+        assert (intent.action, intent.supplement_text) == ("supplement", expected)
+
+    def test_unmarked_correction_hint(self):
+        """Unmarked text that reads like a correction is treated as one."""
+        assert parse_feedback_intent("It uses REST instead of GraphQL").action == "correct"
+
+    def test_plain_text_is_supplement(self):
+        """Anything else becomes a supplement with the full text."""
+        intent = parse_feedback_intent("  Remember the cache  ")
+        assert (intent.action, intent.supplement_text) == ("supplement", "Remember the cache")
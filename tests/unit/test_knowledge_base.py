@@ -348,9 +348,9 @@ class TestSchemaV12:
             ).fetchone()
             assert row is not None, f"Index {idx} not found"
 
-    def test_schema_version_is_12(self, db_connection):
-        """Test schema version is 12."""
+    def test_schema_version_at_least_12(self, db_connection):
+        """Test schema version includes knowledge tables (v12)."""
         from memory_tool.database import get_schema_version
 
         version = get_schema_version(db_connection)
-        assert version == 12
+        assert version >= 12
@@ -61,6 +61,25 @@ class TestObservation:
         # session_id should be None by default
         assert obs.session_id is None
 
+    def test_to_dict_matches_asdict(self):
+        """Test to_dict gives the asdict() shape with its own tags list."""
+        from dataclasses import asdict
+
+        obs = Observation(
+            id=1,
+            timestamp="2024-01-15T10:30:00Z",
+            project="test",
+            kind="note",
+            title="Test",
+            summary="Summary",
+            tags=["tag1"],
+            raw="",
+            session_id=5,
+        )
+        data = obs.to_dict()
+        assert data == asdict(obs)
+        assert data["tags"] is not obs.tags
+
 
 class TestSession:
     """Test Session dataclass."""
@@ -113,6 +132,22 @@ class TestSession:
         assert session.agent_type == "codex"
         assert session.summary == "Test session"
 
+    def test_to_dict_matches_asdict(self):
+        """Test to_dict gives the asdict() shape."""
+        from dataclasses import asdict
+
+        session = Session(
+            id=1,
+            start_time="2024-01-15T10:00:00Z",
+            end_time=None,
+            project="my-project",
+            working_dir="/tmp",
+            agent_type="codex",
+            summary="",
+            status="active",
+        )
+        assert session.to_dict() == asdict(session)
+
 
 class TestCheckpoint:
     """Test Checkpoint dataclass."""
@@ -134,6 +169,22 @@ class TestCheckpoint:
         assert checkpoint.tag == "release"
         assert checkpoint.observation_count == 100
 
+    def test_to_dict_matches_asdict(self):
+        """Test to_dict gives the asdict() shape."""
+        from dataclasses import asdict
+
+        checkpoint = Checkpoint(
+            id=1,
+            timestamp="2024-01-15T10:00:00Z",
+            name="v1.0",
+            description="",
+            tag="release",
+            session_id=None,
+            observation_count=3,
+            project="my-project",
+        )
+        assert checkpoint.to_dict() == asdict(checkpoint)
+
     def test_checkpoint_defaults(self):
         """Test Checkpoint with default values."""
         checkpoint = Checkpoint(
@@ -1,6 +1,7 @@
 """Unit tests for memory_tool.utils module."""
 import json
 import os
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -9,16 +10,23 @@ import pytest
 from memory_tool.utils import (
     ISO_FORMAT,
     utc_now,
+    freeze_now,
     normalize_text,
     stem_token,
     normalize_tags_list,
     tags_to_json,
     tags_to_text,
+    tags_to_json_and_text,
     parse_tags_json,
+    tags_json_parser,
     auto_tags_from_text,
     parse_ids,
     quote_fts_query,
     resolve_db_path,
+    read_state_file,
+    state_file_memo,
+    run_llm_hook,
+    forget_state_file,
     DEFAULT_PROFILE,
     PROFILE_CHOICES,
 )
@@ -47,6 +55,15 @@ class TestUtcNow:
         result = utc_now()
         assert isinstance(result, str)
 
+    def test_freeze_now_pins_value(self):
+        """Inside freeze_now every call returns the pinned timestamp."""
+        with freeze_now("2024-01-01T00:00:00Z") as frozen:
+            assert frozen == "2024-01-01T00:00:00Z"
+            assert utc_now() == utc_now() == frozen
+            with freeze_now() as inner:
+                assert inner == frozen
+        assert utc_now() != frozen
+
 
 class TestNormalizeText:
     """Test normalize_text function."""
@@ -86,6 +103,14 @@ class TestStemToken:
         result = stem_token(input_word)
         assert result == expected
 
+    @pytest.mark.parametrize(
+        "input_word,expected",
+        [("boxes", "box"), ("uses", "use"), ("fixed", "fix"), ("sing", "sing"), ("bed", "bed"), ("gas", "gas")],
+    )
+    def test_keeps_more_than_two_characters(self, input_word, expected):
+        """A suffix is only removed when more than two characters remain."""
+        assert stem_token(input_word) == expected
+
 
 class TestNormalizeTagsList:
     """Test normalize_tags_list function."""
@@ -95,6 +120,7 @@ class TestNormalizeTagsList:
         assert normalize_tags_list(None) == []
         assert normalize_tags_list("") == []
         assert normalize_tags_list([]) == []
+        assert normalize_tags_list(" [] ") == []
 
     def test_normalizes_string_tags(self):
         """Test comma-separated string tags."""
@@ -151,6 +177,11 @@ class TestTagsConversion:
         result = tags_to_text(tags)
         assert result == "tag1 tag2 tag3"
 
+    def test_tags_to_json_and_text(self):
+        """Test the combined helper matches the individual conversions."""
+        tags = ["tag1", "修正"]
+        assert tags_to_json_and_text(tags) == (tags_to_json(tags), tags_to_text(tags))
+
     def test_parse_tags_json(self):
         """Test parsing tags JSON."""
         json_str = '["tag1", "tag2"]'
@@ -162,6 +193,14 @@ class TestTagsConversion:
         result = parse_tags_json("invalid json")
         assert result == []
 
+    def test_tags_json_parser_returns_fresh_lists(self):
+        """The caching parser decodes like parse_tags_json but never shares lists."""
+        parse = tags_json_parser()
+        first = parse('["tag1", "tag2"]')
+        first.append("mutated")
+        assert parse('["tag1", "tag2"]') == ["tag1", "tag2"]
+        assert parse("invalid json") == []
+
 
 class TestAutoTagsFromText:
     """Test auto_tags_from_text function."""
@@ -188,6 +227,17 @@ class TestAutoTagsFromText:
         assert "of" not in result
         assert "a" not in result
 
+    def test_ranks_by_count_then_alphabetically(self):
+        """Most frequent tokens come first; ties are broken alphabetically."""
+        result = auto_tags_from_text("zeta cache cache", "alpha beta", limit=3)
+        assert result == ["cache", "alpha", "beta"]
+
+    def test_tokens_keep_hyphens_not_backslashes(self):
+        """Tokens may contain hyphens; a backslash splits them."""
+        result = auto_tags_from_text("read-only mode", r"path\cache")
+        assert "read-only" in result
+        assert "path" in result and "cache" in result
+
 
 class TestParseIds:
     """Test parse_ids function."""
@@ -217,6 +267,25 @@ class TestParseIds:
         assert parse_ids("  1  ,  2  ") == [1, 2]
 
 
+class TestRunLlmHook:
+    """Test run_llm_hook function."""
+
+    def test_returns_hook_json(self):
+        """The hook's stdout JSON is returned."""
+        hook = [sys.executable, "-c", "import json,sys; d=json.load(sys.stdin); print(json.dumps({'title': d['title'].upper()}))"]
+        assert run_llm_hook({"title": "abc"}, hook) == {"title": "ABC"}
+
+    def test_non_json_output_is_ignored(self):
+        """Output that is not UTF-8 JSON yields an empty result."""
+        hook = [sys.executable, "-c", "import sys; sys.stdout.buffer.write(b'\\xff not json')"]
+        assert run_llm_hook({"title": "abc"}, hook) == {}
+
+    def test_slow_hook_is_abandoned(self):
+        """A hook that exceeds the timeout yields an empty result."""
+        hook = [sys.executable, "-c", "import time; time.sleep(5)"]
+        assert run_llm_hook({"title": "abc"}, hook, timeout=0.2) == {}
+
+
 class TestQuoteFtsQuery:
     """Test quote_fts_query function."""
 
@@ -234,6 +303,11 @@ class TestQuoteFtsQuery:
         """Test empty string handling."""
         assert quote_fts_query("") == ""
 
+    @pytest.mark.parametrize("query", ["a:b", "NOT", "x!", 'say "hi"'])
+    def test_quotes_operators_and_punctuation(self, query):
+        """Words FTS5 would parse as syntax are quoted as a phrase."""
+        assert quote_fts_query(query) == '"' + query.replace('"', '""') + '"'
+
 
 class TestResolveDbPath:
     """Test resolve_db_path function."""
@@ -258,3 +332,49 @@ class TestResolveDbPath:
         """Test default profile is claude."""
         result = resolve_db_path(DEFAULT_PROFILE, None)
         assert ".claude_memory" in result
+
+
+class TestReadStateFile:
+    """Test read_state_file memoization."""
+
+    def test_missing_file_returns_none(self, tmp_path):
+        """Test missing file returns None."""
+        assert read_state_file(str(tmp_path / "missing"), str.strip) is None
+
+    def test_reuses_parse_within_memo(self, tmp_path):
+        """Test the parse is reused inside state_file_memo until forgotten."""
+        path = tmp_path / "state"
+        path.write_text('{"session_id": 1}', encoding="utf-8")
+        calls = []
+
+        def parse(text):
+            calls.append(text)
+            return json.loads(text)
+
+        with state_file_memo():
+            assert read_state_file(str(path), parse) == {"session_id": 1}
+            assert read_state_file(str(path), parse) == {"session_id": 1}
+            assert len(calls) == 1
+
+            path.write_text('{"session_id": 22}', encoding="utf-8")
+            forget_state_file(str(path))
+            assert read_state_file(str(path), parse) == {"session_id": 22}
+            assert len(calls) == 2
+
+    def test_rereads_outside_memo(self, tmp_path):
+        """Test a same-size rewrite with the same mtime is seen outside a memo."""
+        path = tmp_path / "state"
+        path.write_text('{"session_id": 12}', encoding="utf-8")
+        stat = os.stat(path)
+        assert read_state_file(str(path), json.loads) == {"session_id": 12}
+
+        # Another process rewrites it within one mtime tick
+        path.write_text('{"session_id": 13}', encoding="utf-8")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert read_state_file(str(path), json.loads) == {"session_id": 13}
+
+    def test_parse_error_returns_none(self, tmp_path):
+        """Test invalid content returns None."""
+        path = tmp_path / "state"
+        path.write_text("{not json", encoding="utf-8")
+        assert read_state_file(str(path), json.loads) is None